@@ -0,0 +1,74 @@
+"""
+bench_add_tones.py
+Benchmark of adding many tones to a scale at once
+(run from the repo root: python -m benchmarks.bench_add_tones)
+
+Times Scale.add_tones, which adds batches of ARRAY_TONES or more tones as
+numpy arrays, against adding the same tones one at a time with add_tone.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import argparse
+import timeit
+
+import lib.scale as scale
+import lib.scale_octave as scale_octave
+
+
+def one_at_a_time(scale_class, tones):
+    """
+    Build a scale adding tones with add_tone
+    :param scale_class: Scale or a subclass
+    :param tones: list of tones, in cents
+    :return: the scale
+    """
+    new_scale = scale_class()
+    for tone in tones:
+        new_scale.add_tone(tone)
+    return new_scale
+
+
+def batch(scale_class, tones):
+    """
+    Build a scale adding tones with add_tones
+    :param scale_class: Scale or a subclass
+    :param tones: list of tones, in cents
+    :return: the scale
+    """
+    new_scale = scale_class()
+    new_scale.add_tones(tones)
+    return new_scale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument(
+        '--sizes', type=int, nargs='*',
+        default=[scale.ARRAY_TONES, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for scale_class in (scale.Scale, scale_octave.ScaleOctave):
+        for size in args.sizes:
+            # distinct tones in a scattered order, within an octave
+            tones = [(i * 7919) % size * 1200 / size for i in range(size)]
+            times = [
+                min(timeit.repeat(
+                    lambda: build(scale_class, tones),
+                    number=1, repeat=args.repeat))
+                for build in (one_at_a_time, batch)
+            ]
+            print('{0} {1} tones: add_tone {2:.2f} ms, add_tones {3:.2f} ms'
+                  .format(scale_class.__name__, size,
+                          1000 * times[0], 1000 * times[1]))
+
+
+if __name__ == '__main__':
+    main()
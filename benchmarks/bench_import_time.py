@@ -0,0 +1,67 @@
+"""
+bench_import_time.py
+Benchmark of the import time of the core lib modules
+(run from the repo root: python -m benchmarks.bench_import_time)
+
+The core modules import numpy only when a batch operation needs it (see
+tests/test_import_time.py), which keeps them quick to import; numpy alone
+takes ~100ms to import, pandas several times that.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import argparse
+import os
+import subprocess
+import sys
+
+# The modules checked by tests/test_import_time.py, and numpy and pandas
+LIGHT_MODULES = [
+    'lib.midi_12edo',
+    'lib.note',
+    'lib.pitch_class_set',
+    'lib.ratios',
+    'lib.scale',
+    'lib.scale_12edo',
+    'lib.scale_octave',
+    'lib.tone_store',
+]
+HEAVY_MODULES = ['numpy', 'pandas']
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_time(modules):
+    """
+    Time importing modules in a fresh interpreter
+    :param modules: list of module names
+    :return: seconds
+    """
+    code = (
+        'import time\n'
+        'start = time.perf_counter()\n'
+        f'import {", ".join(modules)}\n'
+        'print(time.perf_counter() - start)')
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=REPO_DIR,
+        capture_output=True, text=True, check=True)
+    return float(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for modules in (LIGHT_MODULES, HEAVY_MODULES):
+        seconds = min(import_time(modules) for _ in range(args.repeat))
+        print('{0}: {1:.1f} ms'.format(', '.join(modules), 1000 * seconds))
+
+
+if __name__ == '__main__':
+    main()
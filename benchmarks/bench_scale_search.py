@@ -0,0 +1,90 @@
+"""
+bench_scale_search.py
+Benchmark of scale_search queries on a large random library
+(run from the repo root: python -m benchmarks.bench_scale_search)
+
+Times exact queries (the default) and Fourier shortlisted queries, and
+reports how many of the exact nearest neighbours each shortlist finds.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import argparse
+import time
+
+import numpy as np
+
+import lib.scale_search as scale_search
+
+
+def random_scales(count, min_tones=5, max_tones=12, seed=0):
+    """
+    Random scales of 12-EDO pitch classes, detuned by up to 20 cents
+    :param count: number of scales
+    :param min_tones: fewest tones of a scale
+    :param max_tones: most tones of a scale
+    :param seed: random seed
+    :return: list of numpy arrays of cents
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        np.sort(rng.choice(12, size=size, replace=False) * 100.0
+                + rng.uniform(-20, 20, size=size))
+        for size in rng.integers(min_tones, max_tones + 1, size=count)
+    ]
+
+
+def best_time(function, repeat):
+    """
+    Best wall clock time of a few calls
+    :param function: function (no arguments)
+    :param repeat: number of calls
+    :return: tuple (seconds, result of the last call)
+    """
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--scales', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument(
+        '--shortlists', type=int, nargs='*', default=[1000, 10000])
+    args = parser.parse_args()
+
+    scales = random_scales(args.scales)
+    start = time.perf_counter()
+    index = scale_search.SimilarityIndex(scales)
+    print('index {0} scales: {1:.3f} s'.format(
+        len(index), time.perf_counter() - start))
+    queries = random_scales(args.queries, seed=1)
+    for shortlist in [None] + args.shortlists:
+        seconds, recall = [], []
+        for query in queries:
+            elapsed, result = best_time(
+                lambda: index.query(query, k=args.k, shortlist=shortlist), 3)
+            seconds.append(elapsed)
+            exact = index.query(query, k=args.k, shortlist=None)
+            found = {match.position for match in result}
+            recall.append(
+                len(found & {match.position for match in exact}) / args.k)
+        print('shortlist {0}: {1:.1f} ms per query, recall {2:.0%}'.format(
+            'exact' if shortlist is None else shortlist,
+            1000 * np.mean(seconds), np.mean(recall)))
+
+
+if __name__ == '__main__':
+    main()
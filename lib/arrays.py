@@ -0,0 +1,124 @@
+"""
+arrays.py
+Helpers for the array-aware (numpy) variants of the library functions
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+
+
+def as_array(values, dtype=None):
+    """
+    Get values as a numpy array, without copying where possible
+    :param values: numpy array, object supporting the buffer protocol
+                   (eg array.array), sequence, iterable or scalar
+    :param dtype: numpy dtype for the array (default: inferred, or float for
+                  iterables)
+    :return: numpy array
+    """
+    if isinstance(values, np.ndarray):
+        if dtype is None:
+            return values
+        return values.astype(dtype, copy=False)
+    try:
+        view = memoryview(values)
+    except TypeError:
+        pass
+    else:
+        return np.asarray(view, dtype=dtype)
+    if hasattr(values, '__len__') or not hasattr(values, '__iter__'):
+        return np.asarray(values, dtype=dtype)
+    return np.fromiter(values, dtype=float if dtype is None else dtype)
+
+
+def frame_count(length, frame_size, hop):
+    """
+    Number of whole frames in a signal
+    :param length: number of samples
+    :param frame_size: samples per frame
+    :param hop: samples from the start of one frame to the next
+    :return: number of frames
+    """
+    if length < frame_size:
+        return 0
+    return (length - frame_size) // hop + 1
+
+
+def frames(samples, frame_size, hop):
+    """
+    Overlapping frames of a signal, as a strided view (no copy)
+    :param samples: 1-d numpy array
+    :param frame_size: samples per frame
+    :param hop: samples from the start of one frame to the next
+    :return: read-only numpy array (frames, frame_size), a view of samples;
+             frames that would run past the end are left out
+    """
+    count = frame_count(len(samples), frame_size, hop)
+    if not count:
+        return np.zeros((0, frame_size), dtype=samples.dtype)
+    return np.lib.stride_tricks.sliding_window_view(
+        samples[:(count - 1) * hop + frame_size], frame_size)[::hop]
+
+
+class FrameBuffer(object):
+    """
+    Class to cut audio arriving in blocks of any size into overlapping
+    frames, as frames would cut the whole signal
+    Samples are kept only until the frames that need them are complete
+    """
+    def __init__(self, frame_size, hop):
+        """
+        Constructor
+        :param frame_size: samples per frame
+        :param hop: samples from the start of one frame to the next
+        """
+        self.__frame_size = frame_size
+        self.__hop = hop
+        self.__pending = np.zeros(0)
+        self.__frames = 0
+
+    @property
+    def frame_size(self):
+        """
+        getter for self.__frame_size
+        :return: samples per frame
+        """
+        return self.__frame_size
+
+    @property
+    def hop(self):
+        """
+        getter for self.__hop
+        :return: samples from the start of one frame to the next
+        """
+        return self.__hop
+
+    @property
+    def frames(self):
+        """
+        getter for self.__frames
+        :return: number of frames completed so far
+        """
+        return self.__frames
+
+    def push(self, block):
+        """
+        Add a block of samples
+        :param block: next mono samples (numpy array, buffer or iterable)
+        :return: tuple (number of the first new frame, read-only numpy array
+                 (new frames, frame_size) of the frames the block completed)
+        """
+        samples = np.concatenate(
+            (self.__pending, as_array(block, dtype=float)))
+        new_frames = frames(samples, self.__frame_size, self.__hop)
+        first = self.__frames
+        self.__frames += len(new_frames)
+        self.__pending = samples[len(new_frames) * self.__hop:]
+        return first, new_frames
@@ -0,0 +1,237 @@
+"""
+chords.py
+Chords of a scale: every chord built on each degree by a pattern of steps
+
+A pattern is the number of scale degrees from each chord note to the next,
+so (2, 2) stacks thirds into the triads of a heptatonic scale, (2, 2, 2)
+gives the seventh chords, and any generic intervals can be used, eg (3, 1)
+or (4, 3). A repeating scale's chords run on into the next periods; on a
+scale that doesn't repeat only the chords that fit below its top tone are
+built.
+
+All the chords of a pattern are computed at once as integer index arrays
+into the tones of one period (roots down the rows, chord notes across),
+and cached on the scale until its tones or root note change. For huge
+scales, iter_chords generates the chords lazily, a block of roots at a
+time, and chords_for_scales spreads many scales over worker processes.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numbers
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import lib.ratios as ratios
+
+TRIAD = (2, 2)
+SEVENTH = (2, 2, 2)
+NINTH = (2, 2, 2, 2)
+# roots per block generated by iter_chords
+BLOCK_ROOTS = 1024
+# scales sent to a worker process at a time by chords_for_scales
+SCALES_CHUNK_SIZE = 16
+
+# Every chord of a pattern, as read-only numpy arrays (chords, notes),
+# one row per chord root
+Chords = namedtuple('Chords', [
+    'pattern',  # the pattern (tuple of degree steps)
+    'index',  # positions of the notes in the tones of one period
+    'degree',  # scale degrees of the notes
+    'octave',  # octave (period) of each note, relative to the root
+    'cents',  # cents above the scale root
+    'freq',  # frequency in Hz, None if the scale has no root note
+])
+
+# One chord: tuples of the degree, octave and cents of each note
+Chord = namedtuple('Chord', ['degrees', 'octaves', 'cents'])
+
+
+def stacked(notes, step=2):
+    """
+    Pattern of a chord of evenly stacked degrees
+    :param notes: number of chord notes
+    :param step: degrees from each note to the next (2 for thirds)
+    :return: pattern tuple
+    """
+    return (step,) * (notes - 1)
+
+
+def _valid_pattern(pattern):
+    """
+    Check a pattern of degree steps
+    :param pattern: sequence of degree steps
+    :return: the pattern as a tuple, None if any step is not a positive int
+    """
+    try:
+        pattern = tuple(pattern)
+    except TypeError:
+        return None
+    if not all(
+            isinstance(step, numbers.Integral) and step > 0
+            for step in pattern):
+        return None
+    return tuple(int(step) for step in pattern)
+
+
+def _roots(count, period, pattern):
+    """
+    Positions of the roots that can carry a pattern
+    :param count: number of tones in one period
+    :param period: period of the scale in cents, None if it doesn't repeat
+    :param pattern: tuple of degree steps
+    :return: range of positions in the tones of one period
+    """
+    if period is None:
+        return range(max(0, count - sum(pattern)))
+    return range(count)
+
+
+def _stack(cents, degrees, period, pattern, roots):
+    """
+    Build the chords of a pattern on some roots, by broadcasting
+    :param cents: numpy array of the tones of one period
+    :param degrees: numpy array of the degrees of the tones
+    :param period: period of the scale in cents, None if it doesn't repeat
+    :param pattern: tuple of degree steps
+    :param roots: numpy int array of root positions in the tones
+    :return: tuple of numpy arrays (chords, notes): index, degree, octave,
+             cents
+    """
+    offsets = np.concatenate(([0], np.cumsum(pattern, dtype=np.int64)))
+    positions = roots[:, np.newaxis] + offsets
+    if period is None:
+        index, octaves = positions, np.zeros(positions.shape, dtype=np.int64)
+        chord_cents = cents[index]
+    else:
+        octaves, index = np.divmod(positions, len(cents))
+        chord_cents = cents[index] + octaves * period
+    return index, degrees[index], octaves, chord_cents
+
+
+def _freqs(cents, root_hz):
+    """
+    Frequencies of chord notes
+    :param cents: numpy array of cents above the root
+    :param root_hz: frequency of the root note in Hz, None if no root note
+    :return: numpy array, None if no root note
+    """
+    if root_hz is None:
+        return None
+    return root_hz * 2.0 ** (cents / ratios.OCTAVE_CENTS)
+
+
+def chords(myscale, pattern=TRIAD):
+    """
+    Every chord of a pattern in a scale, one on each degree that can carry it
+    (cached on the scale until its tones or root note change)
+    :param myscale: scale.Scale (or subclass)
+    :param pattern: sequence of degree steps from each chord note to the next
+    :return: Chords, None if the pattern is not a sequence of positive ints
+    """
+    pattern = _valid_pattern(pattern)
+    if pattern is None:
+        return None
+    return myscale.cached(
+        ('chords', pattern), lambda: _build_chords(myscale, pattern))
+
+
+def _build_chords(myscale, pattern):
+    """
+    Build every chord of a pattern in a scale (see chords)
+    :param myscale: scale.Scale (or subclass)
+    :param pattern: tuple of degree steps
+    :return: Chords
+    """
+    cents, degrees = myscale.period_tones()
+    period = myscale.period_cents
+    roots = np.array(_roots(len(cents), period, pattern), dtype=np.int64)
+    index, degree, octave, chord_cents = _stack(
+        cents, degrees, period, pattern, roots)
+    root_hz = None
+    if myscale.root_note is not None:
+        root_hz = myscale.root_note.freq
+    result = Chords(
+        pattern=pattern, index=index, degree=degree, octave=octave,
+        cents=chord_cents, freq=_freqs(chord_cents, root_hz))
+    for values in result[1:]:
+        if values is not None:
+            values.flags.writeable = False
+    return result
+
+
+def all_chords(myscale, patterns=(TRIAD, SEVENTH)):
+    """
+    Every chord of several patterns in a scale
+    :param myscale: scale.Scale (or subclass)
+    :param patterns: iterable of patterns
+    :return: list of Chords (None for an invalid pattern), one per pattern
+    """
+    return [chords(myscale, pattern) for pattern in patterns]
+
+
+def iter_chords(myscale, pattern=TRIAD, block_roots=BLOCK_ROOTS):
+    """
+    Lazily generate every chord of a pattern in a scale, computing a block
+    of roots at a time (see chords)
+    :param myscale: scale.Scale (or subclass)
+    :param pattern: sequence of degree steps from each chord note to the next
+    :param block_roots: roots computed together
+    :return: generator of Chord tuples, by root (empty for an invalid
+             pattern)
+    """
+    pattern = _valid_pattern(pattern)
+    if pattern is None:
+        return
+    cents, degrees = myscale.period_tones()
+    period = myscale.period_cents
+    roots = _roots(len(cents), period, pattern)
+    for start in range(0, len(roots), block_roots):
+        block = np.array(roots[start:start + block_roots], dtype=np.int64)
+        _, degree, octave, chord_cents = _stack(
+            cents, degrees, period, pattern, block)
+        yield from (
+            Chord(*values) for values in zip(
+                map(tuple, degree.tolist()), map(tuple, octave.tolist()),
+                map(tuple, chord_cents.tolist())))
+
+
+def _chords_job(job):
+    """
+    Build the chords of one scale (run in the worker processes)
+    :param job: tuple (scale or scale_library.ScaleView, patterns)
+    :return: list of Chords, one per pattern
+    """
+    myscale, patterns = job
+    if hasattr(myscale, 'to_scale'):
+        myscale = myscale.to_scale()
+    return all_chords(myscale, patterns)
+
+
+def chords_for_scales(scales, patterns=(TRIAD, SEVENTH), processes=None):
+    """
+    Every chord of several patterns in many scales, in parallel worker
+    processes
+    :param scales: iterable of scales, or scale_library.ScaleViews
+    :param patterns: iterable of patterns
+    :param processes: number of worker processes (default: one per CPU,
+                      1 to build in this process)
+    :return: generator of lists of Chords (one per pattern), in order of
+             scales
+    """
+    patterns = list(patterns)
+    jobs = ((myscale, patterns) for myscale in scales)
+    if processes == 1:
+        yield from map(_chords_job, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(
+            _chords_job, jobs, chunksize=SCALES_CHUNK_SIZE)
@@ -0,0 +1,228 @@
+"""
+chroma.py
+Energy of each scale degree in audio: a chromagram for any scale
+
+Every FFT bin is assigned to the scale degree nearest to its frequency
+(folding octaves, or periods, together), so the spectrum of a frame sums
+into one energy per degree. For a 12-EDO chromatic scale this is the usual
+12-bin chromagram. The bin to degree map is built once per scale version,
+sample rate and FFT size, and stored sparsely: the bins sorted by degree,
+summed in runs with numpy.add.reduceat over a batch of frames at a time.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+from collections import namedtuple
+
+import numpy as np
+
+import lib.arrays as arrays
+import lib.note as note
+
+SAMPLE_RATE = 44100
+FFT_SIZE = 4096
+HOP = 1024
+MIN_FREQ_HZ = note.MIN_AUDIBLE_HZ
+# frames transformed together (bounds the size of the FFT arrays)
+CHUNK_FRAMES = 256
+
+# Sparse map of FFT bins to scale degrees
+DegreeMap = namedtuple('DegreeMap', [
+    'degrees',  # numpy array of the degrees, one per energy column
+    'bins',  # numpy array of the mapped bins, sorted by degree column
+    'starts',  # numpy array of where each non-empty column's bins start
+    'columns',  # numpy array of the non-empty columns
+])
+
+# Energy of each scale degree, by frame
+Chroma = namedtuple('Chroma', [
+    'degrees',  # numpy array of the degrees of the columns
+    'energy',  # numpy array (frames, degrees) of spectral power
+])
+
+
+def degree_map(
+        myscale, sample_rate=SAMPLE_RATE, fft_size=FFT_SIZE,
+        min_freq_hz=MIN_FREQ_HZ, max_deviation=None):
+    """
+    Map of the FFT bins to the nearest degrees of a scale
+    (cached on the scale until its tones or root note change)
+    :param myscale: scale.Scale (or subclass) with a root note
+    :param sample_rate: samples per second
+    :param fft_size: samples per FFT frame
+    :param min_freq_hz: lowest bin frequency to map, in Hz
+    :param max_deviation: leave out bins more than this many cents from
+                          the nearest scale tone (default: map all bins)
+    :return: DegreeMap, None if the scale has no root note or tones
+    """
+    if myscale.root_note is None or not len(myscale.period_tones()[0]):
+        return None
+    return myscale.cached(
+        ('degree_map', sample_rate, fft_size, min_freq_hz, max_deviation),
+        lambda: _build_degree_map(
+            myscale, sample_rate, fft_size, min_freq_hz, max_deviation))
+
+
+def _build_degree_map(
+        myscale, sample_rate, fft_size, min_freq_hz, max_deviation):
+    """
+    Build the map of FFT bins to scale degrees (see degree_map)
+    :param myscale: scale.Scale (or subclass) with a root note
+    :param sample_rate: samples per second
+    :param fft_size: samples per FFT frame
+    :param min_freq_hz: lowest bin frequency to map, in Hz
+    :param max_deviation: largest distance of a bin from its tone, in cents
+    :return: DegreeMap
+    """
+    degrees = myscale.period_tones()[1]
+    bins = np.arange(fft_size // 2 + 1)
+    bins = bins[bins * sample_rate / fft_size >= min_freq_hz]
+    quantized = myscale.quantize(bins * sample_rate / fft_size)
+    if max_deviation is not None:
+        near = np.abs(quantized.deviation) <= max_deviation
+        bins = bins[near]
+        quantized = quantized._replace(degree=quantized.degree[near])
+    bin_columns = np.searchsorted(degrees, quantized.degree)
+    order = np.argsort(bin_columns, kind='stable')
+    bins, bin_columns = bins[order], bin_columns[order]
+    columns, starts = np.unique(bin_columns, return_index=True)
+    result = DegreeMap(
+        degrees=degrees, bins=bins, starts=starts, columns=columns)
+    for values in result:
+        values.flags.writeable = False
+    return result
+
+
+def apply_map(power, mapping):
+    """
+    Sum the spectral power of frames by scale degree
+    :param power: numpy array (frames, bins) of spectral power
+    :param mapping: DegreeMap
+    :return: numpy array (frames, degrees) of energy
+    """
+    energy = np.zeros((len(power), len(mapping.degrees)))
+    if len(mapping.bins):
+        energy[:, mapping.columns] = np.add.reduceat(
+            power[:, mapping.bins], mapping.starts, axis=1)
+    return energy
+
+
+def power_spectrum(frames):
+    """
+    Spectral power of frames of audio, with a Hann window
+    :param frames: numpy array (frames, frame_size) of samples
+    :return: numpy array (frames, frame_size // 2 + 1)
+    """
+    spectrum = np.fft.rfft(frames * np.hanning(frames.shape[1]), axis=1)
+    return spectrum.real ** 2 + spectrum.imag ** 2
+
+
+def frame_energy(frames, mapping):
+    """
+    Energy of each scale degree in frames of audio
+    :param frames: numpy array (frames, fft_size) of samples
+    :param mapping: DegreeMap for the scale, sample rate and FFT size
+    :return: numpy array (frames, degrees)
+    """
+    return np.concatenate([
+        apply_map(power_spectrum(frames[start:start + CHUNK_FRAMES]), mapping)
+        for start in range(0, len(frames), CHUNK_FRAMES)
+    ] + [np.zeros((0, len(mapping.degrees)))])
+
+
+def chroma(
+        samples, myscale, sample_rate=SAMPLE_RATE, fft_size=FFT_SIZE,
+        hop=HOP, min_freq_hz=MIN_FREQ_HZ, max_deviation=None):
+    """
+    Energy of each degree of a scale in audio, frame by frame
+    :param samples: mono audio (numpy array, buffer or iterable)
+    :param myscale: scale.Scale (or subclass) with a root note
+    :param sample_rate: samples per second
+    :param fft_size: samples per frame
+    :param hop: samples from the start of one frame to the next
+    :param min_freq_hz: lowest frequency to count, in Hz
+    :param max_deviation: see degree_map
+    :return: Chroma, one row of energy per whole frame
+             None if the scale has no root note or tones
+    """
+    mapping = degree_map(
+        myscale, sample_rate=sample_rate, fft_size=fft_size,
+        min_freq_hz=min_freq_hz, max_deviation=max_deviation)
+    if mapping is None:
+        return None
+    samples = arrays.as_array(samples, dtype=float)
+    return Chroma(mapping.degrees, frame_energy(
+        arrays.frames(samples, fft_size, hop), mapping))
+
+
+def normalize(energy):
+    """
+    Scale each frame's energy to sum to 1 (silent frames stay 0)
+    :param energy: numpy array (frames, degrees)
+    :return: numpy array (frames, degrees)
+    """
+    totals = energy.sum(axis=-1, keepdims=True)
+    return np.divide(
+        energy, totals, out=np.zeros(energy.shape), where=totals > 0)
+
+
+class ChromaTracker(object):
+    """
+    Class to compute scale degree energy live, from audio blocks of any size
+    Samples are kept only until the frames that need them are complete
+    """
+    def __init__(
+            self, myscale, sample_rate=SAMPLE_RATE, fft_size=FFT_SIZE,
+            hop=HOP, min_freq_hz=MIN_FREQ_HZ, max_deviation=None):
+        """
+        Constructor
+        :param myscale: scale.Scale (or subclass) with a root note
+        (other parameters as for chroma)
+        """
+        self.__myscale = myscale
+        self.__sample_rate = sample_rate
+        self.__min_freq_hz = min_freq_hz
+        self.__max_deviation = max_deviation
+        self.__buffer = arrays.FrameBuffer(fft_size, hop)
+
+    @property
+    def myscale(self):
+        """
+        getter for self.__myscale
+        :return: scale.Scale (or subclass) whose degrees are measured
+        """
+        return self.__myscale
+
+    @property
+    def frames(self):
+        """
+        Number of frames processed so far
+        :return: number of frames
+        """
+        return self.__buffer.frames
+
+    def process(self, block):
+        """
+        Compute the energy of the frames completed by a block of audio
+        (the scale's degree map is looked up each time, so changes to the
+        scale apply from the next block)
+        :param block: next mono samples (numpy array, buffer or iterable)
+        :return: Chroma of the new frames (may be empty)
+                 None if the scale has no root note or tones (the frames
+                 are still counted, so frame numbers follow the audio)
+        """
+        _, frames = self.__buffer.push(block)
+        mapping = degree_map(
+            self.__myscale, sample_rate=self.__sample_rate,
+            fft_size=self.__buffer.frame_size,
+            min_freq_hz=self.__min_freq_hz,
+            max_deviation=self.__max_deviation)
+        if mapping is None:
+            return None
+        return Chroma(mapping.degrees, frame_energy(frames, mapping))
@@ -0,0 +1,230 @@
+"""
+intervals.py
+Interval analysis of scales: the interval between every pair of degrees,
+the histogram of interval classes, and the number of distinct steps
+
+Intervals are computed by broadcasting the tone array against itself, so
+even a scale of thousands of tones is analysed in a few array operations.
+For a repeating scale the tones of one period are analysed and intervals
+are taken mod the period; the interval class of an interval is then the
+shorter way around the period circle (as in set theory, where the 12-EDO
+histogram in bins of 100 cents is the interval vector).
+The analysis of a scale is cached until its tones change; many scales can
+be analysed together as one array of tones, padded with nan to a common
+width.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+from collections import namedtuple
+
+import numpy as np
+
+import lib.ratios as ratios
+
+# Default histogram bin width (and step rounding), in cents
+RESOLUTION_CENTS = 1
+# Limit on the elements of the intermediate pair arrays of a batch
+CHUNK_ELEMENTS = 1 << 22
+
+# Interval analysis of a scale, as read-only numpy arrays
+IntervalAnalysis = namedtuple('IntervalAnalysis', [
+    'degrees',  # degrees of the rows and columns of the matrix
+    'matrix',  # (degrees, degrees) cents from the row degree up to the
+               # column degree (mod the period for a repeating scale)
+    'histogram',  # count of the pairs of degrees in each interval class
+                  # bin (bin b for classes nearest b * resolution cents)
+    'distinct_steps',  # number of different steps between neighbouring
+                       # degrees (int)
+])
+
+# Interval analysis of many scales, as numpy arrays indexed by scale
+BatchAnalysis = namedtuple('BatchAnalysis', [
+    'histogram',  # (scales, bins) interval class counts
+    'distinct_steps',  # number of different steps
+])
+
+
+def padded(scales):
+    """
+    Tones of many scales as one array, padded with nan to the same width
+    :param scales: iterable of scales (the tones of one period are used) or
+                   sequences of cents
+    :return: numpy float array (scales, width)
+    """
+    rows = []
+    for tones in scales:
+        if hasattr(tones, 'period_tones'):
+            tones = tones.period_tones()[0]
+        rows.append(np.asarray(tones, dtype=float))
+    result = np.full((len(rows), max(map(len, rows), default=0)), np.nan)
+    for row, tones in zip(result, rows):
+        row[:len(tones)] = tones
+    return result
+
+
+def interval_matrix(cents, period=None):
+    """
+    Interval between every pair of tones
+    :param cents: numpy array (..., n) of tones
+    :param period: interval at which the tones repeat, in cents (None for
+                   tones that don't repeat)
+    :return: numpy array (..., n, n), entry [i, j] the cents from tone i up
+             to tone j (mod period, 0 <= interval < period)
+    """
+    cents = np.asarray(cents, dtype=float)
+    if period is not None:
+        cents = np.mod(cents, period)
+    intervals = cents[..., np.newaxis, :] - cents[..., :, np.newaxis]
+    if period is not None:
+        # tones within one period are less than a period apart
+        np.add(intervals, period, out=intervals, where=intervals < 0)
+    return intervals
+
+
+def interval_classes(intervals, period=None):
+    """
+    Interval classes: the size of intervals regardless of direction
+    :param intervals: numpy array of intervals, in cents
+    :param period: interval at which the tones repeat, in cents (None for
+                   tones that don't repeat)
+    :return: numpy array, 0 <= class <= period / 2 for a period
+    """
+    if period is None:
+        return np.abs(intervals)
+    intervals = np.mod(intervals, period)
+    return np.minimum(intervals, period - intervals)
+
+
+def class_histogram(
+        cents, period=None, resolution=RESOLUTION_CENTS, bins=None):
+    """
+    Counts of the interval classes of every pair of tones
+    :param cents: numpy array (..., n) of tones, nan for padding
+    :param period: interval at which the tones repeat, in cents (None for
+                   tones that don't repeat)
+    :param resolution: bin width, in cents
+    :param bins: number of bins (default: up to half the period, or up to
+                 the widest interval)
+    :return: numpy int array (..., bins), bin b counting the classes
+             nearest to b * resolution (halves round up)
+    """
+    cents = np.asarray(cents, dtype=float)
+    width = cents.shape[-1]
+    rows = cents.reshape((int(np.prod(cents.shape[:-1])), width))
+    if bins is None:
+        if period is not None:
+            widest = period / 2
+        elif np.isnan(rows).all():
+            widest = 0
+        else:
+            widest = np.nanmax(rows) - np.nanmin(rows)
+        bins = int(np.rint(widest / resolution)) + 1
+    if period is not None:
+        rows = np.mod(rows, period)
+    counts = np.zeros((len(rows), bins), dtype=np.int64)
+    chunk = max(1, CHUNK_ELEMENTS // max(1, width * width))
+    for start in range(0, len(rows), chunk):
+        part = rows[start:start + chunk]
+        # classes of all ordered pairs (the same both ways round),
+        # computed in place
+        classes = np.subtract(part[:, np.newaxis, :], part[:, :, np.newaxis])
+        np.abs(classes, out=classes)
+        if period is not None:
+            # the shorter way round: period / 2 - |interval - period / 2|
+            classes -= period / 2
+            np.abs(classes, out=classes)
+            np.subtract(period / 2, classes, out=classes)
+        # nearest bin; padding (nan) and classes past the last bin go to an
+        # extra bin
+        classes *= 1 / resolution
+        classes += 0.5
+        np.fmin(classes, bins, out=classes)
+        index = classes.astype(np.int64)
+        index += (np.arange(len(part)) * (bins + 1))[:, np.newaxis, np.newaxis]
+        part_counts = np.bincount(
+            index.ravel(), minlength=len(part) * (bins + 1)
+        ).reshape(len(part), bins + 1)[:, :bins]
+        # leave out each tone paired with itself, and count each pair once
+        part_counts[:, 0] -= (~np.isnan(part)).sum(axis=1)
+        counts[start:start + len(part)] = part_counts // 2
+    return counts.reshape(cents.shape[:-1] + (bins,))
+
+
+def distinct_steps(cents, period=None, resolution=RESOLUTION_CENTS):
+    """
+    Number of different steps between neighbouring tones
+    (steps are compared rounded to the resolution)
+    :param cents: numpy array (..., n) of tones, nan for padding
+    :param period: interval at which the tones repeat, in cents, to count
+                   the step from the highest tone up to the next period
+                   (None for tones that don't repeat)
+    :param resolution: size of the rounding, in cents
+    :return: numpy int array (...)
+    """
+    tones = np.sort(np.asarray(cents, dtype=float), axis=-1)
+    steps = np.diff(tones, axis=-1)
+    if period is not None and tones.shape[-1]:
+        count = (~np.isnan(tones)).sum(axis=-1, keepdims=True)
+        last = np.take_along_axis(tones, np.maximum(count - 1, 0), axis=-1)
+        steps = np.concatenate(
+            (steps, tones[..., :1] + period - last), axis=-1)
+    steps = np.sort(np.rint(steps / resolution), axis=-1)
+    valid = ~np.isnan(steps)
+    changes = (steps[..., 1:] != steps[..., :-1]) & valid[..., 1:]
+    return valid[..., :1].sum(axis=-1) + changes.sum(axis=-1)
+
+
+def analyze(myscale, resolution=RESOLUTION_CENTS):
+    """
+    Interval analysis of a scale
+    (cached on the scale until its tones change)
+    :param myscale: scale.Scale (or subclass)
+    :param resolution: interval class bin width and step rounding, in cents
+    :return: IntervalAnalysis
+    """
+    return myscale.cached(
+        ('intervals', resolution),
+        lambda: _build_analysis(myscale, resolution))
+
+
+def _build_analysis(myscale, resolution):
+    """
+    Build the interval analysis of a scale (see analyze)
+    :param myscale: scale.Scale (or subclass)
+    :param resolution: interval class bin width and step rounding, in cents
+    :return: IntervalAnalysis
+    """
+    cents, degrees = myscale.period_tones()
+    period = myscale.period_cents
+    result = IntervalAnalysis(
+        degrees=degrees,
+        matrix=interval_matrix(cents, period),
+        histogram=class_histogram(cents, period, resolution),
+        distinct_steps=int(distinct_steps(cents, period, resolution)))
+    result.matrix.flags.writeable = False
+    result.histogram.flags.writeable = False
+    return result
+
+
+def analyze_batch(
+        tones, period=ratios.OCTAVE_CENTS, resolution=RESOLUTION_CENTS):
+    """
+    Interval analysis of many scales at once
+    :param tones: numpy array (scales, width) of tones, padded with nan
+                  (see padded)
+    :param period: interval at which all the scales repeat, in cents (None
+                   for scales that don't repeat)
+    :param resolution: interval class bin width and step rounding, in cents
+    :return: BatchAnalysis
+    """
+    tones = np.asarray(tones, dtype=float)
+    return BatchAnalysis(
+        histogram=class_histogram(tones, period, resolution),
+        distinct_steps=distinct_steps(tones, period, resolution))
@@ -0,0 +1,142 @@
+"""
+key_table.py
+A scale in every key: the frequencies of its degrees for many root notes
+
+The table is one numpy matrix (keys, degrees, octaves), computed by
+broadcasting the tones of one period against a vector of root frequencies
+and a vector of octave (period) numbers. By default the keys are the
+equal steps of the period above the scale's root note: 12 keys for most
+scales, the n keys of an n-EDO scale. The table is cached on the scale
+until its tones or root note change, so transposing code can index a row
+of it instead of re-rooting a shared scale object.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+from collections import namedtuple
+
+import numpy as np
+
+import lib.ratios as ratios
+
+# Default number of keys (for scales that aren't an EDO)
+KEYS = 12
+# Largest distance of a root from a key's root to match it, in cents
+KEY_TOLERANCE_CENTS = 0.01
+
+# Frequencies of a scale in many keys, as read-only numpy arrays
+KeyTable = namedtuple('KeyTable', [
+    'roots',  # (keys,) root frequency of each key, in Hz
+    'degrees',  # (degrees,) scale degrees of the columns (one period)
+    'octaves',  # (octaves,) octave (period) numbers, relative to each root
+    'freq',  # (keys, degrees, octaves) frequencies in Hz
+])
+
+
+def equal_roots(root_hz, keys=KEYS, period=ratios.OCTAVE_CENTS):
+    """
+    Root frequencies of keys that divide a period equally
+    :param root_hz: frequency of the first key's root, in Hz
+    :param keys: number of keys
+    :param period: interval spanned by the keys, in cents
+    :return: tuple of root frequencies, in Hz, from root_hz up
+    """
+    steps = np.arange(keys) * (period / keys)
+    return tuple((root_hz * 2.0 ** (steps / ratios.OCTAVE_CENTS)).tolist())
+
+
+def _freq(root):
+    """
+    Frequency of a root
+    :param root: frequency in Hz, or note.Note
+    :return: frequency in Hz
+    """
+    return getattr(root, 'freq', root)
+
+
+def key_table(myscale, roots=None, octaves=(0,)):
+    """
+    Frequencies of the tones of one period of a scale in many keys
+    (cached on the scale until its tones or root note change)
+    :param myscale: scale.Scale (or subclass)
+    :param roots: iterable of the root of each key, frequencies in Hz or
+                  note.Notes (default: equal steps of the period above the
+                  scale's root note, see equal_roots; the scale's edo keys
+                  for a ScaleEDO)
+    :param octaves: iterable of octave (period) numbers; a scale that
+                    doesn't repeat only has octave 0
+    :return: KeyTable, None if roots is None and the scale has no root note
+    """
+    if roots is None:
+        if myscale.root_note is None:
+            return None
+        roots = equal_roots(
+            myscale.root_note.freq, getattr(myscale, 'edo', KEYS),
+            myscale.period_cents or ratios.OCTAVE_CENTS)
+    roots = tuple(float(_freq(root)) for root in roots)
+    octaves = tuple(int(octave) for octave in octaves)
+    if myscale.period_cents is None:
+        octaves = (0,)
+    return myscale.cached(
+        ('key_table', roots, octaves),
+        lambda: _build_key_table(myscale, roots, octaves))
+
+
+def _build_key_table(myscale, roots, octaves):
+    """
+    Build the frequencies of a scale in many keys (see key_table)
+    :param myscale: scale.Scale (or subclass)
+    :param roots: tuple of root frequencies, in Hz
+    :param octaves: tuple of octave numbers
+    :return: KeyTable
+    """
+    cents, degrees = myscale.period_tones()
+    octaves = np.array(octaves, dtype=int)
+    all_cents = (
+        cents[:, np.newaxis] + octaves * (myscale.period_cents or 0))
+    roots = np.array(roots, dtype=float)
+    table = KeyTable(
+        roots=roots, degrees=degrees, octaves=octaves,
+        freq=roots[:, np.newaxis, np.newaxis] * 2.0 ** (
+            all_cents / ratios.OCTAVE_CENTS))
+    for values in table:
+        values.flags.writeable = False
+    return table
+
+
+def key_position(table, root, tolerance=KEY_TOLERANCE_CENTS):
+    """
+    Find the key of a table with a root
+    :param table: KeyTable
+    :param root: frequency in Hz, or note.Note
+    :param tolerance: largest distance from the key's root, in cents
+    :return: row of the key in the table, -1 if no key has the root
+    """
+    if not len(table.roots):
+        return -1
+    distance = np.abs(ratios.cents(table.roots, float(_freq(root))))
+    position = int(distance.argmin())
+    if distance[position] > tolerance:
+        return -1
+    return position
+
+
+def key_frequencies(table, root, tolerance=KEY_TOLERANCE_CENTS):
+    """
+    Frequencies of the scale in the key with a root
+    :param table: KeyTable
+    :param root: frequency in Hz, or note.Note
+    :param tolerance: largest distance from the key's root, in cents
+    :return: read-only numpy array (degrees, octaves) of frequencies in Hz,
+             None if no key of the table has the root
+    """
+    position = key_position(table, root, tolerance)
+    if position == -1:
+        return None
+    return table.freq[position]
@@ -1,6 +1,9 @@
 """
 MIDI utilities for 12-EDO tuning
 From https://en.wikipedia.org/wiki/Scientific_pitch_notation#Table_of_note_frequencies
+
+numpy and pandas are imported on first use by the array and DataFrame
+functions, so the scalar functions stay cheap to import.
 """
 
 __author__ = "Joel Luth"
@@ -11,26 +14,121 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
-from numpy import log2
-import pandas as pd
+from array import array
+from collections import namedtuple
+
+import lib.ratios as ratios
 
 CONCERT_A_HZ = 440
+MIDI_NOTES = 128
+NOTES_SHARP = ('C', 'C', 'D', 'D', 'E', 'F', 'F', 'G', 'G', 'A', 'A', 'B')
+NOTES_FLAT = ('C', 'D', 'D', 'E', 'E', 'F', 'G', 'G', 'A', 'A', 'B', 'B')
+ACCIDENTALS = (0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0)
+
+# Lookup table for every MIDI note, indexed by MIDI note number
+NoteTable = namedtuple('NoteTable', [
+    'concert_a_hz',  # reference pitch the table was built for
+    'freq',  # array('d'), frequency in Hz
+    'octave',  # array('b'), octave number
+    'piano_key',  # array('b'), piano key number
+    'halfstep',  # array('B'), half steps above C
+    'accidental',  # array('B'), 1 if the note is a sharp/flat
+    'name_sharp',  # tuple of names with sharps, eg 'C#4'
+    'name_flat',  # tuple of names with flats, eg 'Db4'
+])
+
+_note_table = None
+_notes_df = None
 
 
 def notes_df():
     """
     DataFrame of notes
+    The frame (and pandas) is loaded on first use and then shared,
+    so it is read-only (copy it before modifying)
     :return: dataframe
     """
-    notes_sharps = ['C', 'C', 'D', 'D', 'E', 'F', 'F', 'G', 'G', 'A', 'A', 'B']
-    accidentals = [0, 1, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0]
-    notes_flats = ['C', 'D', 'D', 'E', 'E', 'F', 'G', 'G', 'A', 'A', 'B', 'B']
-    return pd.DataFrame({
-        'halfstep': range(0, 12),
-        'note_sharp': notes_sharps,
-        'note_flat': notes_flats,
-        'accidental': accidentals
-    })
+    global _notes_df
+    if _notes_df is None:
+        import numpy as np
+        import pandas as pd
+
+        columns = {
+            'halfstep': np.arange(0, 12),
+            'note_sharp': np.array(NOTES_SHARP, dtype=object),
+            'note_flat': np.array(NOTES_FLAT, dtype=object),
+            'accidental': np.array(ACCIDENTALS),
+        }
+        for column in columns.values():
+            column.flags.writeable = False
+        _notes_df = pd.DataFrame(columns, copy=False)
+    return _notes_df
+
+
+def note_table():
+    """
+    Lookup table for all MIDI notes (0-127)
+    The table is built on first use, and rebuilt if CONCERT_A_HZ changes
+    :return: NoteTable
+    """
+    global _note_table
+    if _note_table is None or _note_table.concert_a_hz != CONCERT_A_HZ:
+        _note_table = _build_note_table(CONCERT_A_HZ)
+    return _note_table
+
+
+def _build_note_table(concert_a_hz):
+    """
+    Build the lookup table for all MIDI notes
+    :param concert_a_hz: frequency of A4 in Hz
+    :return: NoteTable
+    """
+    midi_notes = range(MIDI_NOTES)
+    octaves = [_octave_from_midi(midi_note) for midi_note in midi_notes]
+    halfsteps = [midi_note % 12 for midi_note in midi_notes]
+    return NoteTable(
+        concert_a_hz=concert_a_hz,
+        freq=array('d', [
+            _freq_from_midi(midi_note, concert_a_hz) for midi_note in midi_notes
+        ]),
+        octave=array('b', octaves),
+        piano_key=array('b', [midi_note - 20 for midi_note in midi_notes]),
+        halfstep=array('B', halfsteps),
+        accidental=array('B', [ACCIDENTALS[step] for step in halfsteps]),
+        name_sharp=tuple(
+            NOTES_SHARP[step] + '#' * ACCIDENTALS[step] + str(octave)
+            for step, octave in zip(halfsteps, octaves)
+        ),
+        name_flat=tuple(
+            NOTES_FLAT[step] + 'b' * ACCIDENTALS[step] + str(octave)
+            for step, octave in zip(halfsteps, octaves)
+        ),
+    )
+
+
+def _is_table_note(midi_note):
+    """
+    Check if a MIDI note number can be looked up in the note table
+    :param midi_note: MIDI note number
+    :return: True for an int from 0 to 127
+    """
+    return type(midi_note) is int and 0 <= midi_note < MIDI_NOTES
+
+
+def note_name_from_midi(midi_note, flat=False):
+    """
+    Note name (with octave) of a MIDI note number
+    :param midi_note: MIDI note number (0-127)
+    :param flat: name accidentals as flats instead of sharps
+    :return: note name, eg 'C#4' (or 'Db4' if flat),
+             None if not a MIDI note number
+    """
+    if not _is_table_note(midi_note):
+        return None
+    table = note_table()
+    if flat:
+        return table.name_flat[midi_note]
+    return table.name_sharp[midi_note]
 
 
 def octave_from_midi(midi_note):
@@ -39,6 +137,17 @@ def octave_from_midi(midi_note):
     :param midi_note: MIDI note number
     :return: octave number
     """
+    if _is_table_note(midi_note):
+        return note_table().octave[midi_note]
+    return _octave_from_midi(midi_note)
+
+
+def _octave_from_midi(midi_note):
+    """
+    Compute octave number from MIDI number (see octave_from_midi)
+    :param midi_note: MIDI note number
+    :return: octave number
+    """
     octave = None
     if midi_note >= 12:
         octave = int((midi_note / 12) - 1)
@@ -53,7 +162,19 @@ def freq_from_midi(midi_note):
     :param midi_note: MIDI note number
     :return: frequency in Hz
     """
-    return CONCERT_A_HZ * 2 ** ((midi_note - 69) / 12)
+    if _is_table_note(midi_note):
+        return note_table().freq[midi_note]
+    return _freq_from_midi(midi_note, CONCERT_A_HZ)
+
+
+def _freq_from_midi(midi_note, concert_a_hz):
+    """
+    Compute frequency of MIDI note (see freq_from_midi)
+    :param midi_note: MIDI note number
+    :param concert_a_hz: frequency of A4 in Hz
+    :return: frequency in Hz
+    """
+    return concert_a_hz * 2 ** ((midi_note - 69) / 12)
 
 
 def midi_from_freq(freq_hz):
@@ -62,7 +183,7 @@ def midi_from_freq(freq_hz):
     :param freq_hz: frequency in Hz
     :return: MIDI note number (float, may need rounding by caller)
     """
-    return 12 * log2(freq_hz / CONCERT_A_HZ) + 69
+    return 12 * ratios.log2(freq_hz / CONCERT_A_HZ) + 69
 
 
 def piano_key_from_midi(midi_note):
@@ -72,3 +193,86 @@ def piano_key_from_midi(midi_note):
     :return: piano key number
     """
     return midi_note - 20
+
+
+def _midi_array(midi_notes):
+    """
+    Get MIDI note numbers as a numpy array wide enough for the arithmetic
+    :param midi_notes: MIDI note numbers (numpy array, buffer or iterable)
+    :return: numpy int64 array for integer input (eg array('B') or bytes),
+             float64 array otherwise
+    """
+    import numpy as np
+    import lib.arrays as arrays
+
+    midi_notes = arrays.as_array(midi_notes)
+    if midi_notes.dtype.kind in 'iub':
+        return midi_notes.astype(np.int64, copy=False)
+    return midi_notes.astype(np.float64, copy=False)
+
+
+def _is_table_array(midi_notes):
+    """
+    Check if an array of MIDI note numbers can be looked up in the note table
+    :param midi_notes: numpy array of MIDI note numbers
+    :return: True for a non-empty integer array, all values from 0 to 127
+    """
+    return (
+        midi_notes.dtype.kind in 'iu' and midi_notes.size > 0
+        and midi_notes.min() >= 0 and midi_notes.max() < MIDI_NOTES
+    )
+
+
+def octave_from_midi_array(midi_notes):
+    """
+    Get octave numbers from MIDI numbers
+    :param midi_notes: MIDI note numbers (numpy array, buffer or iterable)
+    :return: numpy masked int array of octave numbers,
+             masked where octave_from_midi would return None
+    """
+    import numpy as np
+
+    midi_notes = _midi_array(midi_notes)
+    if _is_table_array(midi_notes):
+        octaves = np.frombuffer(note_table().octave, dtype=np.int8)
+        return np.ma.masked_array(octaves[midi_notes].astype(int), mask=False)
+    valid = midi_notes >= 0
+    octaves = np.where(valid, np.floor(midi_notes / 12 - 1), -1)
+    return np.ma.masked_array(octaves.astype(int), mask=~valid)
+
+
+def freq_from_midi_array(midi_notes):
+    """
+    Frequencies of MIDI notes
+    :param midi_notes: MIDI note numbers (numpy array, buffer or iterable)
+    :return: numpy array of frequencies in Hz
+    """
+    import numpy as np
+
+    midi_notes = _midi_array(midi_notes)
+    if _is_table_array(midi_notes):
+        return np.frombuffer(note_table().freq)[midi_notes]
+    return CONCERT_A_HZ * 2.0 ** ((midi_notes - 69) / 12)
+
+
+def midi_from_freq_array(freqs_hz):
+    """
+    MIDI note numbers for frequencies
+    :param freqs_hz: frequencies in Hz (numpy array, buffer or iterable)
+    :return: numpy array of MIDI note numbers (float, may need rounding)
+    """
+    import numpy as np
+    import lib.arrays as arrays
+
+    freqs_hz = arrays.as_array(freqs_hz, dtype=np.float64)
+    return 12 * np.log2(freqs_hz / CONCERT_A_HZ) + 69
+
+
+def piano_key_from_midi_array(midi_notes):
+    """
+    Piano key numbers for MIDI note numbers
+    :param midi_notes: MIDI note numbers (numpy array, buffer or iterable)
+    :return: numpy array of piano key numbers
+    """
+    midi_notes = _midi_array(midi_notes)
+    return midi_notes - 20
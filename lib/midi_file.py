@@ -0,0 +1,489 @@
+"""
+midi_file.py
+Read and write Standard MIDI Files (SMF), one event at a time
+See https://www.midi.org/specifications (Standard MIDI Files 1.0)
+
+Tracks are read as generators of events, and written from any iterable of
+events, so a file can be passed through a pipeline of generators (eg one
+of the retuning stages below) holding only a small read buffer in memory,
+whatever the size of the file. Tracks must be read in file order: moving
+on to the next track skips what is left of the current one.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import struct
+from collections import namedtuple
+
+import lib.midi_tuning as midi_tuning
+
+HEADER_CHUNK = b'MThd'
+TRACK_CHUNK = b'MTrk'
+HEADER_SIZE = 6
+# bytes read from (or written to) the file at a time
+BLOCK_SIZE = 1 << 16
+CHANNELS = 16
+
+# status bytes (channel messages are or'ed with the channel, 0-15)
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+POLY_PRESSURE = 0xA0
+CONTROL_CHANGE = 0xB0
+PROGRAM_CHANGE = 0xC0
+CHANNEL_PRESSURE = 0xD0
+PITCH_BEND = 0xE0
+SYSEX = 0xF0
+SYSEX_ESCAPE = 0xF7
+META = 0xFF
+# meta event types
+END_OF_TRACK = 0x2F
+TRACK_NAME = 0x03
+
+# number of data bytes of each channel message
+DATA_SIZES = {
+    NOTE_OFF: 2, NOTE_ON: 2, POLY_PRESSURE: 2, CONTROL_CHANGE: 2,
+    PROGRAM_CHANGE: 1, CHANNEL_PRESSURE: 1, PITCH_BEND: 2,
+}
+
+# The header chunk: format (0, 1 or 2), number of tracks, and division
+# (ticks per quarter note, or SMPTE timing if negative)
+Header = namedtuple('Header', ['format', 'tracks', 'division'])
+
+# A track event: delta time in ticks since the previous event, status byte,
+# data bytes (without status or length), and the type of a META event
+Event = namedtuple(
+    'Event', ['delta', 'status', 'data', 'meta_type'], defaults=(None,))
+
+
+class _ChunkReader(object):
+    """
+    Class to read the bytes of one chunk of a file, a block at a time
+    """
+    def __init__(self, fileobj, size):
+        """
+        Constructor
+        :param fileobj: binary file object, positioned at the chunk data
+        :param size: size of the chunk data in bytes
+        """
+        self.__file = fileobj
+        self.__left = size
+        self.__buffer = b''
+        self.__position = 0
+
+    def __fill(self, size):
+        """
+        Read more of the chunk, so at least size bytes are buffered
+        :param size: number of bytes needed
+        Raises ValueError if the chunk (or file) ends first
+        """
+        pending = self.__buffer[self.__position:]
+        while len(pending) < size:
+            block = b''
+            if self.__left:
+                block = self.__file.read(min(BLOCK_SIZE, self.__left))
+            if not block:
+                raise ValueError('truncated MIDI track')
+            self.__left -= len(block)
+            pending += block
+        self.__buffer = pending
+        self.__position = 0
+
+    def at_end(self):
+        """
+        Check if the whole chunk has been read
+        :return: True if no bytes are left
+        """
+        return self.__position == len(self.__buffer) and not self.__left
+
+    def read(self, size):
+        """
+        Read bytes of the chunk
+        :param size: number of bytes
+        :return: bytes
+        """
+        if self.__position + size > len(self.__buffer):
+            self.__fill(size)
+        data = self.__buffer[self.__position:self.__position + size]
+        self.__position += size
+        return data
+
+    def byte(self):
+        """
+        Read one byte of the chunk
+        :return: the byte value
+        """
+        if self.__position == len(self.__buffer):
+            self.__fill(1)
+        value = self.__buffer[self.__position]
+        self.__position += 1
+        return value
+
+    def varlen(self):
+        """
+        Read a variable length quantity (7 bits per byte, high bit set on
+        all but the last byte)
+        :return: the value
+        """
+        value = 0
+        while True:
+            byte = self.byte()
+            value = (value << 7) | (byte & 0x7F)
+            if byte < 0x80:
+                return value
+
+    def skip(self):
+        """
+        Skip the rest of the chunk
+        """
+        self.__buffer = b''
+        self.__position = 0
+        while self.__left:
+            block = self.__file.read(min(BLOCK_SIZE, self.__left))
+            if not block:
+                break
+            self.__left -= len(block)
+
+
+def _read_chunk_header(fileobj):
+    """
+    Read the type and size of the next chunk of a file
+    :param fileobj: binary file object
+    :return: tuple (chunk type, size), None at the end of the file
+    Raises ValueError if the file ends inside the chunk header
+    """
+    data = fileobj.read(8)
+    if not data:
+        return None
+    if len(data) < 8:
+        raise ValueError('truncated MIDI chunk')
+    return data[:4], struct.unpack('>I', data[4:])[0]
+
+
+def read_header(fileobj):
+    """
+    Read the header chunk of a MIDI file
+    :param fileobj: binary file object, at the start of the file
+    :return: Header
+    Raises ValueError if the file isn't a MIDI file
+    """
+    chunk = _read_chunk_header(fileobj)
+    if chunk is None or chunk[0] != HEADER_CHUNK or chunk[1] < HEADER_SIZE:
+        raise ValueError('not a MIDI file')
+    reader = _ChunkReader(fileobj, chunk[1])
+    header = Header(*struct.unpack('>HHh', reader.read(HEADER_SIZE)))
+    reader.skip()
+    return header
+
+
+def _iter_events(reader):
+    """
+    Read the events of a track chunk
+    :param reader: _ChunkReader for the track
+    :return: generator of Events, up to and including the end of track
+    Raises ValueError for invalid event data
+    """
+    status = None
+    while not reader.at_end():
+        delta = reader.varlen()
+        first = reader.byte()
+        if first == META:
+            meta_type = reader.byte()
+            status = None
+            yield Event(delta, META, reader.read(reader.varlen()), meta_type)
+            if meta_type == END_OF_TRACK:
+                return
+        elif first in (SYSEX, SYSEX_ESCAPE):
+            status = None
+            yield Event(delta, first, reader.read(reader.varlen()))
+        elif first < SYSEX:
+            if first >= NOTE_OFF:
+                status = first
+                data = reader.read(DATA_SIZES[status & 0xF0])
+            elif status is None:
+                raise ValueError('MIDI data byte without status')
+            else:
+                # running status: the status byte of the previous event
+                data = bytes((first,)) + reader.read(
+                    DATA_SIZES[status & 0xF0] - 1)
+            yield Event(delta, status, data)
+        else:
+            raise ValueError('invalid MIDI status {0:#x}'.format(first))
+
+
+def _iter_tracks(fileobj):
+    """
+    Read the track chunks of a MIDI file, skipping unknown chunks
+    :param fileobj: binary file object, after the header chunk
+    :return: generator of track event generators (see _iter_events)
+    """
+    while True:
+        chunk = _read_chunk_header(fileobj)
+        if chunk is None:
+            return
+        reader = _ChunkReader(fileobj, chunk[1])
+        if chunk[0] == TRACK_CHUNK:
+            yield _iter_events(reader)
+        reader.skip()
+
+
+def read_midi(fileobj):
+    """
+    Read a MIDI file, lazily
+    :param fileobj: binary file object, at the start of the file
+    :return: tuple (Header, generator of tracks), each track a generator
+             of Events; read the tracks in order, while the file is open
+    Raises ValueError if the file isn't a MIDI file
+    """
+    return read_header(fileobj), _iter_tracks(fileobj)
+
+
+def _varlen_bytes(value):
+    """
+    Encode a variable length quantity
+    :param value: non-negative integer
+    :return: bytes
+    """
+    data = bytearray((value & 0x7F,))
+    value >>= 7
+    while value:
+        data.insert(0, (value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(data)
+
+
+def event_bytes(event, running_status=None):
+    """
+    Encode an event as it is stored in a track chunk
+    :param event: Event
+    :param running_status: status of the previous channel message, if the
+                           running status can continue (None otherwise)
+    :return: tuple (bytes, running status after this event)
+    """
+    delta = _varlen_bytes(event.delta)
+    if event.status == META:
+        return delta + bytes((META, event.meta_type)) + _varlen_bytes(
+            len(event.data)) + bytes(event.data), None
+    if event.status in (SYSEX, SYSEX_ESCAPE):
+        return delta + bytes((event.status,)) + _varlen_bytes(
+            len(event.data)) + bytes(event.data), None
+    if event.status == running_status:
+        return delta + bytes(event.data), running_status
+    return delta + bytes((event.status,)) + bytes(event.data), event.status
+
+
+def _seekable(fileobj):
+    """
+    Check if a file can be written out of order
+    :param fileobj: binary file object
+    :return: True if the file is seekable
+    """
+    return getattr(fileobj, 'seekable', lambda: False)()
+
+
+def write_track(fileobj, events):
+    """
+    Write a track chunk, adding an end of track event if there is none
+    The chunk size is filled in afterwards, so only a block of the track is
+    held in memory; a file that can't seek gets the whole track buffered.
+    :param fileobj: binary file object
+    :param events: iterable of Events (events after an end of track are
+                   not written)
+    """
+    seekable = _seekable(fileobj)
+    if seekable:
+        start = fileobj.tell()
+        fileobj.write(TRACK_CHUNK + bytes(4))
+    data = bytearray()
+    size = 0
+    running_status = None
+    ended = False
+    for event in events:
+        encoded, running_status = event_bytes(event, running_status)
+        data += encoded
+        if event.status == META and event.meta_type == END_OF_TRACK:
+            ended = True
+            break
+        if seekable and len(data) >= BLOCK_SIZE:
+            fileobj.write(data)
+            size += len(data)
+            data = bytearray()
+    if not ended:
+        data += event_bytes(Event(0, META, b'', END_OF_TRACK))[0]
+    size += len(data)
+    if seekable:
+        fileobj.write(data)
+        end = fileobj.tell()
+        fileobj.seek(start + len(TRACK_CHUNK))
+        fileobj.write(struct.pack('>I', size))
+        fileobj.seek(end)
+    else:
+        fileobj.write(TRACK_CHUNK + struct.pack('>I', size) + data)
+
+
+def write_midi(fileobj, header, tracks):
+    """
+    Write a MIDI file
+    :param fileobj: binary file object
+    :param header: Header (the number of tracks written must match, unless
+                   the file is seekable, when it is corrected)
+    :param tracks: iterable of tracks, each an iterable of Events
+    Raises ValueError if the number of tracks doesn't match the header
+    """
+    seekable = _seekable(fileobj)
+    if seekable:
+        start = fileobj.tell()
+    fileobj.write(HEADER_CHUNK + struct.pack('>IHHh', HEADER_SIZE, *header))
+    count = 0
+    for events in tracks:
+        write_track(fileobj, events)
+        count += 1
+    if count == header.tracks:
+        return
+    if not seekable:
+        raise ValueError('header has {0} tracks, {1} written'.format(
+            header.tracks, count))
+    end = fileobj.tell()
+    fileobj.seek(start + len(HEADER_CHUNK) + 6)
+    fileobj.write(struct.pack('>H', count))
+    fileobj.seek(end)
+
+
+def retune_bends(
+        events, myscale, mapping=midi_tuning.NEAREST,
+        bend_range=midi_tuning.PITCH_BEND_RANGE):
+    """
+    Retuning stage: play each note as a 12-EDO note with a pitch bend,
+    sending a pitch bend before a note on when the channel needs a new one
+    (so notes sounding together on one channel share a bend: use one
+    channel per voice, or retune_mts, for chords)
+    :param events: iterable of Events of one track
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: scala.KeyboardMapping, or midi_tuning.NEAREST to move
+                    each note to the nearest scale tone (see midi_tuning)
+    :param bend_range: pitch bend range of the instrument, in semitones
+    :return: generator of Events (notes on unmapped keys are dropped),
+             None if the scale can't be mapped
+    """
+    table = midi_tuning.pitch_bend_table(
+        myscale, mapping, bend_range=bend_range)
+    if table is None:
+        return None
+    return _retune_bends(events, table.note.tolist(), table.bend.tolist())
+
+
+def _retune_bends(events, notes, bends):
+    """
+    Retune notes with pitch bends (see retune_bends)
+    :param events: iterable of Events
+    :param notes: list of the note to play for each key, -1 if unmapped
+    :param bends: list of the pitch bend for each key
+    :return: generator of Events
+    """
+    channel_bends = [None] * CHANNELS
+    delta = 0
+    for event in events:
+        delta += event.delta
+        kind = event.status & 0xF0
+        if event.status >= SYSEX or kind not in (
+                NOTE_OFF, NOTE_ON, POLY_PRESSURE, PITCH_BEND):
+            yield event._replace(delta=delta)
+            delta = 0
+            continue
+        channel = event.status & 0x0F
+        if kind == PITCH_BEND:
+            # a bend in the input detunes the retuned notes, so send the
+            # retuning bend again with the next note
+            channel_bends[channel] = None
+            yield event._replace(delta=delta)
+            delta = 0
+            continue
+        key = event.data[0]
+        if notes[key] < 0:
+            continue
+        if kind == NOTE_ON and event.data[1] and (
+                channel_bends[channel] != bends[key]):
+            bend = channel_bends[channel] = bends[key]
+            yield Event(
+                delta, PITCH_BEND | channel, bytes((bend & 0x7F, bend >> 7)))
+            delta = 0
+        yield event._replace(
+            delta=delta, data=bytes((notes[key],)) + event.data[1:])
+        delta = 0
+
+
+def retune_mts(
+        events, myscale, mapping=midi_tuning.NEAREST, program=0, name=''):
+    """
+    Retuning stage: send an MTS bulk tuning dump before the events
+    (put it in the first track; the notes themselves are not changed)
+    :param events: iterable of Events
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: scala.KeyboardMapping, or midi_tuning.NEAREST
+    :param program: tuning program number
+    :param name: tuning name
+    :return: generator of Events, None if the scale can't be mapped
+    """
+    dump = midi_tuning.mts_bulk_dump(
+        myscale, mapping, program=program, name=name)
+    if dump is None:
+        return None
+    return _prepend(Event(0, SYSEX, dump[1:]), events)
+
+
+def _prepend(first, events):
+    """
+    Generate an event, then more events
+    :param first: the first Event
+    :param events: iterable of the other Events
+    :return: generator of Events
+    """
+    yield first
+    yield from events
+
+
+def retune_midi(
+        src_path, dst_path, myscale, mts=False, mapping=midi_tuning.NEAREST,
+        bend_range=midi_tuning.PITCH_BEND_RANGE):
+    """
+    Retune a MIDI file to a scale, streaming it from one file to another
+    :param src_path: path of the MIDI file to read
+    :param dst_path: path of the MIDI file to write
+    :param myscale: scale.Scale (or subclass)
+    :param mts: retune with an MTS bulk dump instead of pitch bends
+    :param mapping: scala.KeyboardMapping, or midi_tuning.NEAREST
+    :param bend_range: pitch bend range of the instrument, in semitones
+    :return: 0 on success, -1 if the scale can't be mapped
+    Raises ValueError if the source isn't a valid MIDI file
+    """
+    if midi_tuning.tuning_table(myscale, mapping) is None:
+        return -1
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        header, tracks = read_midi(src)
+        write_midi(dst, header, _retune_tracks(
+            tracks, myscale, mts, mapping, bend_range))
+    return 0
+
+
+def _retune_tracks(tracks, myscale, mts, mapping, bend_range):
+    """
+    Add a retuning stage to the tracks of a file (see retune_midi)
+    :param tracks: iterable of tracks, each an iterable of Events
+    :param myscale: scale.Scale (or subclass), that can be mapped
+    :param mts: retune with an MTS bulk dump in the first track
+    :param mapping: scala.KeyboardMapping, or midi_tuning.NEAREST
+    :param bend_range: pitch bend range, in semitones
+    :return: generator of tracks
+    """
+    for number, events in enumerate(tracks):
+        if not mts:
+            yield retune_bends(events, myscale, mapping, bend_range)
+        elif number == 0:
+            yield retune_mts(events, myscale, mapping)
+        else:
+            yield events
@@ -0,0 +1,299 @@
+"""
+midi_tuning.py
+Retuning tables to play a scale on MIDI instruments
+
+A keyboard mapping (see scala.KeyboardMapping) assigns a scale degree to
+each of the 128 MIDI keys; alternatively (NEAREST) each key is retuned from
+its 12-EDO pitch to the nearest scale tone, which snaps music written for
+12-EDO onto the scale. The tables give, for every key, the frequency
+it should sound, either as MIDI Tuning Standard (MTS) frequency data for a
+bulk tuning dump, or as a pitch bend from the nearest 12-EDO note.
+See https://www.midi.org/specifications (MIDI Tuning Updated Specification)
+
+Each table is computed for all keys at once with numpy, and cached on the
+scale until its tones or root note change.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+from collections import namedtuple
+
+import numpy as np
+
+import lib.midi_12edo as midi_12edo
+import lib.ratios as ratios
+import lib.scala as scala
+
+# MTS frequency data: 14-bit fraction of a semitone
+MTS_FRACTION = 1 << 14
+# MTS frequency data is absolute: note 69 is always at 440 Hz, whatever
+# midi_12edo.CONCERT_A_HZ is
+MTS_REFERENCE_NOTE = 69
+MTS_REFERENCE_HZ = 440.0
+# MTS frequency data for "no change" (unmapped keys)
+MTS_NO_CHANGE = (0x7F, 0x7F, 0x7F)
+MTS_NAME_SIZE = 16
+# Universal non-real time, MIDI tuning standard, bulk dump reply
+MTS_BULK_DUMP_HEADER = (0xF0, 0x7E)
+MTS_BULK_DUMP_ID = (0x08, 0x01)
+SYSEX_END = 0xF7
+ALL_DEVICES = 0x7F
+# 14-bit pitch bend values
+PITCH_BEND_CENTER = 1 << 13
+PITCH_BEND_MAX = (1 << 14) - 1
+# Default pitch bend range of most instruments, in semitones
+PITCH_BEND_RANGE = 2
+# Mapping that retunes each key to the scale tone nearest its 12-EDO pitch
+NEAREST = 'nearest'
+
+# Tuning of every MIDI key, as read-only numpy arrays indexed by key
+TuningTable = namedtuple('TuningTable', [
+    'freq',  # frequency in Hz, nan for unmapped keys
+    'cents',  # cents above the scale root, nan for unmapped keys
+    'degree',  # scale degree, 0 for unmapped keys
+    'mapped',  # True if the key is mapped to a scale degree
+])
+
+# Pitch bends to retune every MIDI key, as read-only numpy arrays
+PitchBendTable = namedtuple('PitchBendTable', [
+    'note',  # 12-EDO MIDI note to play, -1 for unmapped keys
+    'bend',  # 14-bit pitch bend value (PITCH_BEND_CENTER for no bend)
+])
+
+
+def _mapping_tones(myscale):
+    """
+    Tones of one period of a scale, as a keyboard mapping counts degrees
+    A repeating scale repeats by its period; other scales use their
+    highest tone as the period, as Scala files do
+    :param myscale: scale.Scale (or subclass)
+    :return: tuple (numpy array of cents, numpy array of degrees, period),
+             None if the scale has no tones to map
+    """
+    period = myscale.period_cents
+    if period is None:
+        tones = np.array(myscale.tones, dtype=float)
+        if len(tones) < 2:
+            return None
+        return tones[:-1], np.arange(1, len(tones)), tones[-1] - tones[0]
+    cents, degrees = myscale.period_tones()
+    if not len(cents):
+        return None
+    return cents, degrees, period
+
+
+def tuning_table(myscale, mapping=None):
+    """
+    Tuning of every MIDI key for a scale
+    With a keyboard mapping, the scale root sounds at the mapping's middle
+    note; a scale without a root note is tuned so the mapping's reference
+    note has its reference frequency, as Scala does
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: scala.KeyboardMapping (default scala.linear_mapping()),
+                    or NEAREST (for the 12-EDO pitches at
+                    midi_12edo.CONCERT_A_HZ)
+    :return: TuningTable, None if the scale can't be mapped (no tones, or
+             no root note and the reference note is unmapped or the
+             mapping is NEAREST)
+    """
+    if mapping is None:
+        mapping = scala.linear_mapping()
+    key = ('tuning_table', mapping)
+    build = _build_tuning_table
+    if mapping == NEAREST:
+        # the 12-EDO pitches of the keys depend on the reference pitch
+        key += (midi_12edo.CONCERT_A_HZ,)
+        build = _build_nearest_table
+    return myscale.cached(key, lambda: build(myscale, mapping))
+
+
+def _build_nearest_table(myscale, mapping):
+    """
+    Build the tuning of every MIDI key as the scale tone nearest to its
+    12-EDO pitch (see tuning_table)
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: NEAREST
+    :return: TuningTable, None if the scale has no tones or root note
+    """
+    freqs = midi_12edo.freq_from_midi_array(np.arange(midi_12edo.MIDI_NOTES))
+    quantized = myscale.quantize(freqs)
+    if quantized is None:
+        return None
+    cents = ratios.cents(myscale.root_note.freq, freqs) - quantized.deviation
+    table = TuningTable(
+        freq=freqs / ratios.freq_ratio(quantized.deviation),
+        cents=cents,
+        degree=quantized.degree,
+        mapped=np.ones(len(freqs), dtype=bool))
+    for values in table:
+        values.flags.writeable = False
+    return table
+
+
+def _build_tuning_table(myscale, mapping):
+    """
+    Build the tuning of every MIDI key (see tuning_table)
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: scala.KeyboardMapping
+    :return: TuningTable, None if the scale can't be mapped
+    """
+    tones = _mapping_tones(myscale)
+    if tones is None:
+        return None
+    cents, degrees, period = tones
+    count = len(cents)
+    keys = np.arange(midi_12edo.MIDI_NOTES)
+    steps = keys - mapping.middle_note
+    if mapping.size:
+        patterns, slots = np.divmod(steps, mapping.size)
+        pattern_degrees = np.array(
+            [-1 if key is None else key for key in mapping.keys], dtype=int)
+        steps = pattern_degrees[slots]
+        mapped = steps >= 0
+        octave_degree = mapping.octave_degree or count
+        pattern_cents = (
+            octave_degree // count * period + cents[octave_degree % count])
+    else:
+        patterns = np.zeros(len(keys), dtype=int)
+        mapped = np.ones(len(keys), dtype=bool)
+        pattern_cents = 0
+    key_cents = (
+        patterns * pattern_cents + steps // count * period
+        + cents[steps % count])
+    key_cents[~mapped] = np.nan
+    if myscale.root_note is not None:
+        root_hz = myscale.root_note.freq
+    else:
+        if not mapped[mapping.reference_note]:
+            return None
+        root_hz = mapping.reference_freq / ratios.freq_ratio(
+            key_cents[mapping.reference_note])
+    mapped &= (keys >= mapping.first_note) & (keys <= mapping.last_note)
+    key_cents[~mapped] = np.nan
+    table = TuningTable(
+        freq=root_hz * 2.0 ** (key_cents / ratios.OCTAVE_CENTS),
+        cents=key_cents,
+        degree=np.where(mapped, degrees[steps % count], 0),
+        mapped=mapped)
+    for values in table:
+        values.flags.writeable = False
+    return table
+
+
+def mts_frequency_data(myscale, mapping=None):
+    """
+    MTS frequency data for every MIDI key: a 12-EDO note number and a
+    14-bit fraction of a semitone above it
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: scala.KeyboardMapping (default scala.linear_mapping()),
+                    or NEAREST
+    :return: read-only numpy uint8 array (128, 3), MTS_NO_CHANGE for
+             unmapped keys; None if the scale can't be mapped
+    """
+    if mapping is None:
+        mapping = scala.linear_mapping()
+    table = tuning_table(myscale, mapping)
+    if table is None:
+        return None
+    return myscale.cached(
+        ('mts_frequency_data', mapping, midi_12edo.CONCERT_A_HZ),
+        lambda: _build_mts_frequency_data(table))
+
+
+def _build_mts_frequency_data(table):
+    """
+    Build MTS frequency data from a tuning table (see mts_frequency_data)
+    :param table: TuningTable
+    :return: read-only numpy uint8 array (128, 3)
+    """
+    with np.errstate(invalid='ignore'):
+        midi = MTS_REFERENCE_NOTE + ratios.cents(
+            MTS_REFERENCE_HZ, table.freq) / (ratios.OCTAVE_CENTS / 12)
+    steps = np.rint(np.nan_to_num(midi) * MTS_FRACTION).astype(np.int64)
+    # the highest value is reserved for "no change"
+    steps = np.clip(steps, 0, (midi_12edo.MIDI_NOTES * MTS_FRACTION) - 2)
+    notes, fractions = np.divmod(steps, MTS_FRACTION)
+    data = np.stack(
+        (notes, fractions >> 7, fractions & 0x7F), axis=1).astype(np.uint8)
+    data[~table.mapped] = MTS_NO_CHANGE
+    data.flags.writeable = False
+    return data
+
+
+def mts_bulk_dump(
+        myscale, mapping=None, program=0, name='', device_id=ALL_DEVICES):
+    """
+    MTS bulk tuning dump (system exclusive message) for a scale
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: scala.KeyboardMapping (default scala.linear_mapping()),
+                    or NEAREST
+    :param program: tuning program number (0-127)
+    :param name: tuning name (ASCII, up to 16 characters)
+    :param device_id: device ID (0-127, default all devices)
+    :return: bytes of the message, from 0xF0 to 0xF7
+             None if the scale can't be mapped
+    Raises ValueError if program or device_id is not from 0 to 127, or the
+    name is not ASCII
+    """
+    for field, value in (('program', program), ('device_id', device_id)):
+        if not isinstance(value, int) or not 0 <= value <= 0x7F:
+            raise ValueError('{0} must be from 0 to 127'.format(field))
+    data = mts_frequency_data(myscale, mapping)
+    if data is None:
+        return None
+    name = name.encode('ascii')[:MTS_NAME_SIZE].ljust(MTS_NAME_SIZE)
+    body = (
+        bytes((MTS_BULK_DUMP_HEADER[1], device_id) + MTS_BULK_DUMP_ID)
+        + bytes((program,)) + name + data.tobytes())
+    checksum = np.bitwise_xor.reduce(np.frombuffer(body, dtype=np.uint8))
+    return (
+        bytes(MTS_BULK_DUMP_HEADER[:1]) + body
+        + bytes((int(checksum) & 0x7F, SYSEX_END)))
+
+
+def pitch_bend_table(myscale, mapping=None, bend_range=PITCH_BEND_RANGE):
+    """
+    12-EDO note and pitch bend to play each MIDI key of a scale
+    (for instruments without MTS; each sounding note needs its own channel)
+    :param myscale: scale.Scale (or subclass)
+    :param mapping: scala.KeyboardMapping (default scala.linear_mapping()),
+                    or NEAREST
+    :param bend_range: pitch bend range of the instrument, in semitones
+    :return: PitchBendTable, None if the scale can't be mapped
+    """
+    if mapping is None:
+        mapping = scala.linear_mapping()
+    table = tuning_table(myscale, mapping)
+    if table is None:
+        return None
+    return myscale.cached(
+        ('pitch_bend_table', mapping, bend_range, midi_12edo.CONCERT_A_HZ),
+        lambda: _build_pitch_bend_table(table, bend_range))
+
+
+def _build_pitch_bend_table(table, bend_range):
+    """
+    Build the pitch bend of every MIDI key (see pitch_bend_table)
+    :param table: TuningTable
+    :param bend_range: pitch bend range, in semitones
+    :return: PitchBendTable
+    """
+    with np.errstate(invalid='ignore'):
+        midi = np.nan_to_num(midi_12edo.midi_from_freq_array(table.freq))
+    notes = np.clip(np.rint(midi), 0, midi_12edo.MIDI_NOTES - 1)
+    bends = np.rint(
+        PITCH_BEND_CENTER + (midi - notes) / bend_range * PITCH_BEND_CENTER)
+    result = PitchBendTable(
+        note=np.where(table.mapped, notes, -1).astype(int),
+        bend=np.where(
+            table.mapped, np.clip(bends, 0, PITCH_BEND_MAX),
+            PITCH_BEND_CENTER).astype(int))
+    for values in result:
+        values.flags.writeable = False
+    return result
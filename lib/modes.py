@@ -0,0 +1,108 @@
+"""
+modes.py
+Rotations (modes) of scales
+
+A rotation of a scale re-roots the scale on one of its degrees, keeping its
+steps in order: the second rotation of the major scale is the dorian mode.
+The rotations of a scale are computed together, as a matrix of tones.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+
+# Rotations whose tones agree to this many decimal places (of cents)
+# are treated as the same mode
+DEDUPE_DECIMALS = 6
+
+
+def rotation_matrix(tones, period):
+    """
+    Tones of every rotation of one or many scales, in one pass
+    :param tones: array (..., n) of the sorted tones of one period of each
+                  scale, in cents (normally starting with the root, 0)
+    :param period: period of the scales in cents (number, or array (...))
+    :return: numpy array (..., n, n), where [..., r, k] is tone k of the
+             rotation starting on degree r + 1, in cents above that degree
+    """
+    tones = np.asarray(tones, dtype=float)
+    period = np.asarray(period, dtype=float)[..., np.newaxis, np.newaxis]
+    count = tones.shape[-1]
+    index = np.arange(count)[:, np.newaxis] + np.arange(count)
+    wrapped = tones[..., index % count] + period * (index // count)
+    return wrapped - tones[..., :, np.newaxis]
+
+
+def unique_rows(matrix):
+    """
+    Positions of the distinct rows of a rotation matrix
+    (a symmetric scale, eg the whole tone scale, repeats its rotations)
+    :param matrix: numpy array (rows, n)
+    :return: sorted numpy array of the positions of first occurrences
+    """
+    if not len(matrix):
+        return np.arange(0)
+    _, first = np.unique(
+        np.round(matrix, DEDUPE_DECIMALS), axis=0, return_index=True)
+    return np.sort(first)
+
+
+def scale_rotation_tones(scale, unique=True):
+    """
+    Tones of every rotation of a scale
+    A repeating scale (eg ScaleOctave) rotates within its period; other
+    scales use their highest tone as the period, as Scala files do
+    :param scale: scale.Scale (or subclass)
+    :param unique: leave out repeats of earlier rotations
+    :return: tuple (numpy array (rotations, tones) of cents above the degree
+             each rotation starts on, numpy array of those degrees)
+    """
+    tones = np.array(scale.tones, dtype=float)
+    period = scale.period_cents
+    if period is None:
+        if len(tones) < 2:
+            return tones[np.newaxis, :], np.ones(1, dtype=int)
+        base, degrees = tones[:-1], np.arange(1, len(tones))
+        period = tones[-1] - tones[0]
+        with_period = True
+    else:
+        base, degrees = scale.period_tones()
+        with_period = len(base) < len(tones)
+    matrix = rotation_matrix(base, period)
+    if with_period:
+        matrix = np.concatenate(
+            (matrix, np.full((len(base), 1), period)), axis=1)
+    if unique:
+        keep = unique_rows(matrix)
+        matrix, degrees = matrix[keep], degrees[keep]
+    return matrix, degrees
+
+
+def iter_rotations(scale, unique=True):
+    """
+    Lazily generate the rotations of a scale, as scales of the same class
+    and root note (so these are the parallel modes, eg C dorian for C major)
+    :param scale: scale.Scale (or subclass)
+    :param unique: leave out repeats of earlier rotations
+    :return: generator of (degree, scale) tuples, degree being the degree
+             of the original scale the rotation starts on
+    """
+    matrix, degrees = scale_rotation_tones(scale, unique=unique)
+    for degree, tones in zip(degrees.tolist(), matrix.tolist()):
+        yield degree, scale.with_tones(tones)
+
+
+def rotations(scale, unique=True):
+    """
+    The rotations of a scale (see iter_rotations)
+    :param scale: scale.Scale (or subclass)
+    :param unique: leave out repeats of earlier rotations
+    :return: list of scales, one per (distinct) rotation
+    """
+    return [mode for _, mode in iter_rotations(scale, unique=unique)]
@@ -12,12 +12,18 @@ __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
 MAX_FREQ_HZ = 100 * 1000
+# lower edge of human hearing
+MIN_AUDIBLE_HZ = 20
+FREQ_ERROR_FORMAT = "frequency Hz must be between {0} and {1}"
 
 
 class Note(object):
     """
     CLass to define a musical note
     """
+    # no per-note __dict__, notes are created by the million
+    __slots__ = ('__freq',)
+
     def __init__(self, freq_hz):
         """
         Constructor
@@ -45,5 +51,4 @@ class Note(object):
         if 0 < freq_hz <= MAX_FREQ_HZ:
             self.__freq = freq_hz
         else:
-            raise ValueError("frequency Hz must be between {0} and {1}".format(
-                0, MAX_FREQ_HZ))
+            raise ValueError(FREQ_ERROR_FORMAT.format(0, MAX_FREQ_HZ))
@@ -0,0 +1,107 @@
+"""
+note_array.py
+A compact container for many musical notes,
+backed by a single numpy array of frequencies
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+
+import lib.arrays as arrays
+import lib.note as note
+
+
+def check_freqs(freqs_hz):
+    """
+    Validate many note frequencies at once (same rule as note.Note)
+    :param freqs_hz: numpy array of frequencies in Hz
+    Raises ValueError if any frequency is out of range
+    """
+    if not np.all((freqs_hz > 0) & (freqs_hz <= note.MAX_FREQ_HZ)):
+        raise ValueError(note.FREQ_ERROR_FORMAT.format(0, note.MAX_FREQ_HZ))
+
+
+class NoteArray(object):
+    """
+    Class to hold a sequence of notes as one float64 array of frequencies
+    Indexing returns a note.Note, slicing returns a NoteArray sharing
+    the same memory
+    """
+    __slots__ = ('__freqs',)
+
+    def __init__(self, freqs_hz):
+        """
+        Constructor
+        :param freqs_hz: frequencies in Hz (numpy array, buffer or iterable);
+                         a float64 array is used as is, not copied
+        Raises ValueError if any frequency is out of range
+        """
+        freqs_hz = arrays.as_array(freqs_hz, dtype=np.float64).reshape(-1)
+        check_freqs(freqs_hz)
+        self.__freqs = freqs_hz
+
+    @classmethod
+    def _from_valid(cls, freqs_hz):
+        """
+        Wrap an array of frequencies that is known to be valid
+        :param freqs_hz: 1-d float64 numpy array of frequencies in Hz
+        :return: NoteArray using freqs_hz
+        """
+        notes = cls.__new__(cls)
+        notes.__freqs = freqs_hz
+        return notes
+
+    @classmethod
+    def from_notes(cls, notes):
+        """
+        Build from note.Note objects
+        :param notes: iterable of note.Note
+        :return: NoteArray
+        """
+        return cls._from_valid(
+            np.fromiter((n.freq for n in notes), dtype=np.float64))
+
+    def to_notes(self):
+        """
+        Convert to note.Note objects
+        :return: list of note.Note
+        """
+        return [note.Note(freq) for freq in self.__freqs.tolist()]
+
+    @property
+    def freqs(self):
+        """
+        getter for the frequencies
+        :return: read-only numpy array view of the frequencies in Hz
+        """
+        freqs = self.__freqs.view()
+        freqs.flags.writeable = False
+        return freqs
+
+    def __len__(self):
+        return len(self.__freqs)
+
+    def __iter__(self):
+        for freq in self.__freqs.tolist():
+            yield note.Note(freq)
+
+    def __getitem__(self, key):
+        freqs = self.__freqs[key]
+        if np.ndim(freqs) == 0:
+            return note.Note(float(freqs))
+        return self._from_valid(freqs)
+
+    def __setitem__(self, key, freqs_hz):
+        freqs_hz = np.asarray(freqs_hz, dtype=np.float64)
+        check_freqs(freqs_hz)
+        self.__freqs[key] = freqs_hz
+
+    def __repr__(self):
+        return '{0}({1})'.format(type(self).__name__, self.__freqs.tolist())
@@ -0,0 +1,298 @@
+"""
+pitch.py
+Pitch detection: estimate the frequency of audio, frame by frame
+
+Uses the YIN algorithm (de Cheveigné and Kawahara, "YIN, a fundamental
+frequency estimator for speech and music", 2002). The frames are strided
+views of the audio, and the difference function of a batch of frames is
+computed with one FFT autocorrelation, so there is no loop over frames or
+lags in Python. Estimates can go straight on to MIDI note numbers and the
+nearest degrees of a scale, as arrays.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+from collections import namedtuple
+
+import numpy as np
+
+import lib.arrays as arrays
+import lib.midi_12edo as midi_12edo
+
+SAMPLE_RATE = 44100
+FRAME_SIZE = 2048
+HOP = 512
+MIN_FREQ_HZ = 50
+MAX_FREQ_HZ = 2000
+# YIN threshold on the normalized difference: lower is stricter
+THRESHOLD = 0.15
+# frames analysed together (bounds the size of the FFT arrays)
+CHUNK_FRAMES = 256
+
+# Pitch estimates, as numpy arrays indexed by frame
+Pitch = namedtuple('Pitch', [
+    'freq',  # frequency in Hz, nan where no pitch was found
+    'confidence',  # 0 to 1, 1 - normalized difference at the chosen lag
+])
+
+# Pitch estimates with their time and musical interpretation
+PitchTrack = namedtuple('PitchTrack', [
+    'time',  # start of each frame, in seconds
+    'freq',  # frequency in Hz, nan where no pitch was found
+    'confidence',  # 0 to 1
+    'midi',  # MIDI note number (float), nan where no pitch was found
+    'degree',  # nearest scale degree, 0 where no pitch (or no scale)
+    'octave',  # octave (period) of the nearest scale tone
+    'deviation',  # cents from the nearest scale tone, nan if none
+])
+
+
+def _lag_range(sample_rate, frame_size, min_freq_hz, max_freq_hz):
+    """
+    Lags (periods, in samples) to search for a pitch
+    :param sample_rate: samples per second
+    :param frame_size: samples per frame
+    :param min_freq_hz: lowest frequency to detect, in Hz
+    :param max_freq_hz: highest frequency to detect, in Hz
+    :return: tuple (shortest lag, longest lag)
+    """
+    max_lag = min(frame_size // 2, int(np.ceil(sample_rate / min_freq_hz)))
+    min_lag = max(2, int(sample_rate // max_freq_hz))
+    return min_lag, max_lag
+
+
+def difference(frames, max_lag):
+    """
+    YIN difference function of frames, for lags 0 to max_lag:
+    d[lag] = sum over the window of (x[j] - x[j + lag]) ** 2,
+    the window being the first frame_size - max_lag samples
+    :param frames: numpy array (frames, frame_size)
+    :param max_lag: longest lag, at most frame_size // 2
+    :return: numpy array (frames, max_lag + 1)
+    """
+    frame_size = frames.shape[1]
+    window = frame_size - max_lag
+    size = 1 << (frame_size - 1).bit_length()
+    spectrum = np.fft.rfft(frames, size)
+    window_spectrum = np.fft.rfft(frames[:, :window], size)
+    correlation = np.fft.irfft(
+        window_spectrum.conj() * spectrum, size)[:, :max_lag + 1]
+    energy = np.zeros((len(frames), frame_size + 1))
+    np.cumsum(frames ** 2, axis=1, out=energy[:, 1:])
+    lags = np.arange(max_lag + 1)
+    lag_energy = energy[:, lags + window] - energy[:, lags]
+    result = lag_energy[:, :1] + lag_energy - 2 * correlation
+    return np.maximum(result, 0)
+
+
+def normalized_difference(diff):
+    """
+    YIN cumulative mean normalized difference function
+    :param diff: numpy array (frames, lags) of the difference function
+    :return: numpy array (frames, lags), 1 at lag 0 (and for silence)
+    """
+    cumulative = np.cumsum(diff[:, 1:], axis=1)
+    result = np.ones(diff.shape)
+    lags = np.arange(1, diff.shape[1])
+    np.divide(
+        diff[:, 1:] * lags, cumulative, out=result[:, 1:],
+        where=cumulative > 0)
+    return result
+
+
+def estimate_frames(
+        frames, sample_rate=SAMPLE_RATE, min_freq_hz=MIN_FREQ_HZ,
+        max_freq_hz=MAX_FREQ_HZ, threshold=THRESHOLD):
+    """
+    Estimate the pitch of frames of audio
+    :param frames: numpy array (frames, frame_size) of samples
+    :param sample_rate: samples per second
+    :param min_freq_hz: lowest frequency to detect, in Hz
+    :param max_freq_hz: highest frequency to detect, in Hz
+    :param threshold: YIN threshold
+    :return: Pitch
+    """
+    min_lag, max_lag = _lag_range(
+        sample_rate, frames.shape[1], min_freq_hz, max_freq_hz)
+    results = [
+        _estimate_chunk(
+            frames[start:start + CHUNK_FRAMES], sample_rate, min_lag,
+            max_lag, threshold)
+        for start in range(0, len(frames), CHUNK_FRAMES)
+    ]
+    if not results:
+        return Pitch(freq=np.zeros(0), confidence=np.zeros(0))
+    return Pitch(*(np.concatenate(values) for values in zip(*results)))
+
+
+def _estimate_chunk(frames, sample_rate, min_lag, max_lag, threshold):
+    """
+    Estimate the pitch of a batch of frames (see estimate_frames)
+    :param frames: numpy array (frames, frame_size)
+    :param sample_rate: samples per second
+    :param min_lag: shortest lag to search, in samples
+    :param max_lag: longest lag to search, in samples
+    :param threshold: YIN threshold
+    :return: tuple of numpy arrays (freq, confidence)
+    """
+    cmnd = normalized_difference(difference(frames, max_lag))
+    rows = np.arange(len(frames))
+    lags = np.arange(max_lag + 1)
+    searched = (lags >= min_lag) & (lags < max_lag)
+    # first dip below the threshold, then down to its local minimum
+    below = (cmnd < threshold) & searched
+    voiced = below.any(axis=1)
+    first = np.where(
+        voiced, below.argmax(axis=1),
+        np.where(searched, cmnd, np.inf).argmin(axis=1))
+    rising = np.zeros(cmnd.shape, dtype=bool)
+    rising[:, :-1] = cmnd[:, 1:] >= cmnd[:, :-1]
+    minimum = rising & (lags >= first[:, np.newaxis]) & searched
+    lag = np.where(minimum.any(axis=1), minimum.argmax(axis=1), first)
+    # parabolic interpolation between the neighbouring lags
+    before, at, after = (
+        cmnd[rows, lag - 1], cmnd[rows, lag], cmnd[rows, lag + 1])
+    curve = before - 2 * at + after
+    shift = np.zeros(len(frames))
+    np.divide(before - after, 2 * curve, out=shift, where=curve > 0)
+    freq = sample_rate / (lag + np.clip(shift, -1, 1))
+    freq[~voiced] = np.nan
+    return freq, np.clip(1 - at, 0, 1)
+
+
+def estimate(
+        samples, sample_rate=SAMPLE_RATE, frame_size=FRAME_SIZE, hop=HOP,
+        min_freq_hz=MIN_FREQ_HZ, max_freq_hz=MAX_FREQ_HZ,
+        threshold=THRESHOLD):
+    """
+    Estimate the pitch of audio, frame by frame
+    :param samples: mono audio (numpy array, buffer or iterable)
+    :param sample_rate: samples per second
+    :param frame_size: samples per frame (at least twice the period of
+                       min_freq_hz)
+    :param hop: samples from the start of one frame to the next
+    :param min_freq_hz: lowest frequency to detect, in Hz
+    :param max_freq_hz: highest frequency to detect, in Hz
+    :param threshold: YIN threshold
+    :return: Pitch, one estimate per whole frame
+    """
+    samples = arrays.as_array(samples, dtype=float)
+    return estimate_frames(
+        arrays.frames(samples, frame_size, hop), sample_rate=sample_rate,
+        min_freq_hz=min_freq_hz, max_freq_hz=max_freq_hz,
+        threshold=threshold)
+
+
+def pitch_track(pitch, times, myscale=None):
+    """
+    Interpret pitch estimates as MIDI note numbers and scale degrees
+    :param pitch: Pitch
+    :param times: numpy array of the time of each estimate, in seconds
+    :param myscale: scale.Scale (or subclass) with a root note, to find the
+                    nearest scale degrees (default None)
+    :return: PitchTrack
+    """
+    voiced = ~np.isnan(pitch.freq)
+    midi = np.full(len(voiced), np.nan)
+    midi[voiced] = midi_12edo.midi_from_freq_array(pitch.freq[voiced])
+    degree = np.zeros(len(voiced), dtype=int)
+    octave = np.zeros(len(voiced), dtype=int)
+    deviation = np.full(len(voiced), np.nan)
+    quantized = None
+    if myscale is not None:
+        quantized = myscale.quantize(pitch.freq[voiced])
+    if quantized is not None:
+        degree[voiced] = quantized.degree
+        octave[voiced] = quantized.octave
+        deviation[voiced] = quantized.deviation
+    return PitchTrack(
+        time=times, freq=pitch.freq, confidence=pitch.confidence, midi=midi,
+        degree=degree, octave=octave, deviation=deviation)
+
+
+def track(
+        samples, myscale=None, sample_rate=SAMPLE_RATE,
+        frame_size=FRAME_SIZE, hop=HOP, min_freq_hz=MIN_FREQ_HZ,
+        max_freq_hz=MAX_FREQ_HZ, threshold=THRESHOLD):
+    """
+    Track the pitch of audio, with MIDI note numbers and scale degrees
+    :param samples: mono audio (numpy array, buffer or iterable)
+    :param myscale: scale.Scale (or subclass) with a root note, to find the
+                    nearest scale degrees (default None)
+    :param sample_rate: samples per second
+    :param frame_size: samples per frame
+    :param hop: samples from the start of one frame to the next
+    :param min_freq_hz: lowest frequency to detect, in Hz
+    :param max_freq_hz: highest frequency to detect, in Hz
+    :param threshold: YIN threshold
+    :return: PitchTrack, one entry per whole frame
+    """
+    pitch = estimate(
+        samples, sample_rate=sample_rate, frame_size=frame_size, hop=hop,
+        min_freq_hz=min_freq_hz, max_freq_hz=max_freq_hz,
+        threshold=threshold)
+    times = np.arange(len(pitch.freq)) * hop / sample_rate
+    return pitch_track(pitch, times, myscale)
+
+
+class PitchTracker(object):
+    """
+    Class to track pitch live, from audio blocks of any size
+    Samples are kept only until the frames that need them are complete
+    """
+    def __init__(
+            self, myscale=None, sample_rate=SAMPLE_RATE,
+            frame_size=FRAME_SIZE, hop=HOP, min_freq_hz=MIN_FREQ_HZ,
+            max_freq_hz=MAX_FREQ_HZ, threshold=THRESHOLD):
+        """
+        Constructor
+        :param myscale: scale.Scale (or subclass) with a root note, to find
+                        the nearest scale degrees (default None)
+        (other parameters as for track)
+        """
+        self.__myscale = myscale
+        self.__sample_rate = sample_rate
+        self.__min_freq_hz = min_freq_hz
+        self.__max_freq_hz = max_freq_hz
+        self.__threshold = threshold
+        self.__buffer = arrays.FrameBuffer(frame_size, hop)
+
+    @property
+    def myscale(self):
+        """
+        getter for self.__myscale
+        :return: scale.Scale (or subclass) to find the nearest scale degrees,
+                 None for no scale
+        """
+        return self.__myscale
+
+    @property
+    def frames(self):
+        """
+        Number of frames tracked so far
+        :return: number of frames
+        """
+        return self.__buffer.frames
+
+    def process(self, block):
+        """
+        Track the frames completed by a block of audio
+        :param block: next mono samples (numpy array, buffer or iterable)
+        :return: PitchTrack of the new frames (may be empty), with times
+                 counted from the first block
+        """
+        first, frames = self.__buffer.push(block)
+        pitch = estimate_frames(
+            frames, sample_rate=self.__sample_rate,
+            min_freq_hz=self.__min_freq_hz, max_freq_hz=self.__max_freq_hz,
+            threshold=self.__threshold)
+        numbers = np.arange(first, first + len(frames))
+        return pitch_track(
+            pitch, numbers * self.__buffer.hop / self.__sample_rate,
+            self.__myscale)
@@ -0,0 +1,242 @@
+"""
+pitch_class_set.py
+12-EDO pitch class sets as 12-bit integer masks
+
+Bit n of a mask is set if pitch class n (n semitones above the root) is in
+the set, so the major scale (0, 2, 4, 5, 7, 9, 11) is 0b101010110101.
+Set operations are bitwise operations on the masks, and transposition is
+a rotation of the 12 bits.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+from collections import namedtuple
+
+PITCH_CLASSES = 12
+SEMITONE_CENTS = 100
+FULL_MASK = (1 << PITCH_CLASSES) - 1
+MASK_COUNT = FULL_MASK + 1
+
+# Properties of every mask, as numpy arrays indexed by mask
+Catalog = namedtuple('Catalog', [
+    'cardinality',  # number of pitch classes
+    'interval_vector',  # (MASK_COUNT, 6) counts of interval classes 1-6
+    'normal_form',  # lowest mask among the transpositions (mode class)
+    'prime_form',  # lowest mask among the transpositions and inversions
+    'symmetry',  # number of transpositions that map the set onto itself
+    'distinct_modes',  # number of different modes of the set
+])
+
+_catalog = None
+
+
+def mask_from_cents(cents):
+    """
+    Pitch class mask of 12-EDO tones
+    :param cents: iterable of tones, in cents above root (multiples of 100)
+    :return: mask
+    """
+    mask = 0
+    for tone in cents:
+        mask |= 1 << (int(tone // SEMITONE_CENTS) % PITCH_CLASSES)
+    return mask
+
+
+def cents_from_mask(mask):
+    """
+    12-EDO tones of a pitch class mask
+    :param mask: pitch class mask
+    :return: sorted list of tones, in cents above root
+    """
+    return [
+        pitch_class * SEMITONE_CENTS for pitch_class in range(PITCH_CLASSES)
+        if mask >> pitch_class & 1
+    ]
+
+
+def has_pitch_class(mask, pitch_class):
+    """
+    Check if a pitch class is in a mask
+    :param mask: pitch class mask
+    :param pitch_class: semitones above root (any integer, taken mod 12)
+    :return: True if the pitch class is in the set
+    """
+    return bool(mask >> (pitch_class % PITCH_CLASSES) & 1)
+
+
+def cardinality(mask):
+    """
+    Number of pitch classes in a mask
+    :param mask: pitch class mask
+    :return: number of set bits
+    """
+    return bin(mask).count('1')
+
+
+def transpose(mask, semitones):
+    """
+    Transpose a pitch class mask (rotate its bits)
+    :param mask: pitch class mask
+    :param semitones: semitones to transpose up (negative for down)
+    :return: transposed mask
+    """
+    semitones %= PITCH_CLASSES
+    return (
+        (mask << semitones) | (mask >> (PITCH_CLASSES - semitones))
+    ) & FULL_MASK
+
+
+def invert(mask):
+    """
+    Invert a pitch class mask around the root (pitch class n -> -n)
+    :param mask: pitch class mask
+    :return: inverted mask
+    """
+    inverted = mask & 1
+    for pitch_class in range(1, PITCH_CLASSES):
+        if mask >> pitch_class & 1:
+            inverted |= 1 << (PITCH_CLASSES - pitch_class)
+    return inverted
+
+
+def complement(mask):
+    """
+    Pitch classes not in a mask
+    :param mask: pitch class mask
+    :return: complement mask
+    """
+    return ~mask & FULL_MASK
+
+
+def union(*masks):
+    """
+    Pitch classes in any of the masks
+    :param masks: pitch class masks
+    :return: union mask
+    """
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+def intersection(*masks):
+    """
+    Pitch classes in all of the masks
+    :param masks: pitch class masks
+    :return: intersection mask
+    """
+    result = FULL_MASK
+    for mask in masks:
+        result &= mask
+    return result
+
+
+def normal_form(mask):
+    """
+    Canonical transposition of a pitch class mask: the lowest mask among its
+    12 transpositions. Masks with the same normal form are transpositions of
+    each other (and, when they contain the root, modes of each other).
+    :param mask: pitch class mask
+    :return: normal form mask
+    """
+    return min(transpose(mask, semitones) for semitones in range(PITCH_CLASSES))
+
+
+def prime_form(mask):
+    """
+    Canonical prime form of a pitch class mask: the lowest mask among its
+    transpositions and the transpositions of its inversion.
+    (This orders sets by mask value, so it is canonical but need not match
+    the Forte/Rahn packing order.)
+    :param mask: pitch class mask
+    :return: prime form mask
+    """
+    return min(normal_form(mask), normal_form(invert(mask)))
+
+
+def interval_vector(mask):
+    """
+    Interval vector of a pitch class mask
+    :param mask: pitch class mask
+    :return: tuple of the counts of interval classes 1 to 6
+    """
+    counts = [
+        cardinality(mask & transpose(mask, interval))
+        for interval in range(1, 7)
+    ]
+    # a tritone maps each pair onto itself, so those pairs count twice
+    counts[5] //= 2
+    return tuple(counts)
+
+
+def modes(mask):
+    """
+    Modes of a pitch class mask: the set re-rooted on each of its pitch
+    classes, in order
+    :param mask: pitch class mask
+    :return: list of masks, one per pitch class in the set
+    """
+    return [
+        transpose(mask, -pitch_class) for pitch_class in range(PITCH_CLASSES)
+        if mask >> pitch_class & 1
+    ]
+
+
+def catalog():
+    """
+    Catalog of the properties of all 4096 pitch class masks
+    Built with numpy on first use; index its arrays by mask (or an array of
+    masks) to classify many sets at once
+    :return: Catalog of read-only numpy arrays
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = _build_catalog()
+    return _catalog
+
+
+def _build_catalog():
+    """
+    Build the catalog of all pitch class masks (see catalog)
+    :return: Catalog of read-only numpy arrays
+    """
+    import numpy as np
+
+    masks = np.arange(MASK_COUNT, dtype=np.uint16)
+    pitch_classes = np.arange(PITCH_CLASSES, dtype=np.uint16)
+    weights = (1 << pitch_classes).astype(np.uint16)
+    bits = (masks[:, np.newaxis] >> pitch_classes) & 1
+    # rotations[n] is every mask transposed up by n semitones
+    rotations = np.stack([
+        ((masks << n) | (masks >> (PITCH_CLASSES - n))) & FULL_MASK
+        for n in range(PITCH_CLASSES)
+    ]).astype(np.uint16)
+    inverted = bits[:, -np.arange(PITCH_CLASSES) % PITCH_CLASSES] @ weights
+    inverted_normal = rotations.min(axis=0)[inverted]
+    counts = bits.sum(axis=1)
+    vectors = np.stack([
+        ((masks & rotations[interval])[:, np.newaxis] >> pitch_classes & 1)
+        .sum(axis=1)
+        for interval in range(1, 7)
+    ], axis=1)
+    vectors[:, 5] //= 2
+    symmetry = (rotations == masks).sum(axis=0)
+    result = Catalog(
+        cardinality=counts.astype(np.uint8),
+        interval_vector=vectors.astype(np.uint8),
+        normal_form=rotations.min(axis=0),
+        prime_form=np.minimum(rotations.min(axis=0), inverted_normal)
+        .astype(np.uint16),
+        symmetry=symmetry.astype(np.uint8),
+        distinct_modes=(counts // symmetry).astype(np.uint8),
+    )
+    for values in result:
+        values.flags.writeable = False
+    return result
@@ -1,5 +1,12 @@
 """
 Mathematical ratios for musical calculations
+
+Ratio is an exact frequency ratio (eg 3/2, for just intonation) that can be
+used wherever a tone in cents is expected: it compares, converts and does
+arithmetic with numbers as its cents value, while stacking and
+subtracting Ratios keeps them exact. It is not a numbers.Real, since its
+value as a number (cents) is not the ratio itself. The cents of integer
+ratios are cached, since the same few ratios come up again and again.
 """
 
 __author__ = "Joel Luth"
@@ -10,9 +17,28 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
-from numpy import log2
+import math
+import numbers
+from fractions import Fraction
+from functools import lru_cache
 
 OCTAVE_CENTS = 1200
+# integer ratios whose cents are kept by ratio_cents
+RATIO_CACHE_SIZE = 4096
+
+
+def log2(value):
+    """
+    Base-2 logarithm
+    Positive scalars use math; numpy is only imported for arrays
+    (and zero/negative/nan values, which numpy maps to -inf/nan)
+    :param value: number or numpy array
+    :return: log2 of value
+    """
+    if isinstance(value, (int, float)) and value > 0:
+        return math.log2(value)
+    import numpy as np
+    return np.log2(value)
 
 
 def cents(freq1, freq2):
@@ -21,3 +47,228 @@ def cents(freq1, freq2):
 
 def freq_ratio(cents):
     return 2 ** (cents / OCTAVE_CENTS)
+
+
+@lru_cache(maxsize=RATIO_CACHE_SIZE)
+def ratio_cents(numerator, denominator=1):
+    """
+    Cents of a frequency ratio of positive integers (cached)
+    :param numerator: upper frequency of the ratio
+    :param denominator: lower frequency of the ratio
+    :return: cents (exact for powers of 2)
+    """
+    return OCTAVE_CENTS * (math.log2(numerator) - math.log2(denominator))
+
+
+class Ratio(object):
+    """
+    Class to hold an exact frequency ratio, used as a tone in cents
+    A Ratio is an interval, so its value as a number is its size in cents,
+    never the ratio: Ratio(3, 2) == 701.955... and float(Ratio(2)) == 1200,
+    while Ratio(3, 2) == 1.5 is False (compare .fraction for that).
+    Equality between Ratios is exact; with numbers (and for ordering), a
+    Ratio is its cents value.
+    Arithmetic follows the cents: adding or subtracting Ratios (or whole
+    octaves, as int cents) and multiplying by an int (stacking the interval)
+    give an exact Ratio; any other arithmetic with a number gives float
+    cents. Arithmetic that has no meaning for intervals (multiplying or
+    dividing two Ratios, powers) raises TypeError.
+    """
+    __slots__ = ('__fraction',)
+
+    def __init__(self, numerator, denominator=1):
+        """
+        Constructor
+        :param numerator: int, Fraction or text (eg '3/2')
+        :param denominator: int (default 1)
+        Raises ValueError if the ratio isn't positive
+        """
+        if denominator == 1:
+            fraction = Fraction(numerator)
+        else:
+            fraction = Fraction(numerator, denominator)
+        if fraction <= 0:
+            raise ValueError('ratio must be positive')
+        self.__fraction = fraction
+
+    @property
+    def fraction(self):
+        """
+        getter for self.__fraction
+        :return: the ratio, as a Fraction
+        """
+        return self.__fraction
+
+    @property
+    def numerator(self):
+        """
+        :return: numerator of the ratio in lowest terms
+        """
+        return self.__fraction.numerator
+
+    @property
+    def denominator(self):
+        """
+        :return: denominator of the ratio in lowest terms
+        """
+        return self.__fraction.denominator
+
+    @property
+    def cents(self):
+        """
+        The size of the ratio in cents
+        :return: float cents
+        """
+        return ratio_cents(
+            self.__fraction.numerator, self.__fraction.denominator)
+
+    def octave_reduced(self):
+        """
+        The ratio moved by octaves to within one octave above the root
+        :return: Ratio, at least 1/1 and less than 2/1
+        """
+        fraction = self.__fraction
+        octaves = fraction.numerator.bit_length() - (
+            fraction.denominator.bit_length())
+        fraction /= Fraction(2) ** octaves
+        if fraction >= 2:
+            fraction /= 2
+        elif fraction < 1:
+            fraction *= 2
+        return Ratio(fraction)
+
+    @staticmethod
+    def __exact(other):
+        """
+        Exact ratio of an operand, if it has one
+        :param other: Ratio, or number of cents
+        :return: Fraction, None for cents that are not whole octaves
+        """
+        if isinstance(other, Ratio):
+            return other.fraction
+        if isinstance(other, numbers.Integral) and other % OCTAVE_CENTS == 0:
+            return Fraction(2) ** (other // OCTAVE_CENTS)
+        return None
+
+    def __float__(self):
+        return self.cents
+
+    def __round__(self, ndigits=None):
+        return round(self.cents, ndigits)
+
+    def __bool__(self):
+        return self.__fraction != 1
+
+    def __hash__(self):
+        # equal Ratios have equal cents, and a Ratio equals its cents
+        return hash(self.cents)
+
+    def __eq__(self, other):
+        if isinstance(other, Ratio):
+            return self.__fraction == other.fraction
+        if isinstance(other, numbers.Real):
+            return self.cents == other
+        return NotImplemented
+
+    def __lt__(self, other):
+        if isinstance(other, (Ratio, numbers.Real)):
+            return self.cents < float(other)
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, (Ratio, numbers.Real)):
+            return self.cents <= float(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, (Ratio, numbers.Real)):
+            return self.cents > float(other)
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, (Ratio, numbers.Real)):
+            return self.cents >= float(other)
+        return NotImplemented
+
+    def __add__(self, other):
+        exact = self.__exact(other)
+        if exact is not None:
+            return Ratio(self.__fraction * exact)
+        if isinstance(other, numbers.Real):
+            return self.cents + other
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        exact = self.__exact(other)
+        if exact is not None:
+            return Ratio(self.__fraction / exact)
+        if isinstance(other, numbers.Real):
+            return self.cents - other
+        return NotImplemented
+
+    def __rsub__(self, other):
+        exact = self.__exact(other)
+        if exact is not None:
+            return Ratio(exact / self.__fraction)
+        if isinstance(other, numbers.Real):
+            return other - self.cents
+        return NotImplemented
+
+    def __neg__(self):
+        return Ratio(1 / self.__fraction)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return self if self.__fraction >= 1 else -self
+
+    def __mul__(self, other):
+        if isinstance(other, numbers.Integral):
+            # stack the interval, exactly
+            return Ratio(self.__fraction ** int(other))
+        if isinstance(other, numbers.Real):
+            return self.cents * other
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, numbers.Real):
+            return self.cents / other
+        return NotImplemented
+
+    def __rtruediv__(self, other):
+        if isinstance(other, numbers.Real):
+            return other / self.cents
+        return NotImplemented
+
+    def __floordiv__(self, other):
+        if isinstance(other, numbers.Real):
+            return self.cents // other
+        return NotImplemented
+
+    def __mod__(self, other):
+        if isinstance(other, numbers.Real):
+            return self.cents % other
+        return NotImplemented
+
+    def __trunc__(self):
+        return math.trunc(self.cents)
+
+    def __floor__(self):
+        return math.floor(self.cents)
+
+    def __ceil__(self):
+        return math.ceil(self.cents)
+
+    def __reduce__(self):
+        return Ratio, (self.numerator, self.denominator)
+
+    def __repr__(self):
+        return 'Ratio({0}, {1})'.format(self.numerator, self.denominator)
+
+    def __str__(self):
+        return str(self.__fraction)
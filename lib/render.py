@@ -0,0 +1,230 @@
+"""
+render.py
+Render scales and notes to audio with a bank of sine oscillators
+
+A render is a sequence of tones (start, duration, frequency, amplitude),
+sorted by start time. Audio is produced one fixed-size block at a time,
+computing every sounding oscillator for the whole block at once with
+numpy. Each oscillator's phase is measured from the start of its tone, so
+it runs on unbroken from block to block; only the tones sounding in a block
+are held in memory, however long the render is.
+Independent renders can be written to WAV files by a pool of processes.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import math
+import wave
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import lib.ratios as ratios
+
+SAMPLE_RATE = 44100
+# samples per rendered block
+BLOCK_SIZE = 4096
+# fade in and out of each tone, to avoid clicks
+FADE_SECONDS = 0.005
+AMPLITUDE = 0.5
+TONE_SECONDS = 0.5
+# 16-bit PCM
+SAMPLE_WIDTH = 2
+PCM_MAX = (1 << (8 * SAMPLE_WIDTH - 1)) - 1
+
+# A sine tone: start time and duration in seconds, frequency in Hz,
+# and peak amplitude (the mixed output should stay within -1 to 1)
+Tone = namedtuple('Tone', ['start', 'duration', 'freq', 'amplitude'])
+
+
+def sequence(freqs, duration=TONE_SECONDS, amplitude=AMPLITUDE, start=0):
+    """
+    Tones one after another
+    :param freqs: iterable of frequencies, in Hz (nan to leave a rest)
+    :param duration: duration of each tone, in seconds
+    :param amplitude: amplitude of each tone
+    :param start: start time of the first tone, in seconds
+    :return: generator of Tones
+    """
+    for number, freq in enumerate(freqs):
+        if not math.isnan(freq):
+            yield Tone(start + number * duration, duration, freq, amplitude)
+
+
+def scale_tones(myscale, duration=TONE_SECONDS, amplitude=AMPLITUDE):
+    """
+    Tones to audition a scale: its tones from the root up, through one
+    period (all tones for a scale that does not repeat)
+    :param myscale: scale.Scale (or subclass)
+    :param duration: duration of each tone, in seconds
+    :param amplitude: amplitude of each tone
+    :return: list of Tones, None if the scale has no root note
+    """
+    if myscale.root_note is None:
+        return None
+    root_hz = myscale.root_note.freq
+    max_freq_hz = root_hz * (1 + 1e-9)
+    if myscale.period_cents is not None:
+        max_freq_hz *= ratios.freq_ratio(myscale.period_cents)
+    else:
+        max_freq_hz *= ratios.freq_ratio(max(myscale.tones, default=0))
+    frequencies = myscale.frequencies(root_hz, max_freq_hz)
+    return list(sequence(frequencies.freq.tolist(), duration, amplitude))
+
+
+def note_tones(notes, duration=TONE_SECONDS, amplitude=AMPLITUDE):
+    """
+    Tones to play notes one after another
+    :param notes: iterable of note.Note objects
+    :param duration: duration of each tone, in seconds
+    :param amplitude: amplitude of each tone
+    :return: list of Tones
+    """
+    return list(sequence(
+        (mynote.freq for mynote in notes), duration, amplitude))
+
+
+def tuning_tones(table, duration=TONE_SECONDS / 4, amplitude=AMPLITUDE):
+    """
+    Tones to audition a MIDI tuning table: every mapped key, from the lowest
+    :param table: midi_tuning.TuningTable
+    :param duration: duration of each tone, in seconds
+    :param amplitude: amplitude of each tone
+    :return: list of Tones
+    """
+    return list(sequence(
+        table.freq[table.mapped].tolist(), duration, amplitude))
+
+
+def render(
+        tones, sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE,
+        fade_seconds=FADE_SECONDS):
+    """
+    Render tones as audio, a block at a time
+    :param tones: iterable of Tones, sorted by start time
+    :param sample_rate: samples per second
+    :param block_size: samples per block
+    :param fade_seconds: fade in and out time of each tone, in seconds
+    :return: generator of numpy float arrays of samples, each block_size
+             long except the last, which ends with the last tone
+    """
+    tones = iter(tones)
+    upcoming = next(tones, None)
+    fade = max(1.0, fade_seconds * sample_rate)
+    # sounding tones: frequency, amplitude, start and end sample
+    freqs, amplitudes = np.zeros(0), np.zeros(0)
+    starts, ends = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    block_start = 0
+    while upcoming is not None or len(ends):
+        block_end = block_start + block_size
+        added = []
+        while upcoming is not None and (
+                round(upcoming.start * sample_rate) < block_end):
+            added.append(upcoming)
+            upcoming = next(tones, None)
+        if added:
+            added = np.array(added, dtype=float).reshape(-1, 4)
+            first = np.rint(added[:, 0] * sample_rate).astype(np.int64)
+            freqs = np.concatenate((freqs, added[:, 2]))
+            amplitudes = np.concatenate((amplitudes, added[:, 3]))
+            starts = np.concatenate((starts, first))
+            ends = np.concatenate((
+                ends, first + np.rint(added[:, 1] * sample_rate)
+                .astype(np.int64)))
+        if upcoming is None and len(ends):
+            block_end = min(block_end, max(block_start, ends.max()))
+        yield _render_block(
+            freqs, amplitudes, starts, ends, block_start, block_end,
+            sample_rate, fade)
+        sounding = ends > block_end
+        freqs, amplitudes = freqs[sounding], amplitudes[sounding]
+        starts, ends = starts[sounding], ends[sounding]
+        block_start = block_end
+
+
+def _render_block(
+        freqs, amplitudes, starts, ends, block_start, block_end,
+        sample_rate, fade):
+    """
+    Render one block of the sounding tones (see render)
+    :param freqs: numpy array of frequencies, in Hz
+    :param amplitudes: numpy array of amplitudes
+    :param starts: numpy array of start samples
+    :param ends: numpy array of end samples
+    :param block_start: first sample of the block
+    :param block_end: sample after the block
+    :param sample_rate: samples per second
+    :param fade: fade in and out time, in samples
+    :return: numpy float array of samples
+    """
+    samples = np.arange(block_start, block_end)
+    # samples since the start of each tone, so phases carry across blocks
+    elapsed = samples - starts[:, np.newaxis]
+    envelope = np.clip(
+        np.minimum(elapsed, ends[:, np.newaxis] - samples) / fade, 0, 1)
+    phases = (2 * np.pi / sample_rate) * freqs[:, np.newaxis] * elapsed
+    return amplitudes @ (envelope * np.sin(phases))
+
+
+def write_wav(path, blocks, sample_rate=SAMPLE_RATE):
+    """
+    Write audio blocks to a mono 16-bit WAV file, as they are generated
+    (samples are clipped to -1 to 1)
+    :param path: path (or binary file object) to write
+    :param blocks: iterable of numpy float arrays of samples
+    :param sample_rate: samples per second
+    :return: number of samples written
+    """
+    count = 0
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        for block in blocks:
+            pcm = np.rint(np.clip(block, -1, 1) * PCM_MAX).astype('<i2')
+            wav.writeframesraw(pcm.tobytes())
+            count += len(pcm)
+    return count
+
+
+def render_wav(path, tones, sample_rate=SAMPLE_RATE):
+    """
+    Render tones to a WAV file
+    :param path: path of the file to write
+    :param tones: iterable of Tones, sorted by start time
+    :param sample_rate: samples per second
+    :return: number of samples written
+    """
+    return write_wav(path, render(tones, sample_rate), sample_rate)
+
+
+def _render_job(job):
+    """
+    Render one WAV file (run in the worker processes)
+    :param job: tuple (path, list of Tones, sample rate)
+    :return: number of samples written
+    """
+    return render_wav(*job)
+
+
+def render_wavs(jobs, sample_rate=SAMPLE_RATE, processes=None):
+    """
+    Render many WAV files, in parallel worker processes
+    :param jobs: iterable of (path, list of Tones) tuples
+    :param sample_rate: samples per second
+    :param processes: number of worker processes (default: one per CPU,
+                      1 to render in this process)
+    :return: list of the number of samples written to each file
+    """
+    jobs = [(path, list(tones), sample_rate) for path, tones in jobs]
+    if processes == 1:
+        return [_render_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(_render_job, jobs))
@@ -0,0 +1,389 @@
+"""
+scala.py
+Read and write Scala scale (.scl) and keyboard mapping (.kbm) files
+See http://www.huygens-fokker.org/scala/scl_format.html
+
+Files are parsed line by line as they are read. A directory tree of .scl
+files (eg the Scala archive) can be parsed by a pool of worker processes
+into a compact index, so later lookups don't parse text again.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import lib.ratios as ratios
+import lib.scale as scale
+import lib.scale_octave as scale_octave
+
+SCL_EXTENSION = '.scl'
+COMMENT = '!'
+# scl files handed to each worker process at a time
+SCAN_CHUNK_SIZE = 64
+
+# A parsed .scl file: description line and tones (cents) in file order
+SclData = namedtuple('SclData', ['description', 'cents'])
+
+# A parsed .kbm file (keys holds the scale degree for each key of the
+# mapping pattern, None for an unmapped key, empty for a linear mapping)
+KeyboardMapping = namedtuple('KeyboardMapping', [
+    'size', 'first_note', 'last_note', 'middle_note', 'reference_note',
+    'reference_freq', 'octave_degree', 'keys'
+])
+
+
+def linear_mapping(middle_note=60, reference_note=69, reference_freq=440.0):
+    """
+    Keyboard mapping with consecutive scale degrees on consecutive keys
+    :param middle_note: MIDI note for the first degree (root) of the scale
+    :param reference_note: MIDI note with a fixed frequency
+    :param reference_freq: frequency of reference_note, in Hz
+    :return: KeyboardMapping
+    """
+    return KeyboardMapping(
+        size=0, first_note=0, last_note=127, middle_note=middle_note,
+        reference_note=reference_note, reference_freq=float(reference_freq),
+        octave_degree=0, keys=())
+
+
+def _data_lines(fileobj):
+    """
+    Lines of a Scala file that are not comments
+    :param fileobj: text file object (or any iterable of lines)
+    :return: generator of lines, stripped of surrounding whitespace
+    """
+    for line in fileobj:
+        if not line.startswith(COMMENT):
+            yield line.strip()
+
+
+def parse_pitch(text):
+    """
+    Parse a pitch line of a .scl file
+    A value with a period is in cents, anything else is a ratio
+    (eg 3/2, or 2 for 2/1); text after the value is ignored
+    :param text: the pitch line
+    :return: cents above the root (a ratios.Ratio for a ratio)
+    Raises ValueError if the line isn't a valid pitch
+    """
+    fields = text.split()
+    if not fields:
+        raise ValueError('missing pitch value')
+    value = fields[0]
+    if '.' in value:
+        return float(value)
+    numerator, _, denominator = value.partition('/')
+    numerator = int(numerator)
+    denominator = int(denominator) if denominator else 1
+    if numerator <= 0 or denominator <= 0:
+        raise ValueError('invalid ratio {0}'.format(value))
+    return ratios.Ratio(numerator, denominator)
+
+
+def read_scl_data(fileobj):
+    """
+    Parse a .scl file, without building a scale
+    :param fileobj: text file object (or any iterable of lines)
+    :return: SclData
+    Raises ValueError if the file isn't a valid .scl file
+    """
+    lines = _data_lines(fileobj)
+    try:
+        description = next(lines)
+        count = int(next(lines).split()[0])
+        cents = []
+        while len(cents) < count:
+            line = next(lines)
+            if line:
+                cents.append(parse_pitch(line))
+    except (StopIteration, IndexError):
+        raise ValueError('incomplete scl file')
+    return SclData(description, cents)
+
+
+def scale_from_cents(cents, root_note=None, scale_class=None, **options):
+    """
+    Build a scale from the tones of a .scl file, with the bulk constructor
+    :param cents: tones, in cents above the root (without the root itself)
+    :param root_note: Note object, root note for the scale (default None)
+    :param scale_class: class of scale to build (default ScaleOctave if all
+                        tones fit in an octave, otherwise Scale)
+    :param options: other arguments for scale_class.from_tones (eg edo for
+                    a scale_edo.ScaleEDO)
+    :return: the new scale
+    Raises ValueError if the scale rejects any of the tones (eg negative or
+    repeated tones), so the scale would have fewer degrees than the file
+    """
+    if scale_class is None:
+        scale_class = scale.Scale
+        if all(0 <= tone <= scale_octave.MAX_CENTS for tone in cents):
+            scale_class = scale_octave.ScaleOctave
+    new_scale = scale_class.from_tones([], root_note=root_note, **options)
+    rejected = new_scale.add_tones(cents)
+    if rejected:
+        raise ValueError('{0} rejected pitches: {1}'.format(
+            scale_class.__name__,
+            ', '.join(format_cents(tone) for tone in rejected)))
+    return new_scale
+
+
+def read_scl(fileobj, root_note=None, scale_class=None, **options):
+    """
+    Read a scale from a .scl file
+    :param fileobj: text file object (or any iterable of lines)
+    :param root_note: Note object, root note for the scale (default None)
+    :param scale_class: class of scale to build (see scale_from_cents)
+    :param options: see scale_from_cents
+    :return: tuple (description, scale)
+    Raises ValueError if the file isn't a valid .scl file, or has pitches
+    the scale rejects
+    """
+    data = read_scl_data(fileobj)
+    return data.description, scale_from_cents(
+        data.cents, root_note=root_note, scale_class=scale_class, **options)
+
+
+def format_cents(cents):
+    """
+    Format a tone as a .scl pitch line in cents
+    (or as a ratio, for an exact ratios.Ratio tone)
+    :param cents: cents above the root
+    :return: pitch text (always with a period, so it reads back as cents,
+             unless it is a ratio)
+    """
+    if isinstance(cents, ratios.Ratio):
+        return '{0}/{1}'.format(cents.numerator, cents.denominator)
+    return '{0:.6f}'.format(float(cents))
+
+
+def write_scl(myscale, fileobj, description=''):
+    """
+    Write a scale as a .scl file
+    The root is implied by the format, so it isn't written. A repeating
+    scale without its period tone gets the period as the last pitch.
+    :param myscale: scale.Scale (or subclass)
+    :param fileobj: text file object to write to
+    :param description: description line
+    """
+    tones = [tone for tone in myscale.tones if tone != 0]
+    period = myscale.period_cents
+    if period is not None and (not tones or tones[-1] != period):
+        tones.append(period)
+    name = os.path.basename(getattr(fileobj, 'name', '') or '')
+    fileobj.write('! {0}\n!\n{1}\n {2}\n!\n'.format(
+        name, description, len(tones)))
+    for tone in tones:
+        fileobj.write(' {0}\n'.format(format_cents(tone)))
+
+
+def read_kbm(fileobj):
+    """
+    Read a keyboard mapping from a .kbm file
+    :param fileobj: text file object (or any iterable of lines)
+    :return: KeyboardMapping
+    Raises ValueError if the file isn't a valid .kbm file
+    """
+    lines = (line for line in _data_lines(fileobj) if line)
+    try:
+        header = [next(lines).split()[0] for _ in range(7)]
+        size = int(header[0])
+        keys = []
+        for _ in range(size):
+            key = next(lines).split()[0]
+            keys.append(None if key.lower() == 'x' else int(key))
+    except StopIteration:
+        raise ValueError('incomplete kbm file')
+    return KeyboardMapping(
+        size=size, first_note=int(header[1]), last_note=int(header[2]),
+        middle_note=int(header[3]), reference_note=int(header[4]),
+        reference_freq=float(header[5]), octave_degree=int(header[6]),
+        keys=tuple(keys))
+
+
+def write_kbm(mapping, fileobj):
+    """
+    Write a keyboard mapping as a .kbm file
+    :param mapping: KeyboardMapping
+    :param fileobj: text file object to write to
+    """
+    fileobj.write('! Map size\n{0}\n'.format(mapping.size))
+    fileobj.write('! First and last MIDI note to retune\n{0}\n{1}\n'.format(
+        mapping.first_note, mapping.last_note))
+    fileobj.write('! Middle note (first degree)\n{0}\n'.format(
+        mapping.middle_note))
+    fileobj.write('! Reference note and frequency\n{0}\n{1:.6f}\n'.format(
+        mapping.reference_note, mapping.reference_freq))
+    fileobj.write('! Scale degree of the formal octave\n{0}\n'.format(
+        mapping.octave_degree))
+    fileobj.write('! Mapping\n')
+    for key in mapping.keys:
+        fileobj.write('{0}\n'.format('x' if key is None else key))
+
+
+def find_scl_files(root_dir):
+    """
+    Find the .scl files in a directory tree
+    :param root_dir: directory to search
+    :return: sorted list of file paths
+    """
+    paths = []
+    for dirpath, _, filenames in os.walk(root_dir):
+        for filename in filenames:
+            if filename.lower().endswith(SCL_EXTENSION):
+                paths.append(os.path.join(dirpath, filename))
+    return sorted(paths)
+
+
+def _read_scl_path(path):
+    """
+    Parse a .scl file by path (run in the worker processes)
+    :param path: path of the file
+    :return: SclData, None if the file can't be read or parsed
+    """
+    try:
+        with open(path, encoding='latin-1') as fileobj:
+            return read_scl_data(fileobj)
+    except (OSError, ValueError):
+        return None
+
+
+def scan_scl(paths, processes=None):
+    """
+    Parse many .scl files, in parallel worker processes
+    :param paths: list of file paths
+    :param processes: number of worker processes (default: one per CPU,
+                      1 to parse in this process)
+    :return: generator of (path, SclData or None) tuples, in order of paths
+    """
+    if processes == 1:
+        for path in paths:
+            yield path, _read_scl_path(path)
+        return
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from zip(paths, executor.map(
+            _read_scl_path, paths, chunksize=SCAN_CHUNK_SIZE))
+
+
+def build_index(root_dir, index_path, processes=None):
+    """
+    Parse every .scl file in a directory tree into an index file
+    (see ScalaIndex)
+    :param root_dir: directory to search for .scl files
+    :param index_path: path of the index file to write (numpy .npz)
+    :param processes: number of worker processes (see scan_scl)
+    :return: list of the paths that could not be parsed
+    """
+    names, descriptions, counts, cents, failed = [], [], [], [], []
+    paths = find_scl_files(root_dir)
+    for path, data in scan_scl(paths, processes=processes):
+        if data is None:
+            failed.append(path)
+            continue
+        name = os.path.splitext(os.path.relpath(path, root_dir))[0]
+        names.append(name.replace(os.sep, '/'))
+        descriptions.append(data.description)
+        counts.append(len(data.cents))
+        cents.extend(data.cents)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    with open(index_path, 'wb') as fileobj:
+        np.savez(
+            fileobj, names=np.array(names, dtype=str),
+            descriptions=np.array(descriptions, dtype=str),
+            counts=np.array(counts, dtype=np.int32), offsets=offsets,
+            cents=np.array(cents, dtype=np.float64))
+    return failed
+
+
+class ScalaIndex(object):
+    """
+    Class to look up scales in an index written by build_index
+    Scales are found by name (path relative to the indexed directory, with
+    / separators and without the .scl extension) and built from the stored
+    tones
+    """
+    def __init__(self, index_path):
+        """
+        Constructor
+        :param index_path: path of the index file
+        """
+        with np.load(index_path) as index:
+            self.__names = index['names']
+            self.__descriptions = index['descriptions']
+            self.__counts = index['counts']
+            self.__offsets = index['offsets']
+            self.__cents = index['cents']
+        self.__positions = {
+            name: position for position, name in enumerate(self.__names.tolist())
+        }
+
+    def __len__(self):
+        return len(self.__names)
+
+    @property
+    def names(self):
+        """
+        The names of the indexed scales
+        :return: list of names, in index order
+        """
+        return self.__names.tolist()
+
+    @property
+    def counts(self):
+        """
+        The number of tones (pitch lines) of each indexed scale
+        :return: numpy array, in index order
+        """
+        return self.__counts
+
+    def position(self, name):
+        """
+        Position of a scale in the index
+        :param name: name of the scale
+        :return: position, None if not in the index
+        """
+        return self.__positions.get(name)
+
+    def description(self, position):
+        """
+        Description line of an indexed scale
+        :param position: position of the scale in the index
+        :return: description
+        """
+        return str(self.__descriptions[position])
+
+    def cents(self, position):
+        """
+        Tones of an indexed scale, as in its .scl file
+        :param position: position of the scale in the index
+        :return: numpy array of cents above the root
+        """
+        return self.__cents[
+            self.__offsets[position]:self.__offsets[position + 1]]
+
+    def scale(self, name, root_note=None, scale_class=None, **options):
+        """
+        Build an indexed scale
+        :param name: name of the scale
+        :param root_note: Note object, root note for the scale (default None)
+        :param scale_class: class of scale to build (see scale_from_cents)
+        :param options: see scale_from_cents
+        :return: the scale, None if not in the index
+        Raises ValueError if the scale rejects any of the indexed pitches
+        """
+        position = self.position(name)
+        if position is None:
+            return None
+        return scale_from_cents(
+            self.cents(position).tolist(), root_note=root_note,
+            scale_class=scale_class, **options)
@@ -5,10 +5,10 @@ A class to hold a collection of tones defined as a scale
 
 The scale is defined by relative distances between each of the tones and the
 root.
-The base structure of the scale is provided by degree_tones. This is a
-dictionary of degree: tone, where 'degree' is the degree of the scale
-(with the root being 1) and 'tone' is the number of cents above the root for
-the degree.
+The base structure of the scale is a sorted store of tones, each tone the
+number of cents above the root. The degree of a tone is its position in the
+store (with the root being 1). degree_tones presents this as a dictionary of
+degree: tone.
 """
 
 __author__ = "Joel Luth"
@@ -19,70 +19,230 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
+import math
+from collections import namedtuple
+from types import MappingProxyType
+
 import lib.note as note
+import lib.ratios as ratios
+import lib.tone_store as tone_store
 
 MIN_CENTS = 0
+# Batches of at least this many tones are added as numpy arrays (add_tones)
+ARRAY_TONES = 128
+
+# Every frequency of a scale in a frequency range, with the degree of each
+# frequency and its octave (period) relative to the root
+ScaleFrequencies = namedtuple('ScaleFrequencies', ['freq', 'degree', 'octave'])
+
+# Nearest scale tone for a pitch: scale degree, octave (period) of the degree
+# relative to the root, and signed deviation of the pitch from the tone
+Quantized = namedtuple('Quantized', ['degree', 'octave', 'deviation'])
 
 
 class Scale(object):
     """
     Class to hold a musical scale
     """
-    def __init__(self, root_note=None, tones=None):
+    # default resolution in cents (eg tone_store.FIXED_POINT_RESOLUTION) to
+    # store tones in fixed point, each rounded to the nearest multiple of it
+    # (tones that round to the same multiple are the same tone); None stores
+    # tones exactly as given
+    TONE_RESOLUTION = None
+
+    def __init__(self, root_note=None, tones=None, tone_resolution=None):
         """
         Constructor
         :param root_note: Note object, root note for the scale (default None)
         :param tones: List of tones, each tone the number of cents above root
+        :param tone_resolution: resolution in cents to store the tones in
+                                fixed point (default self.TONE_RESOLUTION,
+                                see TONE_RESOLUTION)
+        Raises ValueError if tone_resolution is not positive
         """
+        if tone_resolution is None:
+            tone_resolution = self.TONE_RESOLUTION
+        if tone_resolution is not None and not tone_resolution > 0:
+            raise ValueError('tone resolution must be positive')
+        self.__tone_resolution = tone_resolution
         # First degree is always the root
-        self.__degree_tones = {1: 0}
+        self.__tones = self._new_tone_store()
         self.__root_note = None
+        # bumped on every change to the tones or root note,
+        # data derived from the scale is cached per version
+        self.__version = 0
+        self.__cache = dict()
+        self.__cache_version = 0
 
         self.root_note = root_note
         if tones is not None and isinstance(tones, (list,)):
             try:
-                for tone in sorted(tones):
-                    self.add_tone(tone)
+                sorted(tones)
             except TypeError:
+                # a list of tones that can't be ordered is ignored
                 pass
+            else:
+                self.add_tones(tones)
+
+    @classmethod
+    def from_tones(cls, tones, root_note=None, tone_resolution=None):
+        """
+        Build a scale from many tones at once
+        (invalid or duplicate tones are skipped, see add_tones)
+        :param tones: iterable of tones, each tone the number of cents above root
+        :param root_note: Note object, root note for the scale (default None)
+        :param tone_resolution: see __init__
+        :return: the new scale
+        """
+        new_scale = cls(root_note=root_note, tone_resolution=tone_resolution)
+        new_scale.add_tones(tones)
+        return new_scale
+
+    def with_tones(self, tones):
+        """
+        Build a scale of the same class, root note and tone resolution, with
+        other tones
+        :param tones: iterable of tones, each tone the number of cents above root
+        :return: the new scale
+        """
+        return type(self).from_tones(
+            tones, root_note=self.root_note,
+            tone_resolution=self.__tone_resolution)
+
+    @property
+    def tone_resolution(self):
+        """
+        getter for self.__tone_resolution
+        :return: resolution in cents the tones are stored at, None if they
+                 are stored exactly
+        """
+        return self.__tone_resolution
+
+    @property
+    def version(self):
+        """
+        getter for self.__version
+        :return: counter of changes to the scale tones and root note
+        """
+        return self.__version
+
+    def cached(self, key, build):
+        """
+        Get data derived from the scale, built once per scale version
+        (cached data must not be modified by callers)
+        :param key: hashable key for the data
+        :param build: function (no arguments) that builds the data
+        :return: the cached data
+        """
+        if self.__cache_version != self.__version:
+            self.__cache = dict()
+            self.__cache_version = self.__version
+        try:
+            return self.__cache[key]
+        except KeyError:
+            data = self.__cache[key] = build()
+            return data
+
+    def __getstate__(self):
+        """
+        State of the scale for pickling, without the cached data
+        (which can hold unpicklable views)
+        :return: dict of attributes
+        """
+        state = self.__dict__.copy()
+        state['_Scale__cache'] = dict()
+        return state
 
     @property
     def degree_tones(self):
         """
-        getter for __degree_tones
-        :return: dict of degree->tone, where tone is cents above root
+        degree->tone view of the scale tones
+        :return: read-only dict of degree->tone, where tone is cents above root
         """
-        return self.__degree_tones
+        return self.cached('degree_tones', lambda: MappingProxyType(
+            dict(enumerate(self.__tones, 1))))
 
     @property
     def degrees(self):
         """
         The degrees of the scale
-        :return: A sorted list of the scale degrees
+        :return: A sorted tuple of the scale degrees
         """
-        return sorted(list(self.degree_tones.keys()))
+        return self.cached(
+            'degrees', lambda: tuple(range(1, len(self.__tones) + 1)))
 
     @property
     def tones(self):
         """
         Get the tones of the scale, in cents above root
-        :return: A sorted list of tones in the scale
+        :return: A sorted tuple of tones in the scale
         """
-        return sorted(list(self.degree_tones.values()))
+        return self.cached('tones', lambda: tuple(self.__tones))
 
     @property
     def degree_steps_cents(self):
         """
         Get the steps of every degree (to the previous), in cents
-        :return: dict of degree->cents to previous degree
+        :return: read-only dict of degree->cents to previous degree
+        """
+        return self.cached('degree_steps_cents', self.__build_degree_steps)
+
+    def __build_degree_steps(self):
+        """
+        Build the steps of every degree (see degree_steps_cents)
+        :return: read-only dict of degree->cents to previous degree
         """
         steps = dict()
-        for degree, cents in self.degree_tones.items():
+        previous = None
+        fixed_point = self.__tone_resolution is not None
+        for degree, cents in enumerate(self.__tones, 1):
+            if fixed_point:
+                # subtract the integer fixed point keys, converting the
+                # step to cents once
+                cents = self.__tones.key(cents)
             if degree == 1:
                 steps[1] = 0
+            elif fixed_point:
+                steps[degree] = self.__tones.cents(cents - previous)
             else:
-                steps[degree] = cents - self.degree_tones[degree - 1]
-        return steps
+                steps[degree] = cents - previous
+            previous = cents
+        return MappingProxyType(steps)
+
+    @property
+    def period_cents(self):
+        """
+        The interval (in cents) at which the scale repeats
+        :return: None, a plain scale does not repeat
+        """
+        return None
+
+    def _changed(self):
+        """
+        Record a change to the tones or root note
+        (invalidates cached data)
+        """
+        self.__version += 1
+
+    def _new_tone_store(self):
+        """
+        Create the store for the tones of the scale
+        (subclasses can store their tones differently, see tone_store)
+        :return: tone store holding the root
+        """
+        if self.__tone_resolution is not None:
+            return tone_store.FixedPointTones([0], self.__tone_resolution)
+        return tone_store.SortedTones([0])
+
+    def _degree_position(self, degree):
+        """
+        Position of a degree in the tone store
+        :param degree: scale degree (1 is the first tone)
+        :return: 0-based position, None if not a degree of the scale
+        """
+        if degree not in range(1, len(self.__tones) + 1):
+            return None
+        return int(degree) - 1
 
     def add_tone(self, cents):
         """
@@ -92,28 +252,82 @@ class Scale(object):
                  None if invalid cents value
                  -1 if tone already exists in the scale
         """
-        my_tones = self.tones
-        new_degree = None
         try:
-            float(cents)
+            value = float(cents)
         except ValueError:
             return None
-        if cents < MIN_CENTS:
+        if not math.isfinite(value) or cents < MIN_CENTS:
             return None
-        if cents in my_tones:
+        position = self.__tones.add(cents)
+        if position == -1:
             return -1
-#        new_position = bisect.bisect(self.tones, cents)
-#        bisect.insort(self.__tones, cents)
-        my_tones.append(cents)
-        # Rebuild self.__degrees dictionary
-        i = 1
-        self.__degree_tones = dict()
-        for tone in sorted(my_tones):
-            self.__degree_tones[i] = tone
-            if tone == cents:
-                new_degree = i
-            i += 1
-        return new_degree
+        self._changed()
+        return position + 1
+
+    def _valid_tones(self, cents):
+        """
+        Check many tones against the scale constraints at once
+        Subclasses extend this along with add_tone
+        :param cents: numpy float array of tones, in cents above root
+        :return: numpy boolean array, True where the tone is valid
+        """
+        import numpy as np
+
+        return np.isfinite(cents) & (cents >= MIN_CENTS)
+
+    def add_tones(self, tones):
+        """
+        Add many tones to the scale at once
+        Small batches are added one tone at a time (see add_tone); batches of
+        ARRAY_TONES or more are validated, sorted and de-duplicated as one
+        numpy batch
+        :param tones: iterable of tones, each tone the number of cents above root
+        :return: list of the tones that were not added (invalid values,
+                 repeats and tones already in the scale), in input order
+        """
+        tones = list(tones)
+        if len(tones) < ARRAY_TONES:
+            return [
+                tone for tone in tones
+                if not hasattr(type(tone), '__float__')
+                or self.add_tone(tone) in (None, -1)
+            ]
+        return self.__add_tone_array(tones)
+
+    def __add_tone_array(self, tones):
+        """
+        Add a large batch of tones as numpy arrays (see add_tones)
+        :param tones: list of tones
+        :return: list of the tones that were not added, in input order
+        """
+        import numpy as np
+
+        numeric = [
+            i for i, tone in enumerate(tones)
+            if hasattr(type(tone), '__float__')
+        ]
+        cents = np.array([tones[i] for i in numeric], dtype=float)
+        valid = self._valid_tones(cents)
+        candidates = np.array(numeric, dtype=np.intp)[valid]
+        # first occurrence of each distinct tone, in tone order
+        # (the store decides which tones are the same)
+        keys, first = np.unique(
+            self.__tones.keys(cents[valid]), return_index=True)
+        candidates = candidates[first]
+        if len(self.__tones) < len(candidates):
+            existing = self.__tones.keys(
+                np.array(self.__tones.tolist(), dtype=float))
+            added = candidates[~np.isin(keys, existing)]
+        else:
+            # look the few candidates up in the (larger) store instead
+            added = np.array([
+                i for i in candidates.tolist() if tones[i] not in self.__tones
+            ], dtype=np.intp)
+        if len(added):
+            self.__tones.merge([tones[i] for i in added])
+            self._changed()
+        added = set(added.tolist())
+        return [tone for i, tone in enumerate(tones) if i not in added]
 
     def add_tone_rel_degree(self, degree, cents):
         """
@@ -125,11 +339,10 @@ class Scale(object):
         (can be negative to insert a tone below an existing degree)
         :return: the degree of the inserted tone, -1 if error
         """
-        new_degree = None
-        if degree not in self.degrees:
+        position = self._degree_position(degree)
+        if position is None:
             return -1
-        new_degree = self.add_tone(self.degree_tones[degree] + cents)
-        return new_degree
+        return self.add_tone(self.__tones[position] + cents)
 
     def move_degree(self, degree, cents):
         """
@@ -142,18 +355,18 @@ class Scale(object):
         if degree == 1:
             # can't remove the root
             return -1
-        cur_deg_tones = self.degree_tones.copy()
-        try:
-            del self.__degree_tones[degree]
-        except KeyError:
+        position = self._degree_position(degree)
+        if position is None:
             return -1
-        new_cents = cur_deg_tones[degree] + cents
-        new_degree = self.add_tone(new_cents)
+        old_cents = self.__tones.pop(position)
+        self._changed()
+        new_degree = self.add_tone(old_cents + cents)
         if new_degree is None or new_degree == -1:
             # Re-tuned tone doesn't fit our scale constraints?
-            # reset degree_tones and return error
+            # put the old tone back and return error
             # FIXME: -1 means tone re-tuned to an existing tone, maybe that's ok?
-            self.__degree_tones = cur_deg_tones
+            self.__tones.add(old_cents)
+            self._changed()
             return -1
         return 0
 
@@ -163,17 +376,241 @@ class Scale(object):
         :param degree:
         :return: 0 on success, -1 on error
         """
-        try:
-            del self.__degree_tones[degree]
-        except KeyError:
+        position = self._degree_position(degree)
+        if position is None:
             return -1
-        new_tones = self.tones
-        # Rebuild degree_tones
-        self.__degree_tones = dict()
-        for tone in new_tones:
-            self.add_tone(tone)
+        self.__tones.pop(position)
+        self._changed()
         return 0
 
+    def remove_degrees(self, degrees):
+        """
+        Remove many scale degrees at once
+        Degrees are numbered as they were before any removal
+        :param degrees: iterable of scale degrees
+        :return: list of the degrees that could not be removed (not in the
+                 scale, or repeated), in input order
+        """
+        positions = set()
+        rejected = []
+        for degree in degrees:
+            position = self._degree_position(degree)
+            if position is None or position in positions:
+                rejected.append(degree)
+            else:
+                positions.add(position)
+        if positions:
+            self.__tones.delete(positions)
+            self._changed()
+        return rejected
+
+    def period_tones(self):
+        """
+        The tones of one period of the scale (all tones for a scale that does
+        not repeat), leaving out tones at or above the period
+        :return: tuple of read-only numpy arrays (cents, degree)
+        """
+        return self.cached('period_tones', self.__build_period_tones)
+
+    def __build_period_tones(self):
+        """
+        Build the tones of one period (see period_tones)
+        :return: tuple of read-only numpy arrays (cents, degree)
+        """
+        import numpy as np
+
+        cents = np.array(self.__tones.tolist(), dtype=float)
+        degrees = np.arange(1, len(cents) + 1)
+        period = self.period_cents
+        if period is not None:
+            in_period = cents < period
+            cents = cents[in_period]
+            degrees = degrees[in_period]
+        cents.flags.writeable = False
+        degrees.flags.writeable = False
+        return cents, degrees
+
+    def _get_quantize_index(self):
+        """
+        Sorted tones to search for the nearest scale tone
+        For a repeating scale, the tones of one period are extended by the
+        nearest tone of the neighbouring periods on each side
+        :return: tuple of numpy arrays (cents, degree, octave offset)
+        """
+        return self.cached('quantize_index', self.__build_quantize_index)
+
+    def __build_quantize_index(self):
+        """
+        Build the nearest tone search index (see _get_quantize_index)
+        :return: tuple of numpy arrays (cents, degree, octave offset)
+        """
+        import numpy as np
+
+        cents, degrees = self.period_tones()
+        offsets = np.zeros(len(cents), dtype=int)
+        period = self.period_cents
+        if period is not None and len(cents):
+            cents = np.concatenate(
+                ([cents[-1] - period], cents, [cents[0] + period]))
+            degrees = np.concatenate(([degrees[-1]], degrees, [degrees[0]]))
+            offsets = np.zeros(len(cents), dtype=int)
+            offsets[0] = -1
+            offsets[-1] = 1
+        for index in (cents, degrees, offsets):
+            index.flags.writeable = False
+        return cents, degrees, offsets
+
+    def quantize_cents(self, cents):
+        """
+        Find the nearest scale tone for pitches given in cents above the root
+        (ties go to the lower tone)
+        :param cents: cents above root (number, numpy array, buffer or iterable)
+        :return: Quantized(degree, octave, deviation), where deviation is
+                 cents minus the cents of the scale tone; numbers for a number
+                 input, numpy arrays otherwise
+                 None if the scale has no tones
+        """
+        import numpy as np
+        import lib.arrays as arrays
+
+        index_cents, index_degrees, index_offsets = self._get_quantize_index()
+        if not len(index_cents):
+            return None
+        cents = arrays.as_array(cents, dtype=float)
+        scalar = cents.ndim == 0
+        period = self.period_cents
+        if period is None:
+            octaves = np.zeros(cents.shape, dtype=int)
+        else:
+            octaves = np.floor(cents / period)
+            cents = cents - octaves * period
+            octaves = octaves.astype(int)
+        nearest = np.zeros(cents.shape, dtype=int)
+        if len(index_cents) > 1:
+            upper = np.clip(
+                np.searchsorted(index_cents, cents), 1, len(index_cents) - 1)
+            lower = upper - 1
+            nearest = np.where(
+                cents - index_cents[lower] <= index_cents[upper] - cents,
+                lower, upper)
+        quantized = Quantized(
+            degree=index_degrees[nearest],
+            octave=octaves + index_offsets[nearest],
+            deviation=cents - index_cents[nearest])
+        if scalar:
+            return Quantized(*(value.item() for value in quantized))
+        return quantized
+
+    def quantize(self, freq_hz):
+        """
+        Find the nearest scale tone for frequencies
+        (see quantize_cents)
+        :param freq_hz: frequency in Hz (number, numpy array, buffer or iterable)
+        :return: Quantized(degree, octave, deviation)
+                 None if the scale has no root note
+        """
+        if self.root_note is None:
+            return None
+        if not isinstance(freq_hz, (int, float)):
+            import lib.arrays as arrays
+
+            freq_hz = arrays.as_array(freq_hz, dtype=float)
+        return self.quantize_cents(ratios.cents(self.root_note.freq, freq_hz))
+
+    def frequencies(
+            self, min_freq_hz=note.MIN_AUDIBLE_HZ, max_freq_hz=note.MAX_FREQ_HZ):
+        """
+        Every frequency the scale produces from its root note within a range,
+        repeating the tones by period for a repeating scale
+        :param min_freq_hz: lowest frequency to include, in Hz
+        :param max_freq_hz: highest frequency to include, in Hz
+        :return: ScaleFrequencies of read-only numpy arrays (freq, degree,
+                 octave), sorted by frequency
+                 None if the scale has no root note
+        """
+        if self.root_note is None:
+            return None
+        root_hz = self.root_note.freq
+        return self.cached(
+            ('frequencies', root_hz, min_freq_hz, max_freq_hz),
+            lambda: self.__build_frequencies(root_hz, min_freq_hz, max_freq_hz))
+
+    def __build_frequencies(self, root_hz, min_freq_hz, max_freq_hz):
+        """
+        Build every frequency of the scale within a range (see frequencies)
+        :param root_hz: frequency of the root note, in Hz
+        :param min_freq_hz: lowest frequency to include, in Hz
+        :param max_freq_hz: highest frequency to include, in Hz
+        :return: ScaleFrequencies of read-only numpy arrays
+        """
+        import numpy as np
+
+        octaves = self.__octave_range(root_hz, min_freq_hz, max_freq_hz)
+        freqs, degrees, octaves = self.__octave_frequencies(root_hz, octaves)
+        in_range = (freqs >= min_freq_hz) & (freqs <= max_freq_hz)
+        frequencies = ScaleFrequencies(
+            freq=freqs[in_range], degree=degrees[in_range],
+            octave=octaves[in_range])
+        for values in frequencies:
+            values.flags.writeable = False
+        return frequencies
+
+    def __octave_range(self, root_hz, min_freq_hz, max_freq_hz):
+        """
+        Octaves (periods) of the scale that can produce frequencies in a range
+        :param root_hz: frequency of the root note, in Hz
+        :param min_freq_hz: lowest frequency, in Hz
+        :param max_freq_hz: highest frequency, in Hz
+        :return: range of octave numbers, relative to the root
+        """
+        cents, _ = self.period_tones()
+        period = self.period_cents
+        if period is None or not len(cents) or min_freq_hz > max_freq_hz:
+            return range(int(len(cents) > 0))
+        low = ratios.cents(root_hz, min_freq_hz) - cents[-1]
+        high = ratios.cents(root_hz, max_freq_hz) - cents[0]
+        return range(math.floor(low / period), math.floor(high / period) + 1)
+
+    def __octave_frequencies(self, root_hz, octaves):
+        """
+        Frequencies of the period tones in several octaves, by broadcasting
+        :param root_hz: frequency of the root note, in Hz
+        :param octaves: sequence of octave numbers, relative to the root
+        :return: tuple of flat numpy arrays (freq, degree, octave)
+        """
+        import numpy as np
+
+        cents, degrees = self.period_tones()
+        octaves = np.asarray(octaves, dtype=int)
+        period = self.period_cents or 0
+        all_cents = octaves[:, np.newaxis] * period + cents
+        shape = all_cents.shape
+        return (
+            (root_hz * 2.0 ** (all_cents / ratios.OCTAVE_CENTS)).ravel(),
+            np.broadcast_to(degrees, shape).ravel(),
+            np.broadcast_to(octaves[:, np.newaxis], shape).ravel(),
+        )
+
+    def iter_frequencies(
+            self, min_freq_hz=note.MIN_AUDIBLE_HZ, max_freq_hz=note.MAX_FREQ_HZ):
+        """
+        Lazily generate the frequencies of the scale within a range,
+        one octave (period) at a time (see frequencies)
+        :param min_freq_hz: lowest frequency to include, in Hz
+        :param max_freq_hz: highest frequency to include, in Hz
+        :return: generator of (freq, degree, octave) tuples, by frequency
+                 (empty if the scale has no root note)
+        """
+        if self.root_note is None:
+            return
+        root_hz = self.root_note.freq
+        for octave in self.__octave_range(root_hz, min_freq_hz, max_freq_hz):
+            freqs, degrees, octaves = self.__octave_frequencies(
+                root_hz, [octave])
+            for freq, degree in zip(freqs.tolist(), degrees.tolist()):
+                if min_freq_hz <= freq <= max_freq_hz:
+                    yield freq, degree, octave
+
     @property
     def root_note(self):
         """
@@ -194,10 +631,12 @@ class Scale(object):
         if isinstance(new_root, note.Note):
             freq_ratio = self.freq_ratio(new_root.freq)
             self.__root_note = new_root
+            self._changed()
         elif isinstance(new_root, int):
             new_root_note = note.Note(new_root)
             freq_ratio = self.freq_ratio(new_root_note.freq)
             self.__root_note = new_root_note
+            self._changed()
         return freq_ratio
 
     def freq_ratio(self, new_freq):
@@ -13,7 +13,8 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
-import lib.scale_octave as scale_octave
+import lib.pitch_class_set as pitch_class_set
+import lib.scale_edo as scale_edo
 
 SEMITONE_CENTS = 100
 HALF = SEMITONE_CENTS
@@ -21,27 +22,40 @@ WHOLE = HALF * 2
 WHOLEHALF = WHOLE + HALF
 
 
-class Scale12EDO(scale_octave.ScaleOctave):
+class Scale12EDO(scale_edo.ScaleEDO):
     """
     Class to build a 12-EDO musical scale
     """
-    def __init__(self, root_note=None, tones=None):
+    EDO = pitch_class_set.PITCH_CLASSES
+
+    def __init__(self, root_note=None, tones=None, edo=None):
         """
         Constructor
         :param root_note: Note object, root note for the scale (default None)
         :param tones: List of tones, each tone the number of cents above root
+        :param edo: 12 or None (for ScaleEDO's class methods)
+        Raises ValueError if edo is not 12
+        """
+        if edo not in (None, self.EDO):
+            raise ValueError('Scale12EDO divides the octave in 12')
+        super(Scale12EDO, self).__init__(self.EDO, root_note, tones)
+
+    @classmethod
+    def from_bitmask(cls, mask, root_note=None):
+        """
+        Build a scale from a pitch class mask (see pitch_class_set)
+        :param mask: 12-bit pitch class mask, bit n for n semitones above root
+        :param root_note: Note object, root note for the scale (default None)
+        :return: the new scale
         """
-        super(Scale12EDO, self).__init__(root_note, tones)
+        return cls.from_steps(
+            scale_edo.steps_from_mask(mask & pitch_class_set.FULL_MASK),
+            root_note=root_note)
 
-    def add_tone(self, cents):
+    @property
+    def bitmask(self):
         """
-        Add a tone to the scale
-        :param cents: difference from scale root, in cents
-        :return: new position of the tone in the scale
-                 None if invalid cents value
-                 -1 if tone already exists in the scale
-        Raises ValueError if cents out of range
+        The pitch classes of the scale as a 12-bit mask (see pitch_class_set)
+        :return: mask, bit n set for a tone n semitones above root
         """
-        if cents % SEMITONE_CENTS != 0:
-            return None
-        return super().add_tone(cents)
+        return self.pitch_class_mask
@@ -0,0 +1,259 @@
+"""
+scale_edo.py
+A class to hold a scale of an equal division of the octave (n-EDO),
+eg 12-EDO, or the 19-, 31- and 53-EDO tunings
+Extends ./scale_octave.py
+
+The tones are stored as integer steps above the root (see
+tone_store.StepTones), so membership, pitch classes and transposition are
+integer and bitwise operations, and tones given in cents are matched to
+their step without floating point drift. Pitch class masks generalize
+pitch_class_set's 12-bit masks to n bits.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numbers
+
+import lib.ratios as ratios
+import lib.scale_octave as scale_octave
+import lib.tone_store as tone_store
+
+
+def mask_from_steps(steps, edo):
+    """
+    Pitch class mask of n-EDO steps
+    :param steps: iterable of steps above the root
+    :param edo: number of equal steps per octave
+    :return: mask, bit n set for pitch class n (steps taken mod edo)
+    """
+    mask = 0
+    for step in steps:
+        mask |= 1 << (step % edo)
+    return mask
+
+
+def steps_from_mask(mask):
+    """
+    Steps of a pitch class (or step) mask
+    :param mask: mask, bit n set for step n
+    :return: sorted list of steps
+    """
+    return [step for step in range(mask.bit_length()) if mask >> step & 1]
+
+
+def transpose_mask(mask, steps, edo):
+    """
+    Transpose a pitch class mask (rotate its bits)
+    :param mask: pitch class mask of edo bits
+    :param steps: steps to transpose up (negative for down)
+    :param edo: number of equal steps per octave
+    :return: transposed mask
+    """
+    steps %= edo
+    return ((mask << steps) | (mask >> (edo - steps))) & ((1 << edo) - 1)
+
+
+class ScaleEDO(scale_octave.ScaleOctave):
+    """
+    Class to build a scale of an equal division of the octave
+    """
+    # steps per octave of subclasses for one tuning (None: set per scale)
+    EDO = None
+
+    def __init__(self, edo=None, root_note=None, tones=None):
+        """
+        Constructor
+        :param edo: number of equal steps per octave (default self.EDO)
+        :param root_note: Note object, root note for the scale (default None)
+        :param tones: List of tones, each tone the number of cents above root
+        Raises ValueError if edo is not a positive integer
+        """
+        if edo is None:
+            edo = self.EDO
+        if not isinstance(edo, int) or edo < 1:
+            raise ValueError('edo must be a positive integer')
+        self.__edo = edo
+        self.__store = None
+        super(ScaleEDO, self).__init__(root_note, tones)
+
+    def _new_tone_store(self):
+        """
+        Create the store for the tones of the scale, as integer steps
+        (the steps already fix the tones, so there is no tone resolution)
+        :return: tone_store.StepTones holding the root
+        Raises ValueError if a tone resolution is set (see TONE_RESOLUTION)
+        """
+        if self.tone_resolution is not None:
+            raise ValueError('EDO scales store steps, not fixed point tones')
+        self.__store = tone_store.StepTones(self.__edo, [0])
+        return self.__store
+
+    @classmethod
+    def from_tones(cls, tones, root_note=None, tone_resolution=None, *,
+                   edo=None):
+        """
+        Build a scale from many tones at once
+        (invalid or duplicate tones are skipped, see add_tones)
+        :param tones: iterable of tones, each tone the number of cents above root
+        :param root_note: Note object, root note for the scale (default None)
+        :param tone_resolution: None (EDO scales store steps, see
+                                _new_tone_store)
+        :param edo: number of equal steps per octave (default cls.EDO)
+        :return: the new scale
+        Raises ValueError if tone_resolution is set
+        """
+        if tone_resolution is not None:
+            raise ValueError('EDO scales store steps, not fixed point tones')
+        new_scale = cls(edo=edo, root_note=root_note)
+        new_scale.add_tones(tones)
+        return new_scale
+
+    @classmethod
+    def from_steps(cls, steps, root_note=None, *, edo=None):
+        """
+        Build a scale from integer steps above the root
+        (invalid or duplicate steps are skipped, see add_steps)
+        :param steps: iterable of steps (0 to edo)
+        :param root_note: Note object, root note for the scale (default None)
+        :param edo: number of equal steps per octave (default cls.EDO)
+        :return: the new scale
+        """
+        new_scale = cls(edo=edo, root_note=root_note)
+        new_scale.add_steps(steps)
+        return new_scale
+
+    def with_tones(self, tones):
+        """
+        Build a scale of the same class, root note and division of the
+        octave, with other tones
+        :param tones: iterable of tones, each tone the number of cents above root
+        :return: the new scale
+        """
+        return type(self).from_tones(
+            tones, root_note=self.root_note, edo=self.__edo)
+
+    @property
+    def edo(self):
+        """
+        getter for self.__edo
+        :return: number of equal steps per octave
+        """
+        return self.__edo
+
+    @property
+    def step_cents(self):
+        """
+        Size of one step
+        :return: cents per step
+        """
+        return ratios.OCTAVE_CENTS / self.__edo
+
+    @property
+    def steps(self):
+        """
+        The tones of the scale as integer steps
+        :return: sorted tuple of steps above the root
+        """
+        return self.__store.steps()
+
+    @property
+    def pitch_class_mask(self):
+        """
+        The pitch classes of the scale as an edo-bit mask
+        :return: mask, bit n set for a tone n steps (mod edo) above root
+        """
+        return self.cached(
+            'pitch_class_mask',
+            lambda: mask_from_steps(self.steps, self.__edo))
+
+    def step_of(self, cents):
+        """
+        Step of a tone
+        :param cents: tone, cents above the root
+        :return: steps above the root, None if the tone is not on a step
+        """
+        return self.__store.step(cents)
+
+    def has_step(self, step):
+        """
+        Check if the scale has a tone
+        :param step: steps above the root
+        :return: True if the scale has the tone step steps above root
+        """
+        return step >= 0 and bool(self.__store.mask >> step & 1)
+
+    def has_pitch_class(self, pitch_class):
+        """
+        Check if the scale has a pitch class
+        :param pitch_class: steps above root (any integer, taken mod edo)
+        :return: True if a tone of the scale is in the pitch class
+        """
+        return bool(self.pitch_class_mask >> (pitch_class % self.__edo) & 1)
+
+    def transposed_mask(self, steps):
+        """
+        The pitch classes of the scale, transposed
+        :param steps: steps to transpose up (negative for down)
+        :return: edo-bit pitch class mask
+        """
+        return transpose_mask(self.pitch_class_mask, steps, self.__edo)
+
+    def add_tone(self, cents):
+        """
+        Add a tone to the scale
+        :param cents: difference from scale root, in cents
+        :return: new position of the tone in the scale
+                 None if invalid cents value (or not on a step)
+                 -1 if tone already exists in the scale
+        """
+        try:
+            step = self.__store.step(float(cents))
+        except (ValueError, OverflowError):
+            return None
+        if step is None:
+            return None
+        return super().add_tone(cents)
+
+    def add_steps(self, steps):
+        """
+        Add many tones at once, as integer steps above the root
+        :param steps: iterable of steps (0 to edo), any integer type
+                      (including numpy integers) except bool
+        :return: list of the steps that were not added (not an integer, out
+                 of range, repeated, or already in the scale), in input order
+        """
+        mask = self.__store.mask
+        rejected = []
+        for step in steps:
+            if (not isinstance(step, numbers.Integral)
+                    or isinstance(step, bool)
+                    or not 0 <= step <= self.__edo or mask >> int(step) & 1):
+                rejected.append(step)
+                continue
+            mask |= 1 << int(step)
+        if mask != self.__store.mask:
+            self.__store.mask = mask
+            self._changed()
+        return rejected
+
+    def _valid_tones(self, cents):
+        """
+        Check many tones against the scale constraints at once
+        :param cents: numpy float array of tones, in cents above root
+        :return: numpy boolean array, True where the tone is on a step
+        """
+        import numpy as np
+
+        valid = super()._valid_tones(cents)
+        steps = self.__store.keys(cents[valid])
+        valid[valid] = np.abs(
+            steps * (ratios.OCTAVE_CENTS / self.__edo) - cents[valid]
+        ) <= tone_store.STEP_TOLERANCE_CENTS
+        return valid
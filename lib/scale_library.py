@@ -0,0 +1,392 @@
+"""
+scale_library.py
+A packed binary file format for large libraries of scales
+
+The file holds every tone of every scale in one flat float64 array, with
+an offsets array marking where each scale starts, and a metadata table
+(root frequency, scale class, tone resolution and name of each scale). It
+is opened with numpy.memmap, so the scales are read-only views of the file
+that the OS page cache shares between processes; a full Scale object is
+only built when asked for.
+
+Tones are stored as float64 cents. Fixed point scales (see
+Scale.tone_resolution) keep their resolution and are rebuilt on the same
+grid, and int tones come back as equal floats (except in EDO scales, which
+store int steps). Tones that are not real numbers, like exact
+ratios.Ratio tones, can't be stored without losing them, so write_library
+rejects them.
+
+Layout (little-endian), every section starting on an 8 byte boundary:
+    header
+    offsets       int64[count + 1]    first tone of each scale in cents
+    name_offsets  int64[count + 1]    first byte of each name in names
+    cents         float64[tones]      tones of all scales, cents above root
+    root_freqs    float64[count]      root frequency in Hz (nan if none)
+    resolutions   float64[count]      tone resolution in cents (nan if none)
+    edos          uint32[count]       steps per octave of an EDO scale (0 if
+                                      not an EDO scale)
+    kinds         uint8[count]        scale class, index into KINDS
+    names         bytes               utf-8 names
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import math
+import numbers
+
+import numpy as np
+
+import lib.note as note
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_edo as scale_edo
+import lib.scale_octave as scale_octave
+
+MAGIC = b'MUSCALIB'
+FORMAT_VERSION = 3
+HEADER = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('count', '<u4'),
+    ('tones', '<u8'),
+    ('names_size', '<u8'),
+])
+ALIGN = 8
+# Scale classes that can be stored (a scale is stored as the most derived
+# class it is an instance of)
+KINDS = (
+    scale.Scale, scale_octave.ScaleOctave, scale_12edo.Scale12EDO,
+    scale_edo.ScaleEDO)
+
+
+def _aligned(size):
+    """
+    Round a size up to the section alignment
+    :param size: size in bytes
+    :return: aligned size in bytes
+    """
+    return -(-size // ALIGN) * ALIGN
+
+
+def _kind(myscale):
+    """
+    Storage code for the class of a scale
+    :param myscale: scale.Scale (or subclass)
+    :return: index into KINDS of the most specific matching class
+    """
+    kinds = [
+        kind for kind in range(len(KINDS)) if isinstance(myscale, KINDS[kind])
+    ]
+    if not kinds:
+        raise TypeError('not a scale: {0!r}'.format(myscale))
+    return max(kinds, key=lambda kind: len(KINDS[kind].__mro__))
+
+
+def _sections(count, tones, names_size):
+    """
+    Byte offsets of the sections of a library file
+    :param count: number of scales
+    :param tones: total number of tones
+    :param names_size: size of the names in bytes
+    :return: dict of section name -> (offset, numpy dtype, item count),
+             and the total file size
+    """
+    layout = [
+        ('offsets', '<i8', count + 1),
+        ('name_offsets', '<i8', count + 1),
+        ('cents', '<f8', tones),
+        ('root_freqs', '<f8', count),
+        ('resolutions', '<f8', count),
+        ('edos', '<u4', count),
+        ('kinds', 'u1', count),
+        ('names', 'u1', names_size),
+    ]
+    sections = dict()
+    position = _aligned(HEADER.itemsize)
+    for name, dtype, items in layout:
+        sections[name] = (position, np.dtype(dtype), items)
+        position = _aligned(position + np.dtype(dtype).itemsize * items)
+    return sections, position
+
+
+def write_library(path, entries):
+    """
+    Write scales to a library file
+    :param path: path of the file to write
+    :param entries: iterable of (name, scale) tuples
+    Raises ValueError if a scale has tones that aren't real numbers (eg
+    ratios.Ratio), which can't be stored exactly
+    """
+    names, tones, root_freqs, resolutions, edos, kinds = [], [], [], [], [], []
+    for name, myscale in entries:
+        if not all(isinstance(tone, numbers.Real) for tone in myscale.tones):
+            raise ValueError(
+                'scale {0!r} has tones that are not real numbers (convert '
+                'them to float cents to store them)'.format(name))
+        names.append(name.encode('utf-8'))
+        tones.append(np.array(myscale.tones, dtype=np.float64))
+        root = myscale.root_note
+        root_freqs.append(math.nan if root is None else root.freq)
+        resolution = myscale.tone_resolution
+        resolutions.append(math.nan if resolution is None else resolution)
+        edos.append(getattr(myscale, 'edo', 0))
+        kinds.append(_kind(myscale))
+    data = {
+        'offsets': np.cumsum([0] + [len(t) for t in tones]),
+        'name_offsets': np.cumsum([0] + [len(n) for n in names]),
+        'cents': np.concatenate(tones) if tones else [],
+        'root_freqs': root_freqs,
+        'resolutions': resolutions,
+        'edos': edos,
+        'kinds': kinds,
+        'names': np.frombuffer(b''.join(names), dtype=np.uint8),
+    }
+    sections, size = _sections(
+        len(names), len(data['cents']), len(data['names']))
+    header = np.zeros(1, dtype=HEADER)
+    header[0] = (
+        MAGIC, FORMAT_VERSION, len(names), len(data['cents']),
+        len(data['names']))
+    with open(path, 'wb') as fileobj:
+        fileobj.write(header.tobytes())
+        for name, (offset, dtype, _) in sections.items():
+            fileobj.write(b'\0' * (offset - fileobj.tell()))
+            fileobj.write(np.asarray(data[name], dtype=dtype).tobytes())
+        fileobj.write(b'\0' * (size - fileobj.tell()))
+
+
+class ScaleView(object):
+    """
+    Class for a scale stored in a library, without building a Scale
+    """
+    __slots__ = (
+        'name', 'cents', 'root_freq', 'kind', 'edo', 'tone_resolution')
+
+    def __init__(
+            self, name, cents, root_freq, kind, edo=None,
+            tone_resolution=None):
+        """
+        Constructor
+        :param name: name of the scale
+        :param cents: read-only numpy array of tones (view of the library)
+        :param root_freq: root frequency in Hz, None if no root
+        :param kind: class of the scale
+        :param edo: steps per octave of an EDO scale, None if not an EDO scale
+        :param tone_resolution: resolution of the tones in cents, None if
+                                not a fixed point scale
+        """
+        self.name = name
+        self.cents = cents
+        self.root_freq = root_freq
+        self.kind = kind
+        self.edo = edo
+        self.tone_resolution = tone_resolution
+
+    def to_scale(self):
+        """
+        Build the full scale object
+        :return: scale of the stored class
+        """
+        root_note = None
+        if self.root_freq is not None:
+            root_note = note.Note(self.root_freq)
+        if self.edo is not None:
+            return self.kind.from_tones(
+                self.cents.tolist(), root_note=root_note, edo=self.edo)
+        return self.kind.from_tones(
+            self.cents.tolist(), root_note=root_note,
+            tone_resolution=self.tone_resolution)
+
+
+class ScaleLibrary(object):
+    """
+    Class to read a library file written by write_library
+    Opening the file maps it into memory; nothing is parsed or copied.
+    close() (or using the library as a context manager) releases the map
+    """
+    def __init__(self, path):
+        """
+        Constructor
+        :param path: path of the library file
+        Raises ValueError if the file is not a scale library
+        """
+        self.__data = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self.__data) < HEADER.itemsize:
+            raise ValueError('not a scale library file')
+        header = self.__data[:HEADER.itemsize].view(HEADER)[0]
+        if header['magic'] != MAGIC or header['version'] != FORMAT_VERSION:
+            raise ValueError('not a scale library file')
+        sections, size = _sections(
+            int(header['count']), int(header['tones']),
+            int(header['names_size']))
+        if len(self.__data) < size:
+            raise ValueError('truncated scale library file')
+        views = {
+            name: self.__data[offset:offset + dtype.itemsize * items]
+            .view(dtype)
+            for name, (offset, dtype, items) in sections.items()
+        }
+        self.__offsets = views['offsets']
+        self.__name_offsets = views['name_offsets']
+        self.__cents = views['cents']
+        self.__root_freqs = views['root_freqs']
+        self.__resolutions = views['resolutions']
+        self.__edos = views['edos']
+        self.__kinds = views['kinds']
+        self.__names = views['names']
+        self.__positions = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Release the memory map of the file
+        Arrays taken from the library (eg ScaleView.cents) are views of the
+        map, and keep it open until they are freed too
+        """
+        self.__data = None
+        self.__offsets = self.__name_offsets = self.__cents = None
+        self.__root_freqs = self.__resolutions = self.__edos = None
+        self.__kinds = self.__names = self.__positions = None
+
+    @property
+    def closed(self):
+        """
+        Check if the library has been closed
+        :return: True if closed
+        """
+        return self.__data is None
+
+    def __check_open(self):
+        """
+        Raises ValueError if the library has been closed
+        """
+        if self.closed:
+            raise ValueError('scale library is closed')
+
+    def __len__(self):
+        self.__check_open()
+        return len(self.__kinds)
+
+    def __position(self, position):
+        """
+        Check and normalize a position, as for a list
+        :param position: position of a scale (negative counts from the end)
+        :return: position, 0 <= position < len(self)
+        Raises IndexError if position is out of range
+        Raises ValueError if the library has been closed
+        """
+        if not -len(self) <= position < len(self):
+            raise IndexError('scale library index out of range')
+        return int(position) % len(self)
+
+    def __getitem__(self, position):
+        """
+        Stored scale at a position
+        :param position: position of the scale in the library (negative
+                         counts from the end)
+        :return: ScaleView
+        Raises IndexError if position is out of range
+        """
+        position = self.__position(position)
+        root_freq = float(self.__root_freqs[position])
+        resolution = float(self.__resolutions[position])
+        return ScaleView(
+            name=self.name(position), cents=self.cents(position),
+            root_freq=None if math.isnan(root_freq) else root_freq,
+            kind=KINDS[self.__kinds[position]],
+            edo=int(self.__edos[position]) or None,
+            tone_resolution=None if math.isnan(resolution) else resolution)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    @property
+    def offsets(self):
+        """
+        Where each scale starts in the flat tone array
+        :return: read-only numpy int64 array (one more than the scales)
+        Raises ValueError if the library has been closed
+        """
+        self.__check_open()
+        return self.__offsets
+
+    @property
+    def all_cents(self):
+        """
+        Tones of every scale, as one flat array (see offsets)
+        :return: read-only numpy float64 array
+        Raises ValueError if the library has been closed
+        """
+        self.__check_open()
+        return self.__cents
+
+    @property
+    def counts(self):
+        """
+        Number of tones of each scale
+        :return: numpy int64 array
+        Raises ValueError if the library has been closed
+        """
+        return np.diff(self.offsets)
+
+    def name(self, position):
+        """
+        Name of a stored scale
+        :param position: position of the scale in the library (negative
+                         counts from the end)
+        :return: name
+        Raises IndexError if position is out of range
+        """
+        position = self.__position(position)
+        start, end = self.__name_offsets[position:position + 2]
+        return self.__names[start:end].tobytes().decode('utf-8')
+
+    def position(self, name):
+        """
+        Position of a scale in the library
+        (the first call builds a name lookup table)
+        :param name: name of the scale
+        :return: position, None if not in the library
+        Raises ValueError if the library has been closed
+        """
+        self.__check_open()
+        if self.__positions is None:
+            self.__positions = dict()
+            for position in range(len(self)):
+                self.__positions.setdefault(self.name(position), position)
+        return self.__positions.get(name)
+
+    def cents(self, position):
+        """
+        Tones of a stored scale
+        :param position: position of the scale in the library (negative
+                         counts from the end)
+        :return: read-only numpy array view of the tones, cents above root
+        Raises IndexError if position is out of range
+        """
+        position = self.__position(position)
+        start, end = self.__offsets[position:position + 2]
+        return self.__cents[start:end]
+
+    def scale(self, name):
+        """
+        Build a stored scale
+        :param name: name of the scale
+        :return: the scale, None if not in the library
+        """
+        position = self.position(name)
+        if position is None:
+            return None
+        return self[position].to_scale()
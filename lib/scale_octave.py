@@ -23,13 +23,22 @@ class ScaleOctave(scale.Scale):
     """
     Class to build an octave-based (2:1 freq) musical scale
     """
-    def __init__(self, root_note=None, tones=None):
+    def __init__(self, root_note=None, tones=None, tone_resolution=None):
         """
         Constructor
         :param root_note: Note object, root note for the scale (default None)
         :param tones: List of tones, each tone the number of cents above root
+        :param tone_resolution: see scale.Scale
         """
-        super(ScaleOctave, self).__init__(root_note, tones)
+        super(ScaleOctave, self).__init__(root_note, tones, tone_resolution)
+
+    @property
+    def period_cents(self):
+        """
+        The interval (in cents) at which the scale repeats
+        :return: OCTAVE_CENTS
+        """
+        return OCTAVE_CENTS
 
     def add_tone(self, cents):
         """
@@ -43,3 +52,11 @@ class ScaleOctave(scale.Scale):
         if cents > MAX_CENTS:
             return None
         return super().add_tone(cents)
+
+    def _valid_tones(self, cents):
+        """
+        Check many tones against the scale constraints at once
+        :param cents: numpy float array of tones, in cents above root
+        :return: numpy boolean array, True where the tone is valid
+        """
+        return super()._valid_tones(cents) & (cents <= MAX_CENTS)
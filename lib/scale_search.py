@@ -0,0 +1,260 @@
+"""
+scale_search.py
+Nearest-neighbour search for similar scales in a large collection
+
+Scales are compared as sets of pitch classes (tones reduced to one octave)
+with a cents distance: for each tone of one scale, the distance around the
+octave circle to the nearest tone of the other scale, averaged over the
+tones of both scales. This handles scales with different numbers of tones.
+Optionally the query is also re-rooted on each of its tones, so a scale
+matches all of its modes (rotations).
+
+The indexed scales are bucketed by tone count and stored as dense numpy
+matrices, so each query is a few batched array computations, and by
+default every indexed scale is ranked by the exact cents distance.
+Optionally a query can first shortlist candidates by the Fourier
+coefficients of the pitch class sets (whose magnitudes don't change when a
+set is rotated), a single small matrix operation, and then rank only the
+shortlist. That is faster on very large indexes but approximate: the
+Fourier distance doesn't order scales the same way as the cents distance,
+so some of the exact nearest neighbours can be missed.
+
+An exact query is a brute force scan: its cost grows as
+scales x (query tones + 1) x query tones x scale tones (the query and its
+re-rootings against every tone of every compared scale), without
+rotations the (query tones + 1) factor drops to 1. Over 100k random scales
+of 5 to 12 tones that is about 2 s per query; restricting count_tolerance
+scans fewer buckets. Queries in tens of milliseconds at that size need the
+opt-in shortlist, whose cost is scales x COEFFICIENTS plus the exact
+ranking of the shortlist (a 1000 candidate shortlist takes about 30 ms,
+but finds roughly 70% of the exact 10 nearest neighbours). See
+benchmarks/bench_scale_search.py.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+from collections import namedtuple
+
+import numpy as np
+
+import lib.ratios as ratios
+
+# Limit on the elements of the intermediate distance arrays of a query
+CHUNK_ELEMENTS = 1 << 21
+# Fourier coefficients of the pitch class sets used to shortlist candidates
+COEFFICIENTS = 12
+# Default number of candidates ranked by cents distance per query
+# (None: rank every compared scale, exactly)
+SHORTLIST = None
+
+# A search result: position of the scale in the index and its distance
+Match = namedtuple('Match', ['position', 'distance'])
+
+
+def pitch_classes(tones):
+    """
+    Tones reduced to sorted, distinct pitch classes within an octave
+    :param tones: a scale (anything with tones, or cents like a
+                  scale_library.ScaleView), or a sequence of cents
+    :return: numpy float array of cents, 0 <= cents < OCTAVE_CENTS
+    """
+    if hasattr(tones, 'tones'):
+        tones = tones.tones
+    elif hasattr(tones, 'cents'):
+        tones = tones.cents
+    return np.unique(
+        np.mod(np.asarray(tones, dtype=float), ratios.OCTAVE_CENTS))
+
+
+def rerooted(classes):
+    """
+    A set of pitch classes re-rooted on each of its tones
+    :param classes: numpy array (n,) of pitch classes
+    :return: numpy array (n, n), row r re-rooted on tone r (not sorted)
+    """
+    return np.mod(classes - classes[:, np.newaxis], ratios.OCTAVE_CENTS)
+
+
+def fourier(classes):
+    """
+    Fourier coefficients of pitch class sets, normalized by the set sizes
+    :param classes: numpy array (m, n), m sets of n pitch classes
+    :return: complex numpy array (m, COEFFICIENTS) for coefficients 1 and up
+             (0 for empty sets)
+    """
+    harmonics = np.arange(1, COEFFICIENTS + 1)
+    phases = (2j * np.pi / ratios.OCTAVE_CENTS) * classes[..., np.newaxis]
+    return np.exp(phases * harmonics).sum(axis=-2) / max(1, classes.shape[-1])
+
+
+def set_distances(queries, candidates):
+    """
+    Cents distances between query and candidate pitch class sets
+    :param queries: numpy array (r, q), r sets of q pitch classes
+    :param candidates: numpy array (m, c), m sets of c pitch classes
+    :return: numpy array (r, m) of distances in cents
+    """
+    diff = np.abs(
+        queries[:, np.newaxis, :, np.newaxis]
+        - candidates[np.newaxis, :, np.newaxis, :])
+    diff = np.minimum(diff, ratios.OCTAVE_CENTS - diff)
+    # nearest candidate tone for each query tone, and the other way around
+    query_side = diff.min(axis=3).mean(axis=2)
+    candidate_side = diff.min(axis=2).mean(axis=2)
+    return (query_side + candidate_side) / 2
+
+
+class SimilarityIndex(object):
+    """
+    Class to find the scales in a collection closest to a query scale
+    """
+    def __init__(self, scales):
+        """
+        Constructor
+        :param scales: iterable of scales (or ScaleViews, or sequences of
+                       cents); positions in this sequence identify results
+        """
+        buckets = dict()
+        count = 0
+        for position, tones in enumerate(scales):
+            classes = pitch_classes(tones)
+            buckets.setdefault(len(classes), ([], []))
+            buckets[len(classes)][0].append(position)
+            buckets[len(classes)][1].append(classes)
+            count += 1
+        self.__count = count
+        # tone count -> (positions, matrix of pitch classes, coefficients)
+        self.__buckets = dict()
+        for tone_count, (positions, classes) in sorted(buckets.items()):
+            classes = np.array(classes, dtype=float).reshape(
+                len(positions), tone_count)
+            self.__buckets[tone_count] = (
+                np.array(positions, dtype=np.int64), classes, fourier(classes))
+
+    def __len__(self):
+        return self.__count
+
+    @property
+    def tone_counts(self):
+        """
+        The numbers of pitch classes of the indexed scales
+        :return: dict of tone count -> number of scales
+        """
+        return {
+            tone_count: len(positions)
+            for tone_count, (positions, _, _) in self.__buckets.items()
+        }
+
+    def __shortlist(self, classes, buckets, rotations, shortlist):
+        """
+        Candidates closest to a query by Fourier coefficients
+        :param classes: pitch classes of the query
+        :param buckets: tone counts of the buckets to search
+        :param rotations: compare coefficient magnitudes (rotation invariant)
+        :param shortlist: number of candidates
+        :return: dict of tone count -> rows of the bucket
+        """
+        query = fourier(classes)
+        if rotations:
+            query = np.abs(query)
+        distances = []
+        for tone_count in buckets:
+            coefficients = self.__buckets[tone_count][2]
+            if rotations:
+                coefficients = np.abs(coefficients)
+            distances.append(np.abs(coefficients - query).sum(axis=1))
+        distances = np.concatenate(distances)
+        nearest = np.sort(np.argpartition(distances, shortlist)[:shortlist])
+        starts = np.cumsum([0] + [
+            len(self.__buckets[tone_count][0]) for tone_count in buckets])
+        return {
+            tone_count: nearest[
+                (nearest >= starts[i]) & (nearest < starts[i + 1])] - starts[i]
+            for i, tone_count in enumerate(buckets)
+        }
+
+    def distances(
+            self, query, rotations=True, count_tolerance=None,
+            shortlist=SHORTLIST):
+        """
+        Distances from a query scale to the indexed scales
+        :param query: a scale, ScaleView or sequence of cents
+        :param rotations: also match the query re-rooted on each of its tones
+        :param count_tolerance: only compare scales whose number of pitch
+                                classes is within this of the query's
+                                (default: compare all)
+        :param shortlist: only measure the distance to this many candidates,
+                          shortlisted by Fourier coefficients, which is
+                          approximate (None to measure every compared scale)
+        :return: tuple of numpy arrays (positions, distances in cents), empty
+                 for a query without tones (scales without tones are never
+                 compared)
+        """
+        classes = pitch_classes(query)
+        if not len(classes):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        queries = classes[np.newaxis, :]
+        if rotations:
+            queries = np.concatenate([queries, rerooted(classes)])
+        buckets = [
+            tone_count for tone_count in self.__buckets
+            if tone_count and (
+                count_tolerance is None
+                or abs(tone_count - len(classes)) <= count_tolerance)
+        ]
+        if not buckets:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        rows = dict()
+        compared = sum(
+            len(self.__buckets[tone_count][0]) for tone_count in buckets)
+        if shortlist is not None and compared > shortlist:
+            rows = self.__shortlist(classes, buckets, rotations, shortlist)
+        all_positions, all_distances = [], []
+        for tone_count in buckets:
+            positions, candidates, _ = self.__buckets[tone_count]
+            if tone_count in rows:
+                positions = positions[rows[tone_count]]
+                candidates = candidates[rows[tone_count]]
+            chunk = max(
+                1, CHUNK_ELEMENTS // max(1, queries.size * tone_count))
+            for start in range(0, len(candidates), chunk):
+                distances = set_distances(
+                    queries, candidates[start:start + chunk])
+                all_distances.append(distances.min(axis=0))
+            all_positions.append(positions)
+        return (
+            np.concatenate(all_positions),
+            np.concatenate(all_distances) if all_distances else np.zeros(0))
+
+    def query(
+            self, query, k=10, rotations=True, count_tolerance=None,
+            shortlist=SHORTLIST):
+        """
+        Find the indexed scales closest to a query scale
+        :param query: a scale, ScaleView or sequence of cents
+        :param k: number of results
+        :param rotations: also match the query re-rooted on each of its tones
+        :param count_tolerance: see distances
+        :param shortlist: see distances (at least k; default None, exact)
+        :return: list of up to k Match(position, distance), closest first,
+                 empty for a query without tones
+        """
+        if shortlist is not None:
+            shortlist = max(shortlist, k)
+        positions, distances = self.distances(
+            query, rotations=rotations, count_tolerance=count_tolerance,
+            shortlist=shortlist)
+        if len(distances) > k:
+            nearest = np.argpartition(distances, k)[:k]
+            positions, distances = positions[nearest], distances[nearest]
+        order = np.lexsort((positions, distances))
+        return [
+            Match(position, distance) for position, distance in
+            zip(positions[order].tolist(), distances[order].tolist())
+        ]
@@ -0,0 +1,452 @@
+"""
+tone_store.py
+Storage backend for the tones of a scale.
+
+Tones (cents above the root) are kept in a sorted, contiguous list, so the
+degree of a tone is simply its position in the list (plus one).
+Insertion and removal locate their position by binary search instead of
+re-sorting the whole scale.
+
+Tones of an equal division of the octave (EDO) can instead be stored as
+integer steps in a bitset (StepTones), converting to cents only when read.
+
+Other tones can be stored in fixed point (FixedPointTones), as integer
+multiples of a small resolution (eg a microcent): tones that round to the
+same integer are the same tone, so near-equal floats don't become separate
+degrees, and membership is a hash lookup.
+"""
+
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import bisect
+
+import lib.ratios as ratios
+
+# Largest difference (in cents) between a tone and its EDO step
+STEP_TOLERANCE_CENTS = 1e-6
+# Default fixed point unit, in cents (a microcent)
+FIXED_POINT_RESOLUTION = 1e-6
+
+
+class SortedTones(object):
+    """
+    Sorted, duplicate-free collection of tones
+    """
+    def __init__(self, tones=None):
+        """
+        Constructor
+        :param tones: iterable of tones (cents), need not be sorted
+        """
+        self.__tones = []
+        if tones is not None:
+            self.__tones = sorted(set(tones))
+
+    def __len__(self):
+        return len(self.__tones)
+
+    def __iter__(self):
+        return iter(self.__tones)
+
+    def __getitem__(self, position):
+        return self.__tones[position]
+
+    def __contains__(self, cents):
+        return self.find(cents) != -1
+
+    def find(self, cents):
+        """
+        Find the position of a tone
+        :param cents: tone to look for
+        :return: position (0-based) of the tone, -1 if not found
+        """
+        position = bisect.bisect_left(self.__tones, cents)
+        if position < len(self.__tones) and self.__tones[position] == cents:
+            return position
+        return -1
+
+    def add(self, cents):
+        """
+        Insert a tone, keeping the tones sorted
+        :param cents: tone to insert
+        :return: position (0-based) of the new tone,
+                 -1 if the tone is already stored
+        """
+        position = bisect.bisect_left(self.__tones, cents)
+        if position < len(self.__tones) and self.__tones[position] == cents:
+            return -1
+        self.__tones.insert(position, cents)
+        return position
+
+    def pop(self, position):
+        """
+        Remove the tone at a position
+        :param position: position (0-based) of the tone
+        :return: the removed tone
+        Raises IndexError if position is out of range
+        """
+        return self.__tones.pop(position)
+
+    def merge(self, tones):
+        """
+        Insert many new tones at once
+        :param tones: iterable of tones, none of them already stored
+        """
+        # the stored tones are one sorted run, so this is a linear merge
+        self.__tones.extend(tones)
+        self.__tones.sort()
+
+    def delete(self, positions):
+        """
+        Remove the tones at many positions at once
+        :param positions: collection of positions (0-based) to remove
+        """
+        positions = set(positions)
+        self.__tones = [
+            cents for position, cents in enumerate(self.__tones)
+            if position not in positions
+        ]
+
+    def tolist(self):
+        """
+        The stored tones
+        :return: a new sorted list of tones
+        """
+        return list(self.__tones)
+
+    def keys(self, cents):
+        """
+        Values that are equal exactly for tones the store treats as equal
+        :param cents: numpy float array of tones
+        :return: numpy array of keys (the tones themselves)
+        """
+        return cents
+
+
+class StepTones(object):
+    """
+    Sorted, duplicate-free collection of the tones of an equal division of
+    the octave, stored as a bitset of integer steps above the root
+    (bit n set for the tone n steps up)
+    Tones are given and returned in cents; a tone is stored at its nearest
+    step, so callers check tones are on a step first (see step)
+    """
+    def __init__(self, edo, tones=None):
+        """
+        Constructor
+        :param edo: number of equal steps per octave
+        :param tones: iterable of tones (cents), need not be sorted
+        """
+        self.__edo = edo
+        self.__mask = 0
+        # the set steps in order, decoded from the mask when needed
+        self.__steps = ()
+        if tones is not None:
+            self.merge(tones)
+
+    @property
+    def edo(self):
+        """
+        getter for self.__edo
+        :return: number of equal steps per octave
+        """
+        return self.__edo
+
+    @property
+    def mask(self):
+        """
+        getter for self.__mask
+        :return: bitset of the stored steps
+        """
+        return self.__mask
+
+    @mask.setter
+    def mask(self, mask):
+        """
+        Replace the stored steps
+        :param mask: bitset of steps
+        """
+        self.__set_mask(mask)
+
+    def steps(self):
+        """
+        The stored steps
+        :return: sorted tuple of steps above the root
+        """
+        if self.__steps is None:
+            mask = self.__mask
+            self.__steps = tuple(
+                step for step in range(mask.bit_length()) if mask >> step & 1)
+        return self.__steps
+
+    def step(self, cents):
+        """
+        Step of a tone
+        :param cents: tone, cents above the root
+        :return: nearest step, None if the tone is not on a step
+        """
+        step = round(cents * self.__edo / ratios.OCTAVE_CENTS)
+        if abs(self.cents(step) - cents) > STEP_TOLERANCE_CENTS:
+            return None
+        return step
+
+    def cents(self, step):
+        """
+        Tone of a step
+        :param step: steps above the root
+        :return: cents above the root (an int when that is exact)
+        """
+        if step * ratios.OCTAVE_CENTS % self.__edo == 0:
+            return step * ratios.OCTAVE_CENTS // self.__edo
+        return step * ratios.OCTAVE_CENTS / self.__edo
+
+    def __set_mask(self, mask):
+        """
+        Store a new bitset of steps
+        :param mask: bitset of steps
+        """
+        self.__mask = mask
+        self.__steps = None
+
+    def __len__(self):
+        return len(self.steps())
+
+    def __iter__(self):
+        return (self.cents(step) for step in self.steps())
+
+    def __getitem__(self, position):
+        return self.cents(self.steps()[position])
+
+    def __contains__(self, cents):
+        return self.find(cents) != -1
+
+    def __position(self, step):
+        """
+        Position of a step among the stored steps
+        :param step: steps above the root
+        :return: number of stored steps below step
+        """
+        return bin(self.__mask & ((1 << step) - 1)).count('1')
+
+    def find(self, cents):
+        """
+        Find the position of a tone
+        :param cents: tone to look for
+        :return: position (0-based) of the tone, -1 if not found
+        """
+        step = self.step(cents)
+        if step is None or step < 0 or not self.__mask >> step & 1:
+            return -1
+        return self.__position(step)
+
+    def add(self, cents):
+        """
+        Insert a tone, at its nearest step
+        :param cents: tone to insert
+        :return: position (0-based) of the new tone,
+                 -1 if the tone is already stored
+        """
+        step = round(cents * self.__edo / ratios.OCTAVE_CENTS)
+        if self.__mask >> step & 1:
+            return -1
+        self.__set_mask(self.__mask | 1 << step)
+        return self.__position(step)
+
+    def pop(self, position):
+        """
+        Remove the tone at a position
+        :param position: position (0-based) of the tone
+        :return: the removed tone
+        Raises IndexError if position is out of range
+        """
+        step = self.steps()[position]
+        self.__set_mask(self.__mask & ~(1 << step))
+        return self.cents(step)
+
+    def merge(self, tones):
+        """
+        Insert many new tones at once, each at its nearest step
+        :param tones: iterable of tones
+        """
+        mask = self.__mask
+        for cents in tones:
+            mask |= 1 << round(cents * self.__edo / ratios.OCTAVE_CENTS)
+        self.__set_mask(mask)
+
+    def delete(self, positions):
+        """
+        Remove the tones at many positions at once
+        :param positions: collection of positions (0-based) to remove
+        """
+        steps = self.steps()
+        mask = self.__mask
+        for position in positions:
+            mask &= ~(1 << steps[position])
+        self.__set_mask(mask)
+
+    def tolist(self):
+        """
+        The stored tones
+        :return: a new sorted list of tones
+        """
+        return list(self)
+
+    def keys(self, cents):
+        """
+        Values that are equal exactly for tones the store treats as equal
+        :param cents: numpy float array of tones
+        :return: numpy int array of the nearest steps
+        """
+        import numpy as np
+
+        return np.rint(cents * self.__edo / ratios.OCTAVE_CENTS).astype(
+            np.int64)
+
+
+class FixedPointTones(object):
+    """
+    Sorted, duplicate-free collection of tones, stored in fixed point as
+    integer multiples of a resolution (in cents)
+    A tone is rounded to the nearest multiple of the resolution, and tones
+    that round to the same multiple are the same tone (so at a resolution
+    of 1 cent, 100.4 and 99.6 are both 100, while 100.49 and 100.51 stay
+    apart as 100 and 101). Tones are returned as the stored multiple, in
+    cents (an int for whole cents).
+    """
+    def __init__(self, tones=None, resolution=FIXED_POINT_RESOLUTION):
+        """
+        Constructor
+        :param tones: iterable of tones (cents), need not be sorted
+        :param resolution: size of the fixed point unit, in cents
+        """
+        self.__units = 1 / resolution
+        # sorted integer keys, and the same keys for hashed lookup
+        self.__keys = []
+        self.__key_set = set()
+        if tones is not None:
+            self.merge(tones)
+
+    @property
+    def resolution(self):
+        """
+        The size of the fixed point unit
+        :return: cents per unit
+        """
+        return 1 / self.__units
+
+    def key(self, cents):
+        """
+        Fixed point key of a tone
+        :param cents: tone, cents above the root
+        :return: int, the tone in units of the resolution
+        """
+        return round(float(cents) * self.__units)
+
+    def cents(self, key):
+        """
+        Tone of a fixed point key
+        :param key: int, the tone in units of the resolution
+        :return: cents above the root (an int for whole cents)
+        """
+        cents = key / self.__units
+        if cents.is_integer():
+            return int(cents)
+        return cents
+
+    def __set_keys(self, keys):
+        """
+        Store a new sorted list of keys
+        :param keys: sorted list of distinct keys
+        """
+        self.__keys = keys
+        self.__key_set = set(keys)
+
+    def __len__(self):
+        return len(self.__keys)
+
+    def __iter__(self):
+        return (self.cents(key) for key in self.__keys)
+
+    def __getitem__(self, position):
+        return self.cents(self.__keys[position])
+
+    def __contains__(self, cents):
+        return self.key(cents) in self.__key_set
+
+    def find(self, cents):
+        """
+        Find the position of a tone
+        :param cents: tone to look for
+        :return: position (0-based) of the tone, -1 if not found
+        """
+        key = self.key(cents)
+        if key not in self.__key_set:
+            return -1
+        return bisect.bisect_left(self.__keys, key)
+
+    def add(self, cents):
+        """
+        Insert a tone, at its nearest fixed point value
+        :param cents: tone to insert
+        :return: position (0-based) of the new tone,
+                 -1 if the tone is already stored
+        """
+        key = self.key(cents)
+        if key in self.__key_set:
+            return -1
+        position = bisect.bisect_left(self.__keys, key)
+        self.__keys.insert(position, key)
+        self.__key_set.add(key)
+        return position
+
+    def pop(self, position):
+        """
+        Remove the tone at a position
+        :param position: position (0-based) of the tone
+        :return: the removed tone
+        Raises IndexError if position is out of range
+        """
+        key = self.__keys.pop(position)
+        self.__key_set.discard(key)
+        return self.cents(key)
+
+    def merge(self, tones):
+        """
+        Insert many new tones at once, each at its nearest fixed point value
+        :param tones: iterable of tones
+        """
+        self.__set_keys(sorted(
+            self.__key_set.union(self.key(cents) for cents in tones)))
+
+    def delete(self, positions):
+        """
+        Remove the tones at many positions at once
+        :param positions: collection of positions (0-based) to remove
+        """
+        positions = set(positions)
+        self.__set_keys([
+            key for position, key in enumerate(self.__keys)
+            if position not in positions
+        ])
+
+    def tolist(self):
+        """
+        The stored tones
+        :return: a new sorted list of tones
+        """
+        return list(self)
+
+    def keys(self, cents):
+        """
+        Values that are equal exactly for tones the store treats as equal
+        :param cents: numpy float array of tones
+        :return: numpy int array of the fixed point keys
+        """
+        import numpy as np
+
+        return np.rint(cents * self.__units).astype(np.int64)
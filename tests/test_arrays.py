@@ -0,0 +1,72 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import array
+
+import numpy as np
+import pytest
+
+import lib.arrays as arrays
+
+
+def test_as_array_no_copy():
+    values = np.arange(5.0)
+    assert arrays.as_array(values) is values
+    buffer = array.array('d', [1, 2, 3])
+    test = arrays.as_array(buffer)
+    buffer[0] = 10
+    assert test[0] == 10
+
+
+@pytest.mark.parametrize(
+    'values, expected',
+    [
+        ([1, 2], [1, 2]),
+        ((x * 2 for x in range(3)), [0, 2, 4]),
+        (7, 7),
+    ],
+)
+def test_as_array(values, expected):
+    test = arrays.as_array(values)
+    assert isinstance(test, np.ndarray)
+    assert test.tolist() == expected
+
+
+@pytest.mark.parametrize("length, frame_size, hop, expected", [
+    (10, 4, 2, 4),
+    (11, 4, 2, 4),
+    (4, 4, 1, 1),
+    (3, 4, 1, 0),
+])
+def test_frame_count(length, frame_size, hop, expected):
+    assert arrays.frame_count(length, frame_size, hop) == expected
+
+
+def test_frames():
+    samples = np.arange(11.0)
+    test = arrays.frames(samples, 4, 3)
+    assert test.tolist() == [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]]
+    assert np.shares_memory(test, samples)
+    assert not test.flags.writeable
+    assert arrays.frames(samples[:3], 4, 3).shape == (0, 4)
+
+
+@pytest.mark.parametrize('block_size', [1, 3, 7, 100])
+def test_frame_buffer(block_size):
+    samples = np.arange(50.0)
+    expected = arrays.frames(samples, 8, 3)
+    test = arrays.FrameBuffer(8, 3)
+    pushed = [
+        test.push(samples[start:start + block_size])
+        for start in range(0, len(samples), block_size)
+    ]
+    assert test.frames == len(expected)
+    assert [first for first, _ in pushed] == np.cumsum(
+        [0] + [len(frames) for _, frames in pushed[:-1]]).tolist()
+    np.testing.assert_array_equal(
+        np.concatenate([frames for _, frames in pushed]), expected)
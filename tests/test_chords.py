@@ -0,0 +1,120 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.chords as chords
+import lib.note as note
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_edo as scale_edo
+import lib.scale_library as scale_library
+
+MAJOR = 0b101010110101
+
+
+def major(root_note=None):
+    return scale_12edo.Scale12EDO.from_bitmask(MAJOR, root_note=root_note)
+
+
+def test_chords_triads():
+    test = chords.chords(major())
+    assert test.pattern == chords.TRIAD
+    assert test.degree.tolist() == [
+        [1, 3, 5], [2, 4, 6], [3, 5, 7], [4, 6, 1], [5, 7, 2], [6, 1, 3],
+        [7, 2, 4]]
+    assert test.index.tolist() == (test.degree - 1).tolist()
+    assert test.octave[5].tolist() == [0, 1, 1]
+    assert test.cents[4].tolist() == [700, 1100, 1400]
+    assert test.freq is None
+    with pytest.raises(ValueError):
+        test.cents[0, 0] = 1
+
+
+def test_chords_sevenths():
+    test = chords.chords(major(root_note=note.Note(440)), chords.SEVENTH)
+    # the chord qualities of the major scale, as intervals above the root
+    qualities = (test.cents - test.cents[:, :1]).tolist()
+    assert qualities[0] == [0, 400, 700, 1100]
+    assert qualities[4] == [0, 400, 700, 1000]
+    assert qualities[6] == [0, 300, 600, 1000]
+    assert test.freq[0].tolist() == pytest.approx(
+        [440, 554.365, 659.255, 830.609], abs=1e-3)
+
+
+@pytest.mark.parametrize(
+    'pattern, shape',
+    [
+        ((3, 1), (3, 3)),
+        ((1,), (6, 2)),
+        ((5,), (2, 2)),
+        ((7,), (0, 2)),
+        ((), (7, 1)),
+    ],
+)
+def test_chords_no_period(pattern, shape):
+    test = chords.chords(
+        scale.Scale(tones=[200, 400, 500, 700, 900, 1100]), pattern)
+    assert test.cents.shape == shape
+    assert (test.octave == 0).all()
+    assert (np.diff(test.cents, axis=1) > 0).all()
+
+
+@pytest.mark.parametrize('pattern', [(2, 0), (2, -1), (2.0,), 'ab', None])
+def test_chords_bad_pattern(pattern):
+    assert chords.chords(major(), pattern) is None
+    assert list(chords.iter_chords(major(), pattern)) == []
+
+
+def test_chords_cached():
+    myscale = major()
+    test = chords.chords(myscale, [2, 2])
+    assert chords.chords(myscale, (2, 2)) is test
+    myscale.remove_degree(7)
+    assert len(chords.chords(myscale).degree) == 6
+
+
+def test_all_chords():
+    test = chords.all_chords(major(), [chords.TRIAD, chords.stacked(5), (0,)])
+    assert [result.cents.shape for result in test[:2]] == [(7, 3), (7, 5)]
+    assert test[2] is None
+
+
+@pytest.mark.parametrize('block_roots', [1, 3, 1024])
+def test_iter_chords(block_roots):
+    myscale = scale_edo.ScaleEDO.from_steps(range(31), edo=31)
+    test = list(chords.iter_chords(myscale, (10, 8), block_roots))
+    expected = chords.chords(myscale, (10, 8))
+    assert len(test) == 31
+    assert [chord.degrees for chord in test] == [
+        tuple(row) for row in expected.degree.tolist()]
+    assert test[30] == chords.Chord(
+        degrees=(31, 10, 18), octaves=(0, 1, 1),
+        cents=tuple(expected.cents[30].tolist()))
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_chords_for_scales(tmp_path, processes):
+    path = str(tmp_path / 'library.bin')
+    scales = [
+        ('major', major(root_note=note.Note(440))),
+        ('triad', scale_12edo.Scale12EDO.from_bitmask(0b10010001)),
+    ]
+    scale_library.write_library(path, scales)
+    edo19 = scale_edo.ScaleEDO.from_steps([0, 6, 11], edo=19)
+    views = list(scale_library.ScaleLibrary(path)) + [edo19]
+    test = list(chords.chords_for_scales(
+        views, [chords.TRIAD, (1,)], processes=processes))
+    assert len(test) == 3
+    assert test[0][0].cents.tolist() == chords.chords(
+        major()).cents.tolist()
+    assert test[0][0].freq[0, 0] == pytest.approx(440)
+    assert test[1][1].degree.tolist() == [[1, 2], [2, 3], [3, 1]]
+    assert test[2][0].cents[0].tolist() == pytest.approx(
+        [0, 1200 * 11 / 19, 1200 * 25 / 19])
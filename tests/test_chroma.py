@@ -0,0 +1,148 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.chroma as chroma
+import lib.note as note
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_octave as scale_octave
+
+RATE = 8000
+FFT_SIZE = 1024
+A4 = note.Note(440)
+
+
+def tone(freq, seconds=0.5):
+    return np.sin(2 * np.pi * freq * np.arange(int(seconds * RATE)) / RATE)
+
+
+def chromatic(root_note=A4):
+    return scale_12edo.Scale12EDO(
+        root_note=root_note, tones=list(range(0, 1200, 100)))
+
+
+def test_degree_map():
+    myscale = chromatic()
+    test = chroma.degree_map(myscale, sample_rate=RATE, fft_size=FFT_SIZE)
+    assert test.degrees.tolist() == list(range(1, 13))
+    # bins from 20 Hz to Nyquist, each mapped once
+    assert len(test.bins) == FFT_SIZE // 2 + 1 - 3
+    assert sorted(test.bins.tolist()) == list(range(3, FFT_SIZE // 2 + 1))
+    # bin 56 is 437.5 Hz, nearest to A
+    assert 56 in test.bins[test.starts[0]:test.starts[1]]
+    assert test.columns.tolist() == list(range(12))
+    assert chroma.degree_map(
+        myscale, sample_rate=RATE, fft_size=FFT_SIZE) is test
+
+
+def test_degree_map_max_deviation():
+    test = chroma.degree_map(
+        chromatic(), sample_rate=RATE, fft_size=FFT_SIZE, max_deviation=10)
+    assert 0 < len(test.bins) < FFT_SIZE // 4
+    # bin 57 is 445.3 Hz, 21 cents above A
+    assert 57 not in test.bins
+
+
+def test_degree_map_cache():
+    myscale = chromatic()
+    test = chroma.degree_map(myscale, sample_rate=RATE, fft_size=FFT_SIZE)
+    myscale.root_note = note.Note(415)
+    assert chroma.degree_map(
+        myscale, sample_rate=RATE, fft_size=FFT_SIZE) is not test
+
+
+@pytest.mark.parametrize("myscale", [
+    scale_12edo.Scale12EDO(tones=[0, 700]),
+    scale.Scale(root_note=A4),
+])
+def test_degree_map_none(myscale):
+    myscale.remove_degree(1)
+    assert chroma.degree_map(myscale) is None
+    assert chroma.chroma(np.zeros(RATE), myscale) is None
+
+
+def test_apply_map_empty_degree():
+    myscale = scale_octave.ScaleOctave(root_note=A4, tones=[0, 700])
+    mapping = chroma.degree_map(
+        myscale, sample_rate=RATE, fft_size=FFT_SIZE, max_deviation=1)
+    power = np.ones((2, FFT_SIZE // 2 + 1))
+    test = chroma.apply_map(power, mapping)
+    assert test.shape == (2, 2)
+    assert test.sum() == 2 * len(mapping.bins)
+
+
+@pytest.mark.parametrize("freq, degree", [
+    (440, 1),
+    (880, 1),
+    (220 * 2 ** (7 / 12), 8),
+    (440 * 2 ** (3 / 12), 4),
+])
+def test_chroma(freq, degree):
+    test = chroma.chroma(
+        tone(freq), chromatic(), sample_rate=RATE, fft_size=FFT_SIZE,
+        hop=512)
+    assert test.energy.shape == (6, 12)
+    assert (test.energy.argmax(axis=1) == degree - 1).all()
+    shares = chroma.normalize(test.energy)
+    assert (shares[:, degree - 1] > 0.8).all()
+
+
+def test_chroma_scale_degrees():
+    # a just major triad: the 5/4 third is found as degree 2
+    myscale = scale_octave.ScaleOctave(
+        root_note=A4, tones=[0, 386.314, 701.955])
+    test = chroma.chroma(
+        tone(550), myscale, sample_rate=RATE, fft_size=FFT_SIZE)
+    assert test.degrees.tolist() == [1, 2, 3]
+    assert (test.energy.argmax(axis=1) == 1).all()
+
+
+def test_normalize():
+    test = chroma.normalize(np.array([[1., 3], [0, 0]]))
+    assert test.tolist() == [[0.25, 0.75], [0, 0]]
+
+
+@pytest.mark.parametrize("block_size", [100, 1024, 3000])
+def test_tracker_matches_batch(block_size):
+    samples = np.concatenate((tone(440), tone(660)))
+    myscale = chromatic()
+    expected = chroma.chroma(
+        samples, myscale, sample_rate=RATE, fft_size=FFT_SIZE, hop=256)
+    tracker = chroma.ChromaTracker(
+        myscale, sample_rate=RATE, fft_size=FFT_SIZE, hop=256)
+    results = [
+        tracker.process(samples[start:start + block_size]).energy
+        for start in range(0, len(samples), block_size)
+    ]
+    assert tracker.frames == len(expected.energy)
+    assert tracker.myscale is myscale
+    with pytest.raises(AttributeError):
+        tracker.myscale = None
+    np.testing.assert_allclose(np.concatenate(results), expected.energy)
+
+
+def test_tracker_counts_frames_without_mapping():
+    samples = np.concatenate((tone(440), tone(660)))
+    myscale = chromatic()
+    expected = chroma.chroma(
+        samples, myscale, sample_rate=RATE, fft_size=FFT_SIZE, hop=256)
+    # no root note yet, so no degree map
+    myscale = chromatic(root_note=None)
+    tracker = chroma.ChromaTracker(
+        myscale, sample_rate=RATE, fft_size=FFT_SIZE, hop=256)
+    half = len(samples) // 2
+    assert tracker.process(samples[:half]) is None
+    skipped = tracker.frames
+    assert skipped == len(chroma.arrays.frames(samples[:half], FFT_SIZE, 256))
+    myscale.root_note = A4
+    test = tracker.process(samples[half:])
+    assert tracker.frames == len(expected.energy)
+    np.testing.assert_allclose(test.energy, expected.energy[skipped:])
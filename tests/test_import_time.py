@@ -0,0 +1,64 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Modules that must stay cheap to import (no numpy/pandas at import time)
+LIGHT_MODULES = [
+    'lib.midi_12edo',
+    'lib.note',
+    'lib.pitch_class_set',
+    'lib.ratios',
+    'lib.scale',
+    'lib.scale_12edo',
+    'lib.scale_octave',
+    'lib.tone_store',
+]
+HEAVY_MODULES = ['numpy', 'pandas']
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(code):
+    """
+    Run python code in a fresh interpreter from the repo directory
+    :param code: python source
+    :return: stdout of the interpreter, stripped
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=REPO_DIR,
+        capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+@pytest.mark.parametrize('module', LIGHT_MODULES)
+def test_import_is_lazy(module):
+    test = run_python(
+        f'import sys, {module}\n'
+        f'print([m for m in {HEAVY_MODULES} if m in sys.modules])')
+    assert test == '[]'
+
+
+def test_scalar_calls_are_lazy():
+    test = run_python(
+        'import sys\n'
+        'import lib.midi_12edo as midi_12edo, lib.ratios as ratios\n'
+        'import lib.scale as scale, lib.scale_12edo as scale_12edo\n'
+        'import lib.scale_octave as scale_octave\n'
+        'midi_12edo.octave_from_midi(midi_12edo.midi_from_freq(440))\n'
+        'midi_12edo.note_name_from_midi(61)\n'
+        'ratios.cents(440, ratios.freq_ratio(700) * 440)\n'
+        'scale_12edo.Scale12EDO().add_tone(700)\n'
+        'scale.Scale(tones=[0, 200, 400]).add_tones([500, 700])\n'
+        'scale_octave.ScaleOctave(tones=[200, 700, 1200]).tones\n'
+        'scale_12edo.Scale12EDO(tones=[200, 400, 700]).degree_tones\n'
+        f'print([m for m in {HEAVY_MODULES} if m in sys.modules])')
+    assert test == '[]'
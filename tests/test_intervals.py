@@ -0,0 +1,113 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.intervals as intervals
+import lib.pitch_class_set as pitch_class_set
+import lib.ratios as ratios
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_octave as scale_octave
+
+MAJOR = 0b101010110101
+
+
+def test_analyze_matrix():
+    test = intervals.analyze(scale_12edo.Scale12EDO.from_bitmask(MAJOR))
+    assert test.degrees.tolist() == [1, 2, 3, 4, 5, 6, 7]
+    assert test.matrix[0].tolist() == [0, 200, 400, 500, 700, 900, 1100]
+    assert test.matrix[6].tolist() == [100, 300, 500, 600, 800, 1000, 0]
+    assert (test.matrix + test.matrix.T)[~np.eye(7, dtype=bool)].tolist() == (
+        [1200] * 42)
+    with pytest.raises(ValueError):
+        test.matrix[0, 0] = 1
+
+
+@pytest.mark.parametrize('mask', [MAJOR, 0b10010001, 0b111111111111, 1])
+def test_analyze_interval_vector(mask):
+    # 12-EDO interval classes in bins of 100 cents are the interval vector
+    test = intervals.analyze(
+        scale_12edo.Scale12EDO.from_bitmask(mask), resolution=100)
+    assert test.histogram[0] == 0
+    assert test.histogram[1:].tolist() == (
+        pitch_class_set.catalog().interval_vector[mask].tolist())
+
+
+@pytest.mark.parametrize(
+    'tones, distinct_steps',
+    [
+        ([200, 400, 500, 700, 900, 1100], 2),
+        ([100 * step for step in range(1, 12)], 1),
+        ([ratios.Ratio(*ratio) for ratio in [
+            (9, 8), (5, 4), (4, 3), (3, 2), (5, 3), (15, 8)]], 3),
+        ([], 1),
+    ],
+)
+def test_analyze_distinct_steps(tones, distinct_steps):
+    test = scale_octave.ScaleOctave.from_tones(tones)
+    assert intervals.analyze(test).distinct_steps == distinct_steps
+
+
+def test_analyze_no_period():
+    test = intervals.analyze(scale.Scale(tones=[1200, 1900, 2400]), 100)
+    assert test.matrix[1].tolist() == [-1200, 0, 700, 1200]
+    assert len(test.histogram) == 25
+    assert np.flatnonzero(test.histogram).tolist() == [5, 7, 12, 19, 24]
+    assert test.histogram.sum() == 6
+    assert test.distinct_steps == 3
+
+
+def test_analyze_cached():
+    myscale = scale_octave.ScaleOctave(tones=[200, 700])
+    test = intervals.analyze(myscale)
+    assert intervals.analyze(myscale) is test
+    assert intervals.analyze(myscale, resolution=10) is not test
+    myscale.add_tone(400)
+    assert intervals.analyze(myscale).histogram.sum() == 6
+
+
+def test_analyze_large():
+    cents = np.random.default_rng(1).uniform(0, 1200, 1000)
+    test = intervals.analyze(scale_octave.ScaleOctave.from_tones(cents))
+    assert test.matrix.shape == (1001, 1001)
+    assert test.histogram.sum() == 1001 * 1000 // 2
+
+
+def test_analyze_batch():
+    scales = [
+        scale_12edo.Scale12EDO.from_bitmask(MAJOR), [0, 700], [],
+        [700, 0, 400]]
+    tones = intervals.padded(scales)
+    assert tones.shape == (4, 7)
+    assert np.isnan(tones[1, 2:]).all()
+    test = intervals.analyze_batch(tones, resolution=100)
+    assert test.histogram.shape == (4, 7)
+    assert test.histogram[0].tolist() == [0, 2, 5, 4, 3, 6, 1]
+    assert test.histogram[1].tolist() == [0, 0, 0, 0, 0, 1, 0]
+    assert test.histogram[2].tolist() == [0] * 7
+    assert test.histogram[3].tolist() == [0, 0, 0, 1, 1, 1, 0]
+    assert test.distinct_steps.tolist() == [2, 2, 0, 3]
+
+
+def test_analyze_batch_matches_analyze():
+    rng = np.random.default_rng(2)
+    scales = [
+        scale_octave.ScaleOctave.from_tones(rng.uniform(0, 1200, count))
+        for count in (3, 9, 1, 20)]
+    test = intervals.analyze_batch(intervals.padded(scales))
+    for row, myscale in enumerate(scales):
+        expected = intervals.analyze(myscale)
+        assert test.histogram[row].tolist() == expected.histogram.tolist()
+        assert test.distinct_steps[row] == expected.distinct_steps
+
+
+def test_interval_matrix_batch():
+    test = intervals.interval_matrix(np.array([[0, 500], [100, 1300]]), 1200)
+    assert test.tolist() == [[[0, 500], [700, 0]], [[0, 0], [0, 0]]]
@@ -0,0 +1,93 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.key_table as key_table
+import lib.note as note
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_edo as scale_edo
+
+MAJOR = 0b101010110101
+
+
+def major(root_note=note.Note(440)):
+    return scale_12edo.Scale12EDO.from_bitmask(MAJOR, root_note=root_note)
+
+
+def test_key_table():
+    test = key_table.key_table(major(), octaves=[-1, 0, 1])
+    assert test.freq.shape == (12, 7, 3)
+    assert test.roots[[0, 3]].tolist() == pytest.approx(
+        [440, 523.251], abs=1e-3)
+    assert test.degrees.tolist() == [1, 2, 3, 4, 5, 6, 7]
+    assert test.octaves.tolist() == [-1, 0, 1]
+    # every key is the same scale re-rooted
+    for key, root in enumerate(test.roots.tolist()):
+        expected = major(note.Note(root)).frequencies(root / 2, root * 3.9)
+        assert test.freq[key].T.ravel().tolist() == pytest.approx(
+            expected.freq.tolist())
+    with pytest.raises(ValueError):
+        test.freq[0, 0, 0] = 1
+
+
+def test_key_table_edo():
+    myscale = scale_edo.ScaleEDO.from_steps(
+        [0, 3, 6, 8, 11, 14, 17], root_note=note.Note(261.6), edo=19)
+    test = key_table.key_table(myscale)
+    assert test.freq.shape == (19, 7, 1)
+    assert test.roots[1] / test.roots[0] == pytest.approx(2 ** (1 / 19))
+
+
+def test_key_table_roots():
+    roots = [note.Note(220), 330.0]
+    test = key_table.key_table(major(None), roots=roots, octaves=[0, 2])
+    assert test.roots.tolist() == [220, 330]
+    assert test.freq[1, 4].tolist() == pytest.approx([
+        330 * 2 ** (7 / 12), 4 * 330 * 2 ** (7 / 12)])
+    assert key_table.key_table(major(None)) is None
+
+
+def test_key_table_no_period():
+    myscale = scale.Scale(root_note=note.Note(100), tones=[1200, 2400])
+    test = key_table.key_table(myscale, octaves=[0, 1])
+    assert test.octaves.tolist() == [0]
+    assert test.freq[0, :, 0].tolist() == pytest.approx([100, 200, 400])
+
+
+def test_key_table_cached():
+    myscale = major()
+    test = key_table.key_table(myscale)
+    assert key_table.key_table(myscale) is test
+    assert key_table.key_table(myscale, octaves=[0, 1]) is not test
+    myscale.root_note = note.Note(220)
+    assert key_table.key_table(myscale).roots[0] == 220
+    myscale.remove_degree(7)
+    assert key_table.key_table(myscale).freq.shape == (12, 6, 1)
+
+
+@pytest.mark.parametrize(
+    'root, position',
+    [
+        (440, 0),
+        (note.Note(440 * 2 ** (7 / 12)), 7),
+        (440 * 2 ** (7.00001 / 12), 7),
+        (440 * 2 ** (7.5 / 12), -1),
+        (880, -1),
+    ],
+)
+def test_key_position(root, position):
+    test = key_table.key_table(major())
+    assert key_table.key_position(test, root) == position
+    frequencies = key_table.key_frequencies(test, root)
+    if position == -1:
+        assert frequencies is None
+    else:
+        assert np.array_equal(frequencies, test.freq[position])
@@ -6,6 +6,9 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
+import array
+
+import numpy as np
 import pytest
 
 import lib.midi_12edo as midi_12edo
@@ -25,6 +28,41 @@ def test_notes_df(index, rel, expected):
     assert test.iloc[index][rel] == expected
 
 
+def test_notes_df_cached():
+    test = midi_12edo.notes_df()
+    assert test is midi_12edo.notes_df()
+    with pytest.raises(ValueError):
+        test.iloc[0, 0] = 5
+    assert test.iloc[0]['halfstep'] == 0
+
+
+@pytest.mark.parametrize(
+    'midi, flat, name',
+    [
+        (60, False, 'C4'),
+        (61, False, 'C#4'),
+        (61, True, 'Db4'),
+        (0, True, 'C-1'),
+        (127, False, 'G9'),
+        (128, False, None),
+        (60.0, False, None),
+    ],
+)
+def test_note_name_from_midi(midi, flat, name):
+    test = midi_12edo.note_name_from_midi(midi, flat=flat)
+    assert test == name
+
+
+def test_note_table_concert_a(monkeypatch):
+    table = midi_12edo.note_table()
+    assert table is midi_12edo.note_table()
+    assert midi_12edo.freq_from_midi(69) == 440
+    monkeypatch.setattr(midi_12edo, 'CONCERT_A_HZ', 442)
+    assert midi_12edo.note_table() is not table
+    assert midi_12edo.freq_from_midi(69) == 442
+    assert midi_12edo.freq_from_midi_array([57, 69])[1] == 442
+
+
 @pytest.mark.parametrize(
     'midi, octave',
     [
@@ -70,3 +108,79 @@ def test_midi_from_freq(freq, midi):
 def test_piano_key_from_midi(midi, key):
     test = midi_12edo.piano_key_from_midi(midi)
     assert test == key
+
+
+@pytest.mark.parametrize(
+    'midi',
+    [
+        np.arange(-24, 140),
+        np.linspace(-3.5, 130.5, 1001),
+        array.array('d', [0, 60.5, 127]),
+        [5, 21, 30, 51],
+        (m for m in (-1, 11.9, 12, 23.9)),
+    ],
+)
+def test_midi_arrays_match_scalar(midi):
+    midi = list(midi)
+    octaves = midi_12edo.octave_from_midi_array(midi)
+    freqs = midi_12edo.freq_from_midi_array(midi)
+    keys = midi_12edo.piano_key_from_midi_array(midi)
+    for i, midi_note in enumerate(midi):
+        octave = midi_12edo.octave_from_midi(midi_note)
+        if octave is None:
+            assert octaves.mask[i]
+        else:
+            assert octaves[i] == octave
+        assert keys[i] == midi_12edo.piano_key_from_midi(midi_note)
+    # numpy's vectorized pow can differ from libm's in the last bits
+    np.testing.assert_array_max_ulp(
+        freqs, [midi_12edo.freq_from_midi(m) for m in midi], maxulp=2)
+
+
+def test_midi_int_arrays_exact():
+    midi = np.arange(0, 128)
+    freqs = midi_12edo.freq_from_midi_array(midi)
+    octaves = midi_12edo.octave_from_midi_array(midi)
+    assert freqs.tolist() == [midi_12edo.freq_from_midi(m) for m in range(128)]
+    assert octaves.tolist() == [
+        midi_12edo.octave_from_midi(m) for m in range(128)]
+
+
+def test_midi_from_freq_array():
+    freqs = np.geomspace(8, 20000, 1000)
+    test = midi_12edo.midi_from_freq_array(iter(freqs))
+    np.testing.assert_array_max_ulp(
+        test, [midi_12edo.midi_from_freq(freq) for freq in freqs], maxulp=2)
+    assert midi_12edo.midi_from_freq_array(array.array('d', [440]))[0] == 69
+
+
+@pytest.mark.parametrize(
+    'midi',
+    [
+        array.array('B', [0, 10, 60, 127, 200, 255]),
+        array.array('b', [-128, -10, -1, 0, 69, 127]),
+        bytes([0, 10, 21, 69, 128, 255]),
+        np.array([-5, 0, 69, 100], dtype=np.int8),
+        np.array([0, 69, 127], dtype=np.float32),
+    ],
+)
+def test_midi_arrays_small_dtypes(midi):
+    values = list(midi)
+    octaves = midi_12edo.octave_from_midi_array(midi)
+    freqs = midi_12edo.freq_from_midi_array(midi)
+    keys = midi_12edo.piano_key_from_midi_array(midi)
+    assert keys.tolist() == [
+        midi_12edo.piano_key_from_midi(int(m)) for m in values]
+    for i, midi_note in enumerate(values):
+        octave = midi_12edo.octave_from_midi(int(midi_note))
+        if octave is None:
+            assert octaves.mask[i]
+        else:
+            assert octaves[i] == octave
+    np.testing.assert_array_max_ulp(
+        freqs, [midi_12edo.freq_from_midi(int(m)) for m in values], maxulp=2)
+
+
+def test_piano_key_from_midi_array_unsigned():
+    assert midi_12edo.piano_key_from_midi_array(
+        array.array('B', [10])).tolist() == [-10]
@@ -0,0 +1,220 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import io
+
+import pytest
+
+import lib.midi_12edo as midi_12edo
+import lib.midi_file as midi_file
+import lib.midi_tuning as midi_tuning
+import lib.note as note
+import lib.scala as scala
+import lib.scale_octave as scale_octave
+
+Event = midi_file.Event
+HEADER = midi_file.Header(format=1, tracks=2, division=480)
+TRACKS = [
+    [
+        Event(0, midi_file.META, b'Tempo', midi_file.TRACK_NAME),
+        Event(0, midi_file.SYSEX, b'\x7e\x7f\x09\x01\xf7'),
+        Event(0, midi_file.META, b'', midi_file.END_OF_TRACK),
+    ],
+    [
+        Event(0, midi_file.PROGRAM_CHANGE | 1, b'\x05'),
+        Event(0, midi_file.NOTE_ON | 1, b'\x3c\x40'),
+        Event(200, midi_file.NOTE_ON | 1, b'\x40\x40'),
+        Event(280, midi_file.NOTE_ON | 1, b'\x3c\x00'),
+        Event(0, midi_file.NOTE_OFF | 1, b'\x40\x00'),
+        Event(100000, midi_file.META, b'', midi_file.END_OF_TRACK),
+    ],
+]
+# header, then track 2 of TRACKS with running status
+TRACK_BYTES = (
+    b'MThd\x00\x00\x00\x06\x00\x01\x00\x01\x01\xe0'
+    b'MTrk\x00\x00\x00\x19'
+    b'\x00\xc1\x05'
+    b'\x00\x91\x3c\x40'
+    b'\x81\x48\x40\x40'
+    b'\x82\x18\x3c\x00'
+    b'\x00\x81\x40\x00'
+    b'\x86\x8d\x20\xff\x2f\x00'
+)
+
+
+class Unseekable(io.BytesIO):
+    def seekable(self):
+        return False
+
+
+def write(tracks, header=HEADER, fileobj=None):
+    fileobj = io.BytesIO() if fileobj is None else fileobj
+    midi_file.write_midi(fileobj, header, tracks)
+    return fileobj.getvalue()
+
+
+def read(data):
+    header, tracks = midi_file.read_midi(io.BytesIO(data))
+    return header, [list(events) for events in tracks]
+
+
+@pytest.mark.parametrize("fileobj", [io.BytesIO(), Unseekable()])
+def test_round_trip(fileobj):
+    header, tracks = read(write(TRACKS, fileobj=fileobj))
+    assert header == HEADER
+    assert tracks == TRACKS
+
+
+def test_running_status():
+    data = write(TRACKS[1:], header=HEADER._replace(tracks=1))
+    assert data == TRACK_BYTES
+    assert read(TRACK_BYTES)[1] == TRACKS[1:]
+
+
+def test_write_adds_end_of_track():
+    data = write([TRACKS[1][:2]], header=HEADER._replace(tracks=1))
+    tracks = read(data)[1]
+    assert tracks[0][-1] == Event(0, midi_file.META, b'', 0x2F)
+
+
+def test_write_stops_at_end_of_track():
+    data = write([TRACKS[0] + TRACKS[1]], header=HEADER._replace(tracks=1))
+    assert read(data)[1] == TRACKS[:1]
+
+
+def test_write_track_count():
+    assert read(write(TRACKS[:1]))[0].tracks == 1
+    with pytest.raises(ValueError):
+        write(TRACKS[:1], fileobj=Unseekable())
+
+
+def test_read_tracks_in_order():
+    header, tracks = midi_file.read_midi(io.BytesIO(write(TRACKS)))
+    first = next(tracks)
+    assert next(first) == TRACKS[0][0]
+    # the rest of the first track is skipped
+    assert list(next(tracks)) == TRACKS[1]
+    assert list(tracks) == []
+
+
+def test_read_skips_unknown_chunks():
+    data = write(TRACKS)
+    unknown = b'XFIH\x00\x00\x00\x03abc'
+    data = data[:14] + unknown + data[14:]
+    assert read(data)[1] == TRACKS
+
+
+def test_read_small_blocks(monkeypatch):
+    monkeypatch.setattr(midi_file, 'BLOCK_SIZE', 3)
+    assert read(write(TRACKS))[1] == TRACKS
+
+
+@pytest.mark.parametrize("data", [
+    b'',
+    b'RIFF\x00\x00\x00\x06\x00\x01\x00\x01\x01\xe0',
+    b'MThd\x00\x00\x00\x06\x00\x01',
+    TRACK_BYTES[:-3],
+    # running status without a previous status
+    TRACK_BYTES[:22] + b'\x00\x3c\x40' + TRACK_BYTES[25:],
+    # system common message
+    TRACK_BYTES[:22] + b'\x00\xf2\x40' + TRACK_BYTES[25:],
+])
+def test_read_invalid(data):
+    with pytest.raises(ValueError):
+        read(data)
+
+
+def c_major(root_midi=60):
+    return scale_octave.ScaleOctave(
+        root_note=note.Note(midi_12edo.freq_from_midi(root_midi)),
+        tones=[0, 203.91, 386.314, 498.045, 701.955, 884.359, 1088.269])
+
+
+def test_retune_bends():
+    myscale = c_major()
+    table = midi_tuning.pitch_bend_table(myscale, midi_tuning.NEAREST)
+    test = list(midi_file.retune_bends(TRACKS[1], myscale))
+    bend_60 = bytes((table.bend[60] & 0x7F, table.bend[60] >> 7))
+    bend_64 = bytes((table.bend[64] & 0x7F, table.bend[64] >> 7))
+    assert test == [
+        Event(0, midi_file.PROGRAM_CHANGE | 1, b'\x05'),
+        Event(0, midi_file.PITCH_BEND | 1, bend_60),
+        Event(0, midi_file.NOTE_ON | 1, b'\x3c\x40'),
+        Event(200, midi_file.PITCH_BEND | 1, bend_64),
+        Event(0, midi_file.NOTE_ON | 1, b'\x40\x40'),
+        Event(280, midi_file.NOTE_ON | 1, b'\x3c\x00'),
+        Event(0, midi_file.NOTE_OFF | 1, b'\x40\x00'),
+        Event(100000, midi_file.META, b'', midi_file.END_OF_TRACK),
+    ]
+    # the major third is 14 cents flat of 12-EDO
+    assert table.bend[64] < midi_tuning.PITCH_BEND_CENTER
+
+
+def test_retune_bends_repeated_note():
+    events = [
+        Event(0, midi_file.NOTE_ON, b'\x3c\x40'),
+        Event(10, midi_file.NOTE_OFF, b'\x3c\x40'),
+        Event(10, midi_file.NOTE_ON, b'\x3c\x40'),
+    ]
+    test = list(midi_file.retune_bends(events, c_major()))
+    assert [event.status for event in test] == [
+        midi_file.PITCH_BEND, midi_file.NOTE_ON, midi_file.NOTE_OFF,
+        midi_file.NOTE_ON]
+
+
+def test_retune_bends_unmapped():
+    # white keys of C major only: the C# is dropped, keeping its time
+    mapping = scala.KeyboardMapping(
+        size=12, first_note=0, last_note=127, middle_note=60,
+        reference_note=69, reference_freq=440.0, octave_degree=7,
+        keys=(0, None, 1, None, 2, 3, None, 4, None, 5, None, 6))
+    events = [
+        Event(0, midi_file.NOTE_ON, b'\x3d\x40'),
+        Event(10, midi_file.NOTE_ON, b'\x3d\x00'),
+        Event(10, midi_file.NOTE_ON, b'\x3e\x40'),
+    ]
+    test = list(midi_file.retune_bends(events, c_major(), mapping))
+    assert [event.delta for event in test] == [20, 0]
+    assert test[1].data == b'\x3e\x40'
+
+
+def test_retune_bends_no_root():
+    myscale = scale_octave.ScaleOctave(tones=[0, 700])
+    assert midi_file.retune_bends(TRACKS[1], myscale) is None
+
+
+def test_retune_mts():
+    myscale = c_major()
+    test = list(midi_file.retune_mts(TRACKS[0], myscale, program=3))
+    assert test[1:] == TRACKS[0]
+    assert test[0].status == midi_file.SYSEX
+    assert test[0].data == midi_tuning.mts_bulk_dump(
+        myscale, midi_tuning.NEAREST, program=3)[1:]
+
+
+def test_retune_midi(tmp_path):
+    src = str(tmp_path / 'in.mid')
+    dst = str(tmp_path / 'out.mid')
+    with open(src, 'wb') as fileobj:
+        midi_file.write_midi(fileobj, HEADER, TRACKS)
+    assert midi_file.retune_midi(src, dst, c_major()) == 0
+    with open(dst, 'rb') as fileobj:
+        header, tracks = read(fileobj.read())
+    assert header == HEADER
+    assert tracks[0] == TRACKS[0]
+    assert tracks[1] == list(midi_file.retune_bends(TRACKS[1], c_major()))
+    assert midi_file.retune_midi(src, dst, c_major(), mts=True) == 0
+    with open(dst, 'rb') as fileobj:
+        header, tracks = read(fileobj.read())
+    assert tracks[0][0].status == midi_file.SYSEX
+    assert tracks[1] == TRACKS[1]
+
+
+def test_retune_midi_no_root(tmp_path):
+    myscale = scale_octave.ScaleOctave(tones=[0, 700])
+    assert midi_file.retune_midi('missing.mid', 'out.mid', myscale) == -1
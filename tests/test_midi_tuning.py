@@ -0,0 +1,248 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.midi_12edo as midi_12edo
+import lib.midi_tuning as midi_tuning
+import lib.note as note
+import lib.scala as scala
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_octave as scale_octave
+
+MAJOR = [0, 200, 400, 500, 700, 900, 1100]
+# white keys only, C4 is middle (root), A4 is 440 Hz
+WHITE_KEYS = scala.KeyboardMapping(
+    size=12, first_note=0, last_note=127, middle_note=60,
+    reference_note=69, reference_freq=440.0, octave_degree=7,
+    keys=(0, None, 1, None, 2, 3, None, 4, None, 5, None, 6))
+
+
+def chromatic(root_note=None):
+    return scale_octave.ScaleOctave(
+        root_note=root_note, tones=list(range(0, 1200, 100)))
+
+
+def detuned():
+    # the 2nd and 3rd degrees at 150 and 190 cents
+    return scale_octave.ScaleOctave(
+        tones=[0, 150, 190] + list(range(300, 1200, 100)))
+
+
+def test_tuning_table_12edo():
+    test = midi_tuning.tuning_table(chromatic())
+    np.testing.assert_allclose(
+        test.freq, midi_12edo.freq_from_midi_array(np.arange(128)))
+    assert test.cents[60] == 0
+    assert test.cents[72] == 1200
+    assert test.cents[59] == -100
+    assert test.degree[60] == 1
+    assert test.degree[71] == 12
+    assert test.mapped.all()
+    assert not test.freq.flags.writeable
+
+
+def test_tuning_table_root():
+    myscale = scale_octave.ScaleOctave(
+        root_note=note.Note(200), tones=[0, 701.955])
+    test = midi_tuning.tuning_table(myscale)
+    assert test.freq[60] == 200
+    assert test.freq[61] == pytest.approx(300)
+    assert test.freq[62] == pytest.approx(400)
+    assert test.freq[59] == pytest.approx(150)
+    assert test.degree[58:63].tolist() == [1, 2, 1, 2, 1]
+
+
+def test_tuning_table_mapping():
+    test = midi_tuning.tuning_table(
+        scale_12edo.Scale12EDO(tones=MAJOR), WHITE_KEYS)
+    assert test.freq[69] == pytest.approx(440)
+    assert test.mapped[60:72].tolist() == [
+        True, False, True, False, True, True,
+        False, True, False, True, False, True]
+    assert np.isnan(test.freq[61])
+    assert test.degree[61] == 0
+    np.testing.assert_allclose(
+        test.freq[test.mapped],
+        midi_12edo.freq_from_midi_array(np.arange(128)[test.mapped]))
+    assert test.degree[[60, 62, 71, 72]].tolist() == [1, 2, 7, 1]
+
+
+def test_tuning_table_range():
+    mapping = scala.linear_mapping()._replace(first_note=60, last_note=71)
+    test = midi_tuning.tuning_table(chromatic(), mapping)
+    assert test.mapped.sum() == 12
+    assert test.mapped[60] and test.mapped[71] and not test.mapped[72]
+
+
+def test_tuning_table_not_repeating():
+    # tritave (Bohlen-Pierce style): highest tone is the period
+    myscale = scale.Scale(root_note=100, tones=[0, 1901.955])
+    test = midi_tuning.tuning_table(myscale)
+    assert test.freq[60] == 100
+    assert test.freq[61] == pytest.approx(300)
+    assert test.freq[59] == pytest.approx(100 / 3)
+
+
+@pytest.mark.parametrize("myscale", [
+    scale.Scale(),
+    scale_octave.ScaleOctave(tones=[1200]),
+])
+def test_tuning_table_no_tones(myscale):
+    myscale.remove_degree(1)
+    assert midi_tuning.tuning_table(myscale) is None
+    assert midi_tuning.mts_bulk_dump(myscale) is None
+    assert midi_tuning.pitch_bend_table(myscale) is None
+
+
+def test_tuning_table_unmapped_reference():
+    mapping = WHITE_KEYS._replace(reference_note=70)
+    myscale = scale_12edo.Scale12EDO(tones=MAJOR)
+    assert midi_tuning.tuning_table(myscale, mapping) is None
+    myscale.root_note = note.Note(261.63)
+    assert midi_tuning.tuning_table(myscale, mapping).freq[60] == 261.63
+
+
+def test_tuning_table_cached():
+    myscale = chromatic()
+    test = midi_tuning.tuning_table(myscale)
+    assert midi_tuning.tuning_table(myscale) is test
+    assert midi_tuning.tuning_table(myscale, WHITE_KEYS) is not test
+    myscale.move_degree(2, 50)
+    moved = midi_tuning.tuning_table(myscale)
+    assert moved is not test
+    assert moved.cents[61] == 150
+
+
+def test_mts_frequency_data():
+    myscale = detuned()
+    test = midi_tuning.mts_frequency_data(myscale)
+    assert test.shape == (128, 3)
+    assert test[60].tolist() == [60, 0, 0]
+    # 50 cents is half a semitone: 0x2000 = 0x40 << 7
+    assert test[61].tolist() == [61, 0x40, 0]
+    assert test[0].tolist() == [0, 0, 0]
+    assert midi_tuning.mts_frequency_data(myscale) is test
+
+
+def test_mts_frequency_data_unmapped():
+    test = midi_tuning.mts_frequency_data(
+        scale_12edo.Scale12EDO(tones=MAJOR), WHITE_KEYS)
+    assert test[61].tolist() == list(midi_tuning.MTS_NO_CHANGE)
+    assert test[62].tolist() == [62, 0, 0]
+
+
+def test_mts_frequency_data_clipped():
+    myscale = scale_octave.ScaleOctave(root_note=note.Note(20000), tones=[0])
+    test = midi_tuning.mts_frequency_data(myscale)
+    assert test[127].tolist() == [0x7F, 0x7F, 0x7E]
+
+
+@pytest.mark.parametrize('concert_a_hz', [440, 442, 415])
+def test_mts_frequency_data_absolute(concert_a_hz, monkeypatch):
+    # MTS data puts note 69 at 440 Hz, whatever reference the library uses
+    monkeypatch.setattr(midi_12edo, 'CONCERT_A_HZ', concert_a_hz)
+    myscale = scale_12edo.Scale12EDO(
+        root_note=note.Note(440), tones=list(range(0, 1200, 100)))
+    test = midi_tuning.mts_frequency_data(
+        myscale, scala.linear_mapping(middle_note=69))
+    assert test[69].tolist() == [69, 0, 0]
+    assert test[81].tolist() == [81, 0, 0]
+
+
+@pytest.mark.parametrize('options', [
+    {'program': 128}, {'program': -1}, {'device_id': 0x80},
+    {'device_id': 1.5}, {'name': 'caf\u00e9'},
+])
+def test_mts_bulk_dump_error(options):
+    with pytest.raises(ValueError):
+        midi_tuning.mts_bulk_dump(chromatic(), **options)
+
+
+def test_mts_bulk_dump():
+    test = midi_tuning.mts_bulk_dump(
+        chromatic(), program=5, name='12-EDO', device_id=3)
+    assert len(test) == 408
+    assert test[:6] == bytes([0xF0, 0x7E, 3, 0x08, 0x01, 5])
+    assert test[6:22] == b'12-EDO          '
+    assert test[22:25] == bytes([0, 0, 0])
+    assert test[-1] == 0xF7
+    checksum = 0
+    for byte in test[1:-2]:
+        checksum ^= byte
+    assert test[-2] == checksum & 0x7F
+    assert all(byte < 0x80 for byte in test[1:-1])
+
+
+def test_pitch_bend_table():
+    myscale = detuned()
+    test = midi_tuning.pitch_bend_table(myscale)
+    assert test.note[60] == 60
+    assert test.bend[60] == midi_tuning.PITCH_BEND_CENTER
+    # 150 cents is halfway, and goes to the even note (2 semitones up)
+    assert test.note[61] == 62
+    assert test.bend[61] == 8192 - 2048
+    assert test.note[62] == 62
+    assert test.bend[62] == 8192 - 410
+    assert midi_tuning.pitch_bend_table(myscale) is test
+    wide = midi_tuning.pitch_bend_table(myscale, bend_range=12)
+    assert wide.bend[62] == 8192 - 68
+
+
+def test_pitch_bend_table_unmapped():
+    test = midi_tuning.pitch_bend_table(
+        scale_12edo.Scale12EDO(tones=MAJOR), WHITE_KEYS)
+    assert test.note[61] == -1
+    assert test.bend[61] == midi_tuning.PITCH_BEND_CENTER
+    assert test.note[62] == 62
+
+
+def test_tuning_table_nearest():
+    # C major on C4: white keys keep their pitch
+    myscale = scale_12edo.Scale12EDO(
+        root_note=note.Note(midi_12edo.freq_from_midi(60)), tones=MAJOR)
+    test = midi_tuning.tuning_table(myscale, midi_tuning.NEAREST)
+    freqs = midi_12edo.freq_from_midi_array(np.arange(128))
+    np.testing.assert_allclose(
+        test.freq[[59, 60, 62, 72]], freqs[[59, 60, 62, 72]])
+    assert test.degree[[59, 60, 62, 72]].tolist() == [7, 1, 2, 1]
+    assert test.cents[62] == pytest.approx(200)
+    assert test.mapped.all()
+    assert midi_tuning.tuning_table(myscale, midi_tuning.NEAREST) is test
+
+
+def test_tuning_table_nearest_concert_a(monkeypatch):
+    myscale = scale_12edo.Scale12EDO(
+        root_note=note.Note(midi_12edo.freq_from_midi(60)), tones=MAJOR)
+    test = midi_tuning.tuning_table(myscale, midi_tuning.NEAREST)
+    monkeypatch.setattr(midi_12edo, 'CONCERT_A_HZ', 432)
+    retuned = midi_tuning.tuning_table(myscale, midi_tuning.NEAREST)
+    # the keys are 31.8 cents lower, so some snap to other scale tones
+    fresh = scale_12edo.Scale12EDO(root_note=myscale.root_note, tones=MAJOR)
+    expected = midi_tuning.tuning_table(fresh, midi_tuning.NEAREST)
+    assert retuned.degree.tolist() == expected.degree.tolist()
+    assert retuned.degree.tolist() != test.degree.tolist()
+    monkeypatch.setattr(midi_12edo, 'CONCERT_A_HZ', 440)
+    assert midi_tuning.tuning_table(myscale, midi_tuning.NEAREST) is test
+
+
+def test_tuning_table_nearest_no_root():
+    myscale = scale_12edo.Scale12EDO(tones=MAJOR)
+    assert midi_tuning.tuning_table(myscale, midi_tuning.NEAREST) is None
+
+
+def test_pitch_bend_table_nearest():
+    myscale = scale_octave.ScaleOctave(
+        root_note=note.Note(midi_12edo.freq_from_midi(60)),
+        tones=[0, 386.314, 701.955])
+    test = midi_tuning.pitch_bend_table(myscale, midi_tuning.NEAREST)
+    assert test.note[[63, 64, 67]].tolist() == [64, 64, 67]
+    assert test.bend[64] == round(8192 - 13.686 / 200 * 8192)
+    assert test.bend[67] == round(8192 + 1.955 / 200 * 8192)
@@ -0,0 +1,66 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.modes as modes
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_octave as scale_octave
+
+MAJOR = [200, 400, 500, 700, 900, 1100, 1200]
+
+
+def test_rotations_12edo():
+    test = modes.rotations(scale_12edo.Scale12EDO(root_note=440, tones=MAJOR))
+    assert len(test) == 7
+    assert all(isinstance(mode, scale_12edo.Scale12EDO) for mode in test)
+    assert all(mode.root_note.freq == 440 for mode in test)
+    assert test[0].tones == (0, 200, 400, 500, 700, 900, 1100, 1200)
+    # dorian
+    assert test[1].tones == (0, 200, 300, 500, 700, 900, 1000, 1200)
+    # locrian
+    assert test[6].tones == (0, 100, 300, 500, 600, 800, 1000, 1200)
+
+
+@pytest.mark.parametrize(
+    'tones, unique, expected',
+    [
+        # whole tone scale: every rotation is the same
+        ([200, 400, 600, 800, 1000], True, [(0, 200, 400, 600, 800, 1000)]),
+        ([200, 400, 600, 800, 1000], False,
+            [(0, 200, 400, 600, 800, 1000)] * 6),
+        # a scale without the octave tone rotates within the octave
+        ([386.3, 701.9], True,
+            [(0, 386.3, 701.9), (0, 315.6, 813.7), (0, 498.1, 884.4)]),
+    ],
+)
+def test_rotations_octave(tones, unique, expected):
+    test = modes.rotations(
+        scale_octave.ScaleOctave(tones=tones), unique=unique)
+    assert [mode.tones for mode in test] == [
+        pytest.approx(tones) for tones in expected]
+
+
+def test_iter_rotations_scale():
+    # a plain scale repeats at its highest tone
+    test = list(modes.iter_rotations(scale.Scale(tones=[200, 400, 1200])))
+    assert [degree for degree, _ in test] == [1, 2, 3]
+    assert [mode.tones for _, mode in test] == [
+        (0, 200, 400, 1200), (0, 200, 1000, 1200), (0, 800, 1000, 1200)]
+    assert modes.rotations(scale.Scale())[0].tones == (0,)
+
+
+def test_rotation_matrix_batch():
+    test = modes.rotation_matrix([[0, 200, 400], [0, 500, 700]], [600, 1200])
+    assert test.shape == (2, 3, 3)
+    assert test[0].tolist() == [[0, 200, 400], [0, 200, 400], [0, 200, 400]]
+    assert test[1, 2].tolist() == [0, 500, 1000]
+    assert modes.unique_rows(test[0]).tolist() == [0]
+    assert modes.unique_rows(test[1]).tolist() == [0, 1, 2]
@@ -62,3 +62,10 @@ def test_note_freq_change_error(freq, change, expected):
     with pytest.raises(ValueError) as excinfo:
         test.freq = change
     assert str(excinfo.value) == expected
+
+
+def test_note_slots():
+    test = note.Note(440)
+    assert not hasattr(test, '__dict__')
+    with pytest.raises(AttributeError):
+        test.name = 'A4'
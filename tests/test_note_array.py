@@ -0,0 +1,73 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.note as note
+import lib.note_array as note_array
+
+FREQ_ERROR_MSG = f'frequency Hz must be between 0 and {note.MAX_FREQ_HZ}'
+
+
+@pytest.mark.parametrize(
+    'freqs, expected',
+    [
+        ([440, 220.5], [440, 220.5]),
+        (np.array([880.0]), [880]),
+        ((f for f in (100, 200)), [100, 200]),
+        ([], []),
+    ],
+)
+def test_note_array(freqs, expected):
+    test = note_array.NoteArray(freqs)
+    assert len(test) == len(expected)
+    assert test.freqs.tolist() == expected
+    assert [n.freq for n in test] == expected
+
+
+@pytest.mark.parametrize(
+    'freqs, expected',
+    [
+        ([440, 0], FREQ_ERROR_MSG),
+        ([-1], FREQ_ERROR_MSG),
+        ([note.MAX_FREQ_HZ + 1], FREQ_ERROR_MSG),
+        ([float('nan')], FREQ_ERROR_MSG),
+    ],
+)
+def test_note_array_error(freqs, expected):
+    with pytest.raises(ValueError) as excinfo:
+        note_array.NoteArray(freqs)
+    assert str(excinfo.value) == expected
+
+
+def test_note_array_slice_no_copy():
+    freqs = np.array([110.0, 220, 440, 880])
+    test = note_array.NoteArray(freqs)
+    part = test[1:3]
+    assert isinstance(part, note_array.NoteArray)
+    assert np.shares_memory(part.freqs, freqs)
+    part[0] = 330
+    assert test[1].freq == 330
+    with pytest.raises(ValueError):
+        part[1] = 0
+    assert test[2].freq == 440
+
+
+def test_note_array_freqs_read_only():
+    test = note_array.NoteArray([440])
+    with pytest.raises(ValueError):
+        test.freqs[0] = 1
+
+
+def test_note_array_notes():
+    notes = [note.Note(440), note.Note(660)]
+    test = note_array.NoteArray.from_notes(notes)
+    assert test.freqs.tolist() == [440, 660]
+    assert isinstance(test[-1], note.Note)
+    assert [n.freq for n in test.to_notes()] == [440, 660]
@@ -0,0 +1,107 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.arrays as arrays
+import lib.note as note
+import lib.pitch as pitch
+import lib.scale_12edo as scale_12edo
+
+RATE = 16000
+
+
+def tone(freq, seconds=0.5, harmonics=1):
+    times = np.arange(int(seconds * RATE)) / RATE
+    return sum(
+        np.sin(2 * np.pi * freq * number * times) / number
+        for number in range(1, harmonics + 1))
+
+
+def test_difference():
+    frames = np.random.default_rng(0).normal(size=(3, 64))
+    test = pitch.difference(frames, 20)
+    expected = np.array([
+        [((frame[:44] - frame[lag:lag + 44]) ** 2).sum() for lag in range(21)]
+        for frame in frames
+    ])
+    np.testing.assert_allclose(test, expected, atol=1e-9)
+
+
+def test_normalized_difference():
+    test = pitch.normalized_difference(np.array([
+        [0., 2, 4, 0],
+        [0., 0, 0, 0],
+    ]))
+    np.testing.assert_allclose(test, [[1, 1, 4 / 3, 0], [1, 1, 1, 1]])
+
+
+@pytest.mark.parametrize("freq, harmonics", [
+    (110, 1),
+    (261.63, 4),
+    (440, 3),
+    (1046.5, 1),
+])
+def test_estimate(freq, harmonics):
+    test = pitch.estimate(tone(freq, harmonics=harmonics), sample_rate=RATE)
+    assert len(test.freq) == arrays.frame_count(RATE // 2, 2048, 512)
+    np.testing.assert_allclose(test.freq, freq, rtol=2e-3)
+    assert test.confidence.min() > 0.9
+
+
+def test_estimate_unvoiced():
+    silence = np.zeros(RATE // 4)
+    test = pitch.estimate(silence, sample_rate=RATE)
+    assert np.isnan(test.freq).all()
+    assert (test.confidence == 0).all()
+    noise = np.random.default_rng(0).normal(size=RATE // 4)
+    test = pitch.estimate(noise, sample_rate=RATE)
+    assert np.isnan(test.freq).mean() > 0.5
+
+
+def test_estimate_short():
+    test = pitch.estimate(np.zeros(100), sample_rate=RATE)
+    assert len(test.freq) == len(test.confidence) == 0
+
+
+def test_track():
+    myscale = scale_12edo.Scale12EDO(
+        root_note=note.Note(261.63), tones=[0, 200, 400, 500, 700, 900, 1100])
+    samples = np.concatenate((tone(440), np.zeros(RATE // 4)))
+    test = pitch.track(samples, myscale, sample_rate=RATE, hop=1000)
+    assert test.time[:3].tolist() == [0, 1000 / RATE, 2000 / RATE]
+    np.testing.assert_allclose(test.midi[:5], 69, atol=0.05)
+    assert (test.degree[:5] == 6).all()
+    assert (test.octave[:5] == 0).all()
+    np.testing.assert_allclose(test.deviation[:5], 0, atol=5)
+    assert np.isnan(test.midi[-1])
+    assert test.degree[-1] == 0
+    assert np.isnan(test.deviation[-1])
+
+
+def test_track_no_scale():
+    test = pitch.track(tone(440), sample_rate=RATE)
+    assert (test.degree == 0).all()
+    assert np.isnan(test.deviation).all()
+
+
+@pytest.mark.parametrize("block_size", [1, 333, 4096, RATE])
+def test_tracker_matches_batch(block_size):
+    samples = np.concatenate((tone(220, 0.3), tone(330, 0.3)))
+    expected = pitch.track(samples, sample_rate=RATE)
+    tracker = pitch.PitchTracker(sample_rate=RATE)
+    results = [
+        tracker.process(samples[start:start + block_size])
+        for start in range(0, len(samples), block_size)
+    ]
+    assert tracker.frames == len(expected.freq)
+    for field in ('time', 'freq', 'confidence', 'midi'):
+        np.testing.assert_allclose(
+            np.concatenate([getattr(result, field) for result in results]),
+            getattr(expected, field))
@@ -0,0 +1,103 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import pytest
+
+import lib.pitch_class_set as pitch_class_set
+
+MAJOR = 0b101010110101
+MINOR = 0b010110101101
+WHOLE_TONE = 0b010101010101
+
+
+@pytest.mark.parametrize(
+    'cents, mask',
+    [
+        ([0, 200, 400, 500, 700, 900, 1100], MAJOR),
+        ([0, 1200, 2400], 1),
+        ([], 0),
+    ],
+)
+def test_mask_from_cents(cents, mask):
+    assert pitch_class_set.mask_from_cents(cents) == mask
+    assert pitch_class_set.cents_from_mask(mask) == sorted(
+        {c % 1200 for c in cents})
+
+
+@pytest.mark.parametrize(
+    'mask, semitones, expected',
+    [
+        (MAJOR, 0, MAJOR),
+        (MAJOR, 12, MAJOR),
+        # C major up 3 semitones is Eb major, the same set as C minor
+        (MAJOR, 3, MINOR),
+        (0b1, -1, 0b100000000000),
+        (0b100000000000, 1, 0b1),
+    ],
+)
+def test_transpose(mask, semitones, expected):
+    assert pitch_class_set.transpose(mask, semitones) == expected
+
+
+def test_set_operations():
+    assert pitch_class_set.complement(MAJOR) == 0b010101001010
+    assert pitch_class_set.union(MAJOR, WHOLE_TONE) == 0b111111110101
+    assert pitch_class_set.intersection(MAJOR, WHOLE_TONE) == 0b000000010101
+    assert pitch_class_set.invert(0b10010001) == 0b000100100001
+    assert pitch_class_set.has_pitch_class(MAJOR, 7)
+    assert not pitch_class_set.has_pitch_class(MAJOR, 6)
+    assert pitch_class_set.has_pitch_class(MAJOR, -1)
+
+
+@pytest.mark.parametrize(
+    'mask, vector',
+    [
+        (MAJOR, (2, 5, 4, 3, 6, 1)),
+        (WHOLE_TONE, (0, 6, 0, 6, 0, 3)),
+        (0b10010001, (0, 0, 1, 1, 1, 0)),
+    ],
+)
+def test_interval_vector(mask, vector):
+    assert pitch_class_set.interval_vector(mask) == vector
+    assert tuple(pitch_class_set.catalog().interval_vector[mask]) == vector
+
+
+def test_forms():
+    # the major triad and minor triad share a prime form, not a normal form
+    major_triad = 0b10010001
+    minor_triad = 0b10001001
+    assert pitch_class_set.normal_form(major_triad) != \
+        pitch_class_set.normal_form(minor_triad)
+    assert pitch_class_set.prime_form(major_triad) == \
+        pitch_class_set.prime_form(minor_triad)
+    # all diatonic modes share a normal form
+    assert pitch_class_set.normal_form(MAJOR) == \
+        pitch_class_set.normal_form(MINOR)
+
+
+def test_modes():
+    test = pitch_class_set.modes(MAJOR)
+    assert len(test) == 7
+    assert test[0] == MAJOR
+    assert test[5] == MINOR
+    assert pitch_class_set.modes(WHOLE_TONE) == [WHOLE_TONE] * 6
+
+
+def test_catalog():
+    catalog = pitch_class_set.catalog()
+    assert catalog is pitch_class_set.catalog()
+    assert len(catalog.prime_form) == pitch_class_set.MASK_COUNT
+    for mask in (0, 1, MAJOR, WHOLE_TONE, 0b10010001, 2741, 4095):
+        assert catalog.cardinality[mask] == pitch_class_set.cardinality(mask)
+        assert catalog.normal_form[mask] == pitch_class_set.normal_form(mask)
+        assert catalog.prime_form[mask] == pitch_class_set.prime_form(mask)
+    assert catalog.distinct_modes[MAJOR] == 7
+    assert catalog.distinct_modes[WHOLE_TONE] == 1
+    assert catalog.symmetry[WHOLE_TONE] == 6
+    assert catalog.prime_form[[MAJOR, MINOR]].tolist() == [
+        pitch_class_set.prime_form(MAJOR)] * 2
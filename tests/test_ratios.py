@@ -6,6 +6,10 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
+import numbers
+import pickle
+
+import numpy as np
 import pytest
 
 import lib.ratios as ratios
@@ -35,3 +39,133 @@ def test_cents(freq1, freq2, cents):
 def test_freq_ratio(cents, ratio):
     test = ratios.freq_ratio(cents)
     assert test == ratio
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [
+        (8, 3),
+        (0.5, -1),
+        (0, float('-inf')),
+    ],
+)
+def test_log2(value, expected):
+    with np.errstate(divide='ignore'):
+        test = ratios.log2(value)
+    assert test == expected
+
+
+def test_cents_array():
+    test = ratios.cents(440, np.array([220, 440, 880]))
+    assert test.tolist() == [-1200, 0, 1200]
+
+
+@pytest.mark.parametrize(
+    'numerator, denominator, cents',
+    [
+        (2, 1, 1200),
+        (1, 4, -2400),
+        (3, 2, 701.955),
+        ('5/4', 1, 386.314),
+    ],
+)
+def test_ratio_cents(numerator, denominator, cents):
+    test = ratios.Ratio(numerator, denominator)
+    assert float(test) == pytest.approx(cents, abs=1e-3)
+    assert test.cents == pytest.approx(ratios.cents(1, float(test.fraction)))
+
+
+@pytest.mark.parametrize('numerator, denominator', [(0, 1), (-3, 2)])
+def test_ratio_error(numerator, denominator):
+    with pytest.raises(ValueError):
+        ratios.Ratio(numerator, denominator)
+
+
+def test_ratio_exact():
+    fifth = ratios.Ratio(3, 2)
+    assert fifth == ratios.Ratio(6, 4)
+    assert hash(fifth) == hash(ratios.Ratio(6, 4))
+    assert ratios.Ratio(2) == 1200
+    assert hash(ratios.Ratio(2)) == hash(1200)
+    assert fifth + ratios.Ratio(4, 3) == ratios.Ratio(2)
+    assert fifth - ratios.Ratio(9, 8) == ratios.Ratio(4, 3)
+    assert fifth + 1200 == ratios.Ratio(3)
+    assert 0 + fifth == fifth
+    assert -fifth == ratios.Ratio(2, 3)
+    assert fifth * 4 - 2400 == ratios.Ratio(81, 64)
+    # twelve fifths overshoot seven octaves by the Pythagorean comma
+    assert 12 * fifth - 8400 == ratios.Ratio(531441, 524288)
+    assert isinstance(fifth + 0.5, float)
+    assert fifth + 0.5 == pytest.approx(702.455, abs=1e-3)
+
+
+@pytest.mark.parametrize('expression, expected', [
+    # a Ratio is its cents value, never the ratio itself
+    (lambda fifth: fifth == 1.5, False),
+    (lambda fifth: fifth == fifth.cents, True),
+    (lambda fifth: fifth > 700, True),
+    (lambda fifth: 702 > fifth, True),
+    (lambda fifth: float(fifth), 701.9550008653874),
+    # exact: Ratios, whole octaves and stacking by an int
+    (lambda fifth: fifth + fifth, ratios.Ratio(9, 4)),
+    (lambda fifth: fifth * 2, ratios.Ratio(9, 4)),
+    (lambda fifth: 2 * fifth, ratios.Ratio(9, 4)),
+    (lambda fifth: fifth * -1, ratios.Ratio(2, 3)),
+    (lambda fifth: 2400 - fifth, ratios.Ratio(8, 3)),
+    # cents, for any other number
+    (lambda fifth: fifth * 0.5, 701.9550008653874 / 2),
+    (lambda fifth: fifth / 2, 701.9550008653874 / 2),
+    (lambda fifth: fifth - 1.955, 700.0000008653874),
+    (lambda fifth: 1000 - fifth, 1000 - 701.9550008653874),
+    (lambda fifth: fifth // 100, 7.0),
+    (lambda fifth: fifth % 100, 1.9550008653874),
+])
+def test_ratio_mixed_operators(expression, expected):
+    test = expression(ratios.Ratio(3, 2))
+    assert type(test) is type(expected)
+    if isinstance(expected, float):
+        assert test == pytest.approx(expected)
+    else:
+        assert test == expected
+
+
+@pytest.mark.parametrize('expression', [
+    lambda fifth: fifth * fifth,
+    lambda fifth: fifth / fifth,
+    lambda fifth: fifth ** 2,
+    lambda fifth: 2 ** fifth,
+    lambda fifth: fifth + 'x',
+])
+def test_ratio_operator_errors(expression):
+    with pytest.raises(TypeError):
+        expression(ratios.Ratio(3, 2))
+
+
+def test_ratio_not_real():
+    assert not isinstance(ratios.Ratio(3, 2), numbers.Real)
+
+
+def test_ratio_order():
+    tones = [ratios.Ratio(3, 2), 700, 0, ratios.Ratio(2), 1100.5]
+    assert sorted(tones) == [0, 700, ratios.Ratio(3, 2), 1100.5, 1200]
+    assert ratios.Ratio(5, 4) < ratios.Ratio(4, 3) <= ratios.Ratio(8, 6)
+
+
+@pytest.mark.parametrize(
+    'ratio, reduced',
+    [
+        ((9, 4), (9, 8)),
+        ((1, 3), (4, 3)),
+        ((2, 1), (1, 1)),
+        ((15, 8), (15, 8)),
+    ],
+)
+def test_ratio_octave_reduced(ratio, reduced):
+    assert ratios.Ratio(*ratio).octave_reduced() == ratios.Ratio(*reduced)
+
+
+def test_ratio_pickle():
+    test = ratios.Ratio(7, 4)
+    assert pickle.loads(pickle.dumps(test)) == test
+    assert str(test) == '7/4'
+    assert repr(test) == 'Ratio(7, 4)'
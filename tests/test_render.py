@@ -0,0 +1,117 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import math
+import wave
+
+import numpy as np
+import pytest
+
+import lib.midi_tuning as midi_tuning
+import lib.note as note
+import lib.render as render
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+
+RATE = 8000
+
+
+def test_sequence():
+    test = list(render.sequence([100, math.nan, 300], duration=0.5))
+    assert test == [
+        render.Tone(0, 0.5, 100, render.AMPLITUDE),
+        render.Tone(1, 0.5, 300, render.AMPLITUDE),
+    ]
+
+
+def test_scale_tones():
+    myscale = scale_12edo.Scale12EDO(
+        root_note=note.Note(440), tones=[0, 400, 700, 1200])
+    test = render.scale_tones(myscale, duration=1)
+    assert [tone.start for tone in test] == [0, 1, 2, 3]
+    assert [tone.freq for tone in test] == pytest.approx(
+        [440, 554.365, 659.255, 880], abs=1e-3)
+    assert render.scale_tones(scale.Scale()) is None
+
+
+def test_scale_tones_not_repeating():
+    myscale = scale.Scale(root_note=100, tones=[0, 1901.955])
+    test = render.scale_tones(myscale)
+    assert [tone.freq for tone in test] == pytest.approx([100, 300])
+
+
+def test_note_tones():
+    test = render.note_tones([note.Note(100), note.Note(200)], duration=2)
+    assert [(tone.start, tone.freq) for tone in test] == [(0, 100), (2, 200)]
+
+
+def test_tuning_tones():
+    myscale = scale_12edo.Scale12EDO(
+        root_note=note.Note(261.63), tones=list(range(0, 1200, 100)))
+    test = render.tuning_tones(midi_tuning.tuning_table(myscale))
+    assert len(test) == 128
+
+
+def test_render_sine():
+    tones = [render.Tone(0, 1, 1000, 1)]
+    blocks = list(render.render(
+        tones, sample_rate=RATE, block_size=1000, fade_seconds=0))
+    assert [len(block) for block in blocks] == [1000] * 8
+    samples = np.concatenate(blocks)
+    expected = np.sin(2 * np.pi * 1000 * np.arange(RATE) / RATE)
+    np.testing.assert_allclose(samples, expected, atol=1e-9)
+
+
+def test_render_blocks_continuous():
+    # block boundaries don't change the samples
+    tones = [render.Tone(0, 0.3, 440, 0.5), render.Tone(0.1, 0.25, 660, 0.25)]
+    whole = np.concatenate(list(render.render(
+        tones, sample_rate=RATE, block_size=RATE)))
+    blocks = list(render.render(tones, sample_rate=RATE, block_size=97))
+    assert max(len(block) for block in blocks) == 97
+    np.testing.assert_allclose(np.concatenate(blocks), whole, atol=1e-12)
+    assert len(whole) == round(0.35 * RATE)
+
+
+def test_render_fade_and_gap():
+    tones = [render.Tone(0, 0.1, 440, 1), render.Tone(0.2, 0.1, 440, 1)]
+    samples = np.concatenate(list(render.render(
+        tones, sample_rate=RATE, fade_seconds=0.01)))
+    assert len(samples) == round(0.3 * RATE)
+    assert samples[0] == 0
+    assert np.abs(samples[:80]).max() < np.abs(samples[80:160]).max()
+    assert not samples[800:1600].any()
+
+
+def test_render_empty():
+    assert list(render.render([])) == []
+
+
+def test_write_wav(tmp_path):
+    path = str(tmp_path / 'test.wav')
+    blocks = [np.array([0, 0.5, -0.5]), np.array([2.0, -2.0])]
+    assert render.write_wav(path, blocks, sample_rate=RATE) == 5
+    with wave.open(path, 'rb') as wav:
+        assert wav.getnchannels() == 1
+        assert wav.getframerate() == RATE
+        assert wav.getsampwidth() == 2
+        data = np.frombuffer(wav.readframes(5), dtype='<i2')
+    assert data.tolist() == [0, 16384, -16384, 32767, -32767]
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_render_wavs(tmp_path, processes):
+    jobs = [
+        (str(tmp_path / '{0}.wav'.format(number)),
+         render.sequence([440] * number, duration=0.25))
+        for number in (1, 2)
+    ]
+    test = render.render_wavs(jobs, sample_rate=RATE, processes=processes)
+    assert test == [RATE // 4, RATE // 2]
+    with wave.open(jobs[1][0], 'rb') as wav:
+        assert wav.getnframes() == RATE // 2
@@ -0,0 +1,189 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import io
+
+import pytest
+
+import lib.ratios as ratios
+import lib.scala as scala
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_edo as scale_edo
+import lib.scale_octave as scale_octave
+
+JUST_MAJOR_SCL = """! just_major.scl
+!
+Just major scale
+ 7
+!
+ 9/8
+ 5/4
+ 4/3
+ 3/2 perfect fifth
+ 5/3
+ 15/8
+ 2
+"""
+
+KBM = """! test.kbm
+12
+0
+127
+60
+69
+440.0
+12
+! mapping
+0
+x
+2
+x
+4
+5
+x
+7
+x
+9
+x
+11
+"""
+
+
+@pytest.mark.parametrize(
+    'text, cents',
+    [
+        ('100.0', 100),
+        (' 386.3137 cents', 386.3137),
+        ('3/2', 701.955),
+        ('2', 1200),
+        ('-50.0', -50),
+    ],
+)
+def test_parse_pitch(text, cents):
+    assert float(scala.parse_pitch(text)) == pytest.approx(cents, abs=1e-3)
+
+
+@pytest.mark.parametrize('text', ['', 'abc', '3/0', '-3/2'])
+def test_parse_pitch_error(text):
+    with pytest.raises(ValueError):
+        scala.parse_pitch(text)
+
+
+def test_read_scl():
+    description, test = scala.read_scl(io.StringIO(JUST_MAJOR_SCL))
+    assert description == 'Just major scale'
+    assert isinstance(test, scale_octave.ScaleOctave)
+    assert [float(tone) for tone in test.tones] == pytest.approx(
+        (0, 203.91, 386.314, 498.045, 701.955, 884.359, 1088.269, 1200),
+        abs=1e-3)
+
+
+def test_read_scl_scale_class():
+    text = '!\n\n 2\n1200.0\n2400.0\n'
+    description, test = scala.read_scl(io.StringIO(text))
+    assert description == ''
+    assert type(test) is scale.Scale
+    assert test.tones == (0, 1200, 2400)
+
+
+def test_read_scl_error():
+    with pytest.raises(ValueError):
+        scala.read_scl(io.StringIO('! short\nname\n 3\n100.0\n'))
+
+
+@pytest.mark.parametrize('pitches, rejected', [
+    (['-100.0', '700.0'], '-100.000000'),
+    (['700.0', '1200.0', '2'], '2/1'),
+    (['0.0', '1200.0'], '0.000000'),
+])
+def test_read_scl_rejected(pitches, rejected):
+    # pitches the scale can't hold fail the read instead of going missing
+    text = '!\nrejected\n {0}\n{1}\n'.format(
+        len(pitches), '\n'.join(pitches))
+    assert len(scala.read_scl_data(io.StringIO(text)).cents) == len(pitches)
+    with pytest.raises(ValueError, match=rejected):
+        scala.read_scl(io.StringIO(text))
+
+
+def test_scale_from_cents_rejected():
+    with pytest.raises(ValueError, match='ScaleOctave rejected pitches: 1300'):
+        scala.scale_from_cents(
+            [700, 1300], scale_class=scale_octave.ScaleOctave)
+
+
+def test_read_scl_edo():
+    text = '!\n19-EDO\n 3\n 189.473684\n 378.947368\n 2/1\n'
+    _, test = scala.read_scl(
+        io.StringIO(text), scale_class=scale_edo.ScaleEDO, edo=19)
+    assert type(test) is scale_edo.ScaleEDO
+    assert test.edo == 19
+    assert test.steps == (0, 3, 6, 19)
+    with pytest.raises(ValueError, match='ScaleEDO rejected pitches: 100'):
+        scala.scale_from_cents(
+            [100.0], scale_class=scale_edo.ScaleEDO, edo=19)
+    twelve = scala.scale_from_cents(
+        [700], scale_class=scale_12edo.Scale12EDO)
+    assert twelve.steps == (0, 7)
+
+
+def test_write_scl():
+    fileobj = io.StringIO()
+    scala.write_scl(
+        scale_octave.ScaleOctave(tones=[200, 701.955]), fileobj, 'test')
+    fileobj.seek(0)
+    data = scala.read_scl_data(fileobj)
+    assert data.description == 'test'
+    assert data.cents == [200, 701.955, 1200]
+
+
+def test_write_scl_ratios():
+    # exact ratios are written as ratios, and read back exactly
+    fileobj = io.StringIO()
+    scala.write_scl(scale_octave.ScaleOctave.from_tones(
+        [ratios.Ratio(9, 8), ratios.Ratio(3, 2), 500.0]), fileobj)
+    fileobj.seek(0)
+    data = scala.read_scl_data(fileobj)
+    assert data.cents == [ratios.Ratio(9, 8), 500, ratios.Ratio(3, 2), 1200]
+    assert isinstance(data.cents[2], ratios.Ratio)
+
+
+def test_kbm():
+    test = scala.read_kbm(io.StringIO(KBM))
+    assert test.size == 12
+    assert test.middle_note == 60
+    assert test.reference_freq == 440
+    assert test.keys == (0, None, 2, None, 4, 5, None, 7, None, 9, None, 11)
+    fileobj = io.StringIO()
+    scala.write_kbm(test, fileobj)
+    fileobj.seek(0)
+    assert scala.read_kbm(fileobj) == test
+    assert scala.linear_mapping().size == 0
+
+
+@pytest.mark.parametrize('processes', [1, 2])
+def test_build_index(tmp_path, processes):
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'just.scl').write_text(JUST_MAJOR_SCL)
+    (tmp_path / 'sub' / 'et.scl').write_text(
+        '!\nhalf octave\n 2\n600.0\n1200.0\n')
+    (tmp_path / 'bad.scl').write_text('!\nbad\n 2\n600.0\n')
+    (tmp_path / 'notes.txt').write_text('not a scale')
+    index_path = tmp_path / 'index.npz'
+    failed = scala.build_index(
+        str(tmp_path), str(index_path), processes=processes)
+    assert failed == [str(tmp_path / 'bad.scl')]
+    test = scala.ScalaIndex(str(index_path))
+    assert len(test) == 2
+    assert test.names == ['just', 'sub/et']
+    assert test.counts.tolist() == [7, 2]
+    position = test.position('sub/et')
+    assert test.description(position) == 'half octave'
+    assert test.cents(position).tolist() == [600, 1200]
+    assert test.scale('sub/et', root_note=440).tones == (0, 600, 1200)
+    assert test.scale('missing') is None
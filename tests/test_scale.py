@@ -6,10 +6,13 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
+import pickle
+
 import pytest
 
 import lib.note as note
 import lib.scale as scale
+import lib.scale_octave as scale_octave
 
 FREQ_ERROR_MSG = f'frequency Hz must be between 0 and {note.MAX_FREQ_HZ}'
 
@@ -24,8 +27,8 @@ FREQ_ERROR_MSG = f'frequency Hz must be between 0 and {note.MAX_FREQ_HZ}'
 def test_scale_noroot(scale_root, root_freq, degrees, tones):
     test = scale.Scale(root_note=scale_root)
     assert test.root_note == root_freq
-    assert test.degrees == degrees
-    assert test.tones == tones
+    assert test.degrees == tuple(degrees)
+    assert test.tones == tuple(tones)
 
 
 @pytest.mark.parametrize(
@@ -76,8 +79,8 @@ def test_scale_add_tone(scale_root, new_tones, degrees, tones):
     test = scale.Scale(root_note=scale_root)
     for new_tone in new_tones:
         test.add_tone(new_tone)
-    assert test.degrees == degrees
-    assert test.tones == tones
+    assert test.degrees == tuple(degrees)
+    assert test.tones == tuple(tones)
 
 
 def test_add_tone_bad():
@@ -93,7 +96,7 @@ def test_scale_single_tones():
     test = scale.Scale()
     for i in range(1, 12):
         test.add_tone(i * 100)
-    assert test.degrees == list(range(1, 13))
+    assert test.degrees == tuple(range(1, 13))
     assert test.tones[8] == 800
     assert test.tones[0] == 0
     assert len(test.tones) == 12
@@ -101,7 +104,7 @@ def test_scale_single_tones():
 
 def test_scale_tones_array():
     test = scale.Scale(tones=list(range(100, 1200, 100)))
-    assert test.degrees == list(range(1, 13))
+    assert test.degrees == tuple(range(1, 13))
     assert test.tones[8] == 800
     assert test.tones[0] == 0
     assert len(test.tones) == 12
@@ -116,8 +119,8 @@ def test_scale_tones_array():
 )
 def test_scale_bad_tone(init_tones, degrees, tones):
     test = scale.Scale(tones=init_tones)
-    assert test.degrees == degrees
-    assert test.tones == tones
+    assert test.degrees == tuple(degrees)
+    assert test.tones == tuple(tones)
 
 
 @pytest.mark.parametrize(
@@ -212,11 +215,11 @@ def test_add_tone_rel_degree(init_tones, degree, cents, new, degree_cents):
 def test_scale_remove_degree(
         init_tones, degrees, remove_degree, new, new_degrees, new_tones):
     test = scale.Scale(tones=init_tones)
-    assert test.degrees == degrees
+    assert test.degrees == tuple(degrees)
     retval = test.remove_degree(remove_degree)
     assert retval == new
-    assert test.degrees == new_degrees
-    assert test.tones == new_tones
+    assert test.degrees == tuple(new_degrees)
+    assert test.tones == tuple(new_tones)
 
 
 @pytest.mark.parametrize(
@@ -290,8 +293,290 @@ def test_scale_remove_degree(
 def test_move_degree(
         init_tones, degrees, move_degree, move_cents, new, new_degrees, new_tones):
     test = scale.Scale(tones=init_tones)
-    assert test.degrees == degrees
+    assert test.degrees == tuple(degrees)
     retval = test.move_degree(degree=move_degree, cents=move_cents)
     assert retval == new
-    assert test.degrees == new_degrees
-    assert test.tones == new_tones
+    assert test.degrees == tuple(new_degrees)
+    assert test.tones == tuple(new_tones)
+
+
+def test_scale_degree_tones_read_only():
+    test = scale.Scale(tones=[200, 400])
+    with pytest.raises(TypeError):
+        test.degree_tones[2] = 300
+    with pytest.raises(TypeError):
+        test.degree_steps_cents[2] = 300
+    assert test.degree_tones == {1: 0, 2: 200, 3: 400}
+
+
+def test_scale_cached_views():
+    test = scale.Scale(tones=[200, 400])
+    tones = test.tones
+    assert test.tones is tones
+    assert test.degrees is test.degrees
+    assert test.degree_steps_cents is test.degree_steps_cents
+    version = test.version
+    test.add_tone(300)
+    assert test.version > version
+    assert test.tones == (0, 200, 300, 400)
+    assert tones == (0, 200, 400)
+
+
+@pytest.mark.parametrize(
+    'change',
+    [
+        lambda s: s.add_tone(300),
+        lambda s: s.add_tones([300, 500]),
+        lambda s: s.move_degree(2, 50),
+        lambda s: s.move_degree(2, 200),
+        lambda s: s.remove_degree(2),
+        lambda s: s.remove_degrees([2]),
+        lambda s: setattr(s, 'root_note', 440),
+    ]
+)
+def test_scale_version(change):
+    test = scale.Scale(tones=[200, 400])
+    version = test.version
+    calls = []
+    test.cached('test', lambda: calls.append(1))
+    change(test)
+    assert test.version > version
+    test.cached('test', lambda: calls.append(1))
+    test.cached('test', lambda: calls.append(1))
+    assert len(calls) == 2
+
+
+def test_scale_version_unchanged():
+    test = scale.Scale(tones=[200, 400])
+    version = test.version
+    test.add_tone(200)
+    test.add_tone(-1)
+    test.remove_degree(9)
+    test.add_tones([])
+    assert test.version == version
+
+
+def test_scale_large():
+    test = scale.Scale()
+    for i in range(2000, 0, -1):
+        test.add_tone(i * 0.5)
+    assert len(test.tones) == 2001
+    assert test.degree_tones[1001] == 500
+    assert test.remove_degree(2) == 0
+    assert test.tones[:3] == (0, 1, 1.5)
+
+
+@pytest.mark.parametrize(
+    'new_tones, rejected, tones',
+    [
+        ([700, 400, 700], [700], [0, 400, 700]),
+        ([0, -100, 'bad', float('nan'), 200], [0, -100, 'bad', float('nan')],
+            [0, 200]),
+        (range(300, 0, -200), [], [0, 100, 300]),
+    ]
+)
+# one tone at a time, and as a numpy batch
+@pytest.mark.parametrize('array_tones', [scale.ARRAY_TONES, 0])
+def test_scale_add_tones(new_tones, rejected, tones, array_tones, monkeypatch):
+    monkeypatch.setattr(scale, 'ARRAY_TONES', array_tones)
+    test = scale.Scale()
+    retval = test.add_tones(new_tones)
+    assert [str(tone) for tone in retval] == [str(tone) for tone in rejected]
+    assert test.tones == tuple(tones)
+
+
+@pytest.mark.parametrize('init_tones', [[200, 400], [1.5, 2, 3]])
+def test_scale_add_tones_array_existing(init_tones):
+    # few tones in a large store, and many tones in a small one
+    new_tones = [i * 0.5 for i in range(scale.ARRAY_TONES * 2, 0, -1)]
+    test = scale.Scale(tones=init_tones)
+    rejected = test.add_tones(new_tones + new_tones[:3])
+    assert sorted(rejected) == sorted(
+        [tone for tone in new_tones if tone in init_tones] + new_tones[:3])
+    assert test.add_tones(init_tones * scale.ARRAY_TONES) == (
+        init_tones * scale.ARRAY_TONES)
+    assert len(test.tones) == len(set(new_tones + init_tones)) + 1
+
+
+def test_scale_from_tones():
+    test = scale.Scale.from_tones([1100, 200, 400], root_note=440)
+    assert isinstance(test, scale.Scale)
+    assert test.root_note.freq == 440
+    assert test.degree_tones == {1: 0, 2: 200, 3: 400, 4: 1100}
+
+
+@pytest.mark.parametrize(
+    'init_tones, remove, rejected, tones',
+    [
+        ([200, 400, 500, 700], [2, 4], [], [0, 400, 700]),
+        ([200, 400, 500, 700], [3, 3, 9, 'x'], [3, 9, 'x'], [0, 200, 500, 700]),
+    ]
+)
+def test_scale_remove_degrees(init_tones, remove, rejected, tones):
+    test = scale.Scale(tones=init_tones)
+    retval = test.remove_degrees(remove)
+    assert retval == rejected
+    assert test.tones == tuple(tones)
+
+
+@pytest.mark.parametrize(
+    'cents, expected',
+    [
+        (180, (2, 0, -20)),
+        (300, (2, 0, 100)),
+        (-50, (1, 0, -50)),
+        (5000, (4, 0, 3800)),
+    ]
+)
+def test_scale_quantize_cents(cents, expected):
+    test = scale.Scale(tones=[200, 400, 1200])
+    assert test.quantize_cents(cents) == expected
+
+
+def test_scale_quantize_array():
+    test = scale.Scale(root_note=440, tones=[200, 400, 1200])
+    retval = test.quantize([440, 880, 495])
+    assert retval.degree.tolist() == [1, 4, 2]
+    assert retval.octave.tolist() == [0, 0, 0]
+    assert retval.deviation[2] == pytest.approx(3.91, abs=0.01)
+
+
+def test_scale_quantize_no_root():
+    test = scale.Scale(tones=[200])
+    assert test.quantize(440) is None
+
+
+def test_scale_quantize_mutate():
+    test = scale.Scale(tones=[200, 400])
+    assert test.quantize_cents(310).degree == 3
+    test.add_tone(300)
+    assert test.quantize_cents(310).degree == 3
+    assert test.quantize_cents(310).deviation == 10
+    test.move_degree(3, -50)
+    assert test.quantize_cents(310) == (3, 0, 60)
+    test.remove_degrees([3])
+    assert test.quantize_cents(310) == (3, 0, -90)
+
+
+def test_scale_frequencies():
+    test = scale.Scale(root_note=100, tones=[1200, 2400])
+    retval = test.frequencies(min_freq_hz=150)
+    assert retval.freq.tolist() == [200, 400]
+    assert retval.degree.tolist() == [2, 3]
+    assert retval.octave.tolist() == [0, 0]
+    assert list(test.iter_frequencies(min_freq_hz=150)) == [
+        (200, 2, 0), (400, 3, 0)]
+    assert test.frequencies(min_freq_hz=150) is retval
+    with pytest.raises(ValueError):
+        retval.freq[0] = 1
+
+
+def test_scale_frequencies_no_root():
+    test = scale.Scale(tones=[1200])
+    assert test.frequencies() is None
+    assert list(test.iter_frequencies()) == []
+
+
+class FixedPointScale(scale.Scale):
+    TONE_RESOLUTION = 1e-6
+
+
+class FixedPointOctave(scale_octave.ScaleOctave):
+    TONE_RESOLUTION = 1e-3
+
+
+def batch_of_tones(count):
+    # repeats, tones closer than the fixed point resolutions, and bad values
+    distinct = count - count // 4 - 4
+    tones = [(i * 7919) % (count * 2) * 10.5 for i in range(distinct)]
+    tones += [tone + 1e-9 for tone in tones[:count // 8]]
+    tones += tones[:count - len(tones) - 4]
+    return tones + [-100, float('nan'), 'bad', float('inf')]
+
+
+# batches below and above ARRAY_TONES take different paths
+@pytest.mark.parametrize(
+    'count', [scale.ARRAY_TONES - 1, scale.ARRAY_TONES, scale.ARRAY_TONES * 3])
+@pytest.mark.parametrize(
+    'scale_class',
+    [scale.Scale, scale_octave.ScaleOctave, FixedPointScale, FixedPointOctave])
+def test_scale_add_tones_same_as_add_tone(scale_class, count):
+    new_tones = batch_of_tones(count)
+    assert len(new_tones) == count
+    batch = scale_class(tones=[150.25])
+    rejected = batch.add_tones(new_tones)
+    one_at_a_time = scale_class(tones=[150.25])
+    for tone in new_tones:
+        one_at_a_time.add_tones([tone])
+    assert batch.tones == one_at_a_time.tones
+    assert batch.degree_steps_cents == one_at_a_time.degree_steps_cents
+    assert len(rejected) == len(new_tones) - len(batch.tones) + 2
+
+
+@pytest.mark.parametrize(
+    'scale_class, new_tones, rejected, tones',
+    [
+        (FixedPointScale, [386.3137, 386.31370000001, 200.0],
+            [386.31370000001], (0, 200, 386.3137)),
+        (FixedPointOctave, [100.0004, 100.0001, 99.9996, 1300],
+            [100.0001, 99.9996, 1300], (0, 100)),
+        (scale.Scale, [386.3137, 386.31370000001], [],
+            (0, 386.3137, 386.31370000001)),
+    ]
+)
+@pytest.mark.parametrize('array_tones', [scale.ARRAY_TONES, 0])
+def test_scale_fixed_point(
+        scale_class, new_tones, rejected, tones, array_tones, monkeypatch):
+    monkeypatch.setattr(scale, 'ARRAY_TONES', array_tones)
+    test = scale_class()
+    assert test.add_tones(new_tones) == rejected
+    assert test.tones == tones
+    assert test.add_tone(tones[-1] + 1e-9) == -1 or scale_class is scale.Scale
+
+
+def test_scale_fixed_point_degrees():
+    test = FixedPointScale(tones=[203.91, 386.3137, 701.955])
+    assert test.add_tone(386.31370000001) == -1
+    assert test.add_tone(float('inf')) is None
+    assert test.add_tone_rel_degree(2, 182.4037) == -1
+    assert test.move_degree(3, 0.0001) == 0
+    assert test.degree_tones[3] == 386.3138
+    assert test.with_tones([100.0000001]).tones == (0, 100)
+    assert test.remove_degree(3) == 0
+    assert test.tones == (0, 203.91, 701.955)
+
+
+@pytest.mark.parametrize('scale_class', [scale.Scale, scale_octave.ScaleOctave])
+def test_scale_tone_resolution(scale_class):
+    test = scale_class(tones=[100.0004, 100.0001], tone_resolution=1e-3)
+    assert test.tone_resolution == 1e-3
+    assert test.tones == (0, 100)
+    assert test.with_tones([200.0001]).tone_resolution == 1e-3
+    built = scale_class.from_tones([99.9996], tone_resolution=1e-3)
+    assert built.tones == (0, 100)
+    assert scale_class().tone_resolution is None
+    assert FixedPointScale().tone_resolution == 1e-6
+    assert FixedPointScale(tone_resolution=1).tone_resolution == 1
+
+
+def test_scale_tone_resolution_steps():
+    test = scale.Scale(
+        tones=[100, 386.3137, 386.31370000001, 700.1], tone_resolution=1e-6)
+    assert test.degree_steps_cents == {1: 0, 2: 100, 3: 286.3137, 4: 313.7863}
+    assert isinstance(test.degree_steps_cents[2], int)
+
+
+@pytest.mark.parametrize('tone_resolution', [0, -1e-3])
+def test_scale_tone_resolution_error(tone_resolution):
+    with pytest.raises(ValueError):
+        scale.Scale(tone_resolution=tone_resolution)
+
+
+def test_scale_pickle():
+    test = scale.Scale(root_note=note.Note(440), tones=[200, 700])
+    assert test.degree_tones[2] == 200
+    copy = pickle.loads(pickle.dumps(test))
+    assert copy.tones == (0, 200, 700)
+    assert copy.root_note.freq == 440
+    assert copy.add_tone(400) == 3
+    assert test.tones == (0, 200, 700)
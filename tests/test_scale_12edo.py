@@ -25,8 +25,8 @@ WHOLE = SEMI * 2
 )
 def test_scale(initial, degrees, tones):
     test = scale_12edo.Scale12EDO(tones=initial)
-    assert test.degrees == degrees
-    assert test.tones == tones
+    assert test.degrees == tuple(degrees)
+    assert test.tones == tuple(tones)
 
 
 @pytest.mark.parametrize(
@@ -41,8 +41,8 @@ def test_scale_add(initial, add, new, degrees, tones):
     test = scale_12edo.Scale12EDO(tones=initial)
     retval = test.add_tone(add)
     assert retval == new
-    assert test.degrees == degrees
-    assert test.tones == tones
+    assert test.degrees == tuple(degrees)
+    assert test.tones == tuple(tones)
 
 
 @pytest.mark.parametrize(
@@ -82,3 +82,33 @@ def test_scale_move_degree(initial, degree, cents, new, degree_tones):
     retval = test.move_degree(degree=degree, cents=cents)
     assert retval == new
     assert test.degree_tones == degree_tones
+
+
+@pytest.mark.parametrize(
+    'new_tones, rejected, tones',
+    [
+        ([SEMI, 101, WHOLE], [101], [0, SEMI, WHOLE]),
+        ([1300, -SEMI, float('inf')], [1300, -SEMI, float('inf')], [0]),
+    ]
+)
+def test_scale_add_tones(new_tones, rejected, tones):
+    test = scale_12edo.Scale12EDO.from_tones([])
+    retval = test.add_tones(new_tones)
+    assert retval == rejected
+    assert test.tones == tuple(tones)
+
+
+def test_scale_bitmask():
+    test = scale_12edo.Scale12EDO(tones=[200, 400, 500, 700, 900, 1100, 1200])
+    assert test.bitmask == 0b101010110101
+    assert test.has_pitch_class(7)
+    assert not test.has_pitch_class(1)
+    test.add_tone(100)
+    assert test.bitmask == 0b101010110111
+    assert test.has_pitch_class(13)
+
+
+def test_scale_from_bitmask():
+    test = scale_12edo.Scale12EDO.from_bitmask(0b10010001, root_note=440)
+    assert test.tones == (0, 400, 700)
+    assert test.root_note.freq == 440
@@ -0,0 +1,145 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_edo as scale_edo
+
+
+@pytest.mark.parametrize(
+    'edo, steps',
+    [
+        (19, [0, 3, 6, 8, 11, 14, 17]),
+        (31, [0, 5, 10, 13, 18, 23, 28]),
+        (53, [0, 9, 17, 22, 31, 40, 48]),
+    ],
+)
+def test_scale_edo_cents_round_trip(edo, steps):
+    # tones from floating point cents are found at their steps again
+    cents = [step * 1200 / edo for step in steps]
+    test = scale_edo.ScaleEDO.from_tones(cents, edo=edo)
+    assert test.edo == edo
+    assert test.steps == tuple(steps)
+    assert test.tones == pytest.approx(cents)
+    for tone in cents:
+        assert test.has_step(test.step_of(tone))
+        assert test.add_tone(tone) == -1
+    assert test.add_tones([step * (1200 / edo) for step in steps]) == (
+        pytest.approx(cents))
+    assert test.degrees == tuple(range(1, len(steps) + 1))
+
+
+@pytest.mark.parametrize(
+    'edo, tone, new',
+    [
+        (19, 1200 / 19, 2),
+        (19, 1200 / 12, None),
+        (31, 0.5, None),
+        (31, 1300, None),
+        (12, float('inf'), None),
+        (12, float('nan'), None),
+    ],
+)
+def test_scale_edo_add(edo, tone, new):
+    test = scale_edo.ScaleEDO(edo)
+    assert test.add_tone(tone) == new
+
+
+def test_scale_edo_add_steps():
+    test = scale_edo.ScaleEDO(31)
+    assert test.add_steps([18, 10, 18, 0, 32, -1, 2.0]) == [18, 0, 32, -1, 2.0]
+    assert test.steps == (0, 10, 18)
+    assert test.tones == pytest.approx([0, 12000 / 31, 21600 / 31])
+
+
+def test_scale_edo_add_steps_types():
+    test = scale_edo.ScaleEDO(31)
+    assert test.add_steps(np.array([18, 10], dtype=np.int64)) == []
+    assert test.add_steps([True, False, np.int64(10), np.float64(5)]) == [
+        True, False, 10, 5]
+    assert test.steps == (0, 10, 18)
+    assert all(type(step) is int for step in test.steps)
+
+
+@pytest.mark.parametrize(
+    'edo, steps, mask, transpose, transposed',
+    [
+        (19, [0, 6, 11, 19], 0b100001000001, 8, 0b100000100000001),
+        (12, [0, 4, 7], 0b10010001, -7, 0b1000100001),
+    ],
+)
+def test_scale_edo_pitch_classes(edo, steps, mask, transpose, transposed):
+    test = scale_edo.ScaleEDO.from_steps(steps, edo=edo)
+    assert test.pitch_class_mask == mask
+    assert test.transposed_mask(transpose) == transposed
+    assert test.has_pitch_class(steps[1] + edo)
+    assert not test.has_pitch_class(1)
+    assert test.has_step(steps[-1])
+    assert not test.has_step(-1)
+
+
+def test_scale_edo_with_tones():
+    test = scale_edo.ScaleEDO.from_steps([0, 5], edo=31)
+    other = test.with_tones([1200 / 31 * 3])
+    assert other.edo == 31
+    assert other.steps == (0, 3)
+
+
+def test_scale_edo_invalid():
+    with pytest.raises(ValueError):
+        scale_edo.ScaleEDO()
+    with pytest.raises(ValueError):
+        scale_12edo.Scale12EDO(edo=19)
+
+
+def test_scale_12edo_steps():
+    test = scale_12edo.Scale12EDO.from_bitmask(0b101010110101)
+    assert test.steps == (0, 2, 4, 5, 7, 9, 11)
+    assert test.tones == (0, 200, 400, 500, 700, 900, 1100)
+    assert isinstance(test.tones[1], int)
+    assert test.bitmask == 0b101010110101
+
+
+class FixedPointEDO(scale_edo.ScaleEDO):
+    TONE_RESOLUTION = 1e-6
+
+
+def test_scale_edo_tone_resolution():
+    assert scale_edo.ScaleEDO(19).tone_resolution is None
+    with pytest.raises(ValueError):
+        FixedPointEDO(19)
+
+
+def test_scale_edo_from_tones_signature():
+    with pytest.raises(ValueError):
+        scale_edo.ScaleEDO.from_tones([100], None, 1e-6, edo=12)
+    with pytest.raises(TypeError):
+        scale_edo.ScaleEDO.from_tones([100], None, None, 12)
+    test = scale_edo.ScaleEDO.from_tones([100], None, None, edo=12)
+    assert test.steps == (0, 1)
+
+
+# batches below and above ARRAY_TONES take different paths
+@pytest.mark.parametrize(
+    'count', [scale.ARRAY_TONES - 1, scale.ARRAY_TONES, scale.ARRAY_TONES * 3])
+def test_scale_edo_add_tones_same_as_add_tone(count):
+    # steps of 2 cents, tones off the steps and above the octave, repeats
+    new_tones = [(i * 7919) % 700 * 2 for i in range(count - 4)]
+    new_tones += [1.5, 2.0000001, -2, 'bad']
+    batch = scale_edo.ScaleEDO(600, tones=[100])
+    rejected = batch.add_tones(new_tones)
+    one_at_a_time = scale_edo.ScaleEDO(600, tones=[100])
+    for tone in new_tones:
+        one_at_a_time.add_tones([tone])
+    assert batch.tones == one_at_a_time.tones
+    assert batch.steps == one_at_a_time.steps
+    assert batch.degree_steps_cents == one_at_a_time.degree_steps_cents
+    assert 1.5 in rejected and -2 in rejected
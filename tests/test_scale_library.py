@@ -0,0 +1,157 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.ratios as ratios
+import lib.scale as scale
+import lib.scale_12edo as scale_12edo
+import lib.scale_edo as scale_edo
+import lib.scale_library as scale_library
+import lib.scale_octave as scale_octave
+
+SCALES = [
+    ('major', scale_12edo.Scale12EDO(
+        root_note=440, tones=[200, 400, 500, 700, 900, 1100, 1200])),
+    ('just fifth', scale_octave.ScaleOctave(tones=[701.955])),
+    ('tritave', scale.Scale(root_note=100, tones=[1901.955])),
+    ('root only é', scale.Scale()),
+    ('19-edo', scale_edo.ScaleEDO.from_steps(
+        [3, 6, 8, 11, 14, 17, 19], root_note=261.6, edo=19)),
+]
+
+
+@pytest.fixture
+def library_path(tmp_path):
+    path = str(tmp_path / 'scales.lib')
+    scale_library.write_library(path, SCALES)
+    return path
+
+
+def test_library(library_path):
+    test = scale_library.ScaleLibrary(library_path)
+    assert len(test) == len(SCALES)
+    assert test.counts.tolist() == [8, 2, 2, 1, 8]
+    assert test.offsets.tolist() == [0, 8, 10, 12, 13, 21]
+    for position, (name, myscale) in enumerate(SCALES):
+        view = test[position]
+        assert view.name == name
+        assert view.kind is type(myscale)
+        assert view.cents.tolist() == list(myscale.tones)
+        built = view.to_scale()
+        assert type(built) is type(myscale)
+        assert built.tones == myscale.tones
+        assert view.tone_resolution is None
+        if myscale.root_note is None:
+            assert view.root_freq is None
+            assert built.root_note is None
+        else:
+            assert built.root_note.freq == myscale.root_note.freq
+
+
+def test_library_views(library_path):
+    test = scale_library.ScaleLibrary(library_path)
+    cents = test.cents(0)
+    assert isinstance(cents, np.memmap)
+    assert np.shares_memory(cents, test.all_cents)
+    with pytest.raises(ValueError):
+        cents[0] = 1
+    assert test[-2].name == 'root only é'
+    with pytest.raises(IndexError):
+        test[len(SCALES)]
+
+
+@pytest.mark.parametrize('position', [-1, -len(SCALES), 1])
+def test_library_negative_positions(library_path, position):
+    test = scale_library.ScaleLibrary(library_path)
+    name, myscale = SCALES[position]
+    assert test.name(position) == name
+    assert test.cents(position).tolist() == list(myscale.tones)
+    assert test[position].name == name
+
+
+@pytest.mark.parametrize('position', [len(SCALES), -len(SCALES) - 1])
+def test_library_positions_out_of_range(library_path, position):
+    test = scale_library.ScaleLibrary(library_path)
+    with pytest.raises(IndexError):
+        test.name(position)
+    with pytest.raises(IndexError):
+        test.cents(position)
+    with pytest.raises(IndexError):
+        test[position]
+
+
+def test_library_edo(library_path):
+    test = scale_library.ScaleLibrary(library_path)
+    assert test[0].edo == 12
+    assert test[1].edo is None
+    built = test.scale('19-edo')
+    assert type(built) is scale_edo.ScaleEDO
+    assert built.edo == 19
+    assert built.steps == (0, 3, 6, 8, 11, 14, 17, 19)
+    assert built.tones == SCALES[-1][1].tones
+    assert built.has_pitch_class(22)
+
+
+def test_library_lookup(library_path):
+    test = scale_library.ScaleLibrary(library_path)
+    assert test.position('tritave') == 2
+    assert test.scale('tritave').tones == (0, 1901.955)
+    assert test.scale('missing') is None
+
+
+def test_library_empty(tmp_path):
+    path = str(tmp_path / 'empty.lib')
+    scale_library.write_library(path, [])
+    test = scale_library.ScaleLibrary(path)
+    assert len(test) == 0
+    assert list(test) == []
+
+
+def test_library_bad_file(tmp_path):
+    path = tmp_path / 'bad.lib'
+    path.write_bytes(b'not a library at all, but long enough for a header')
+    with pytest.raises(ValueError):
+        scale_library.ScaleLibrary(str(path))
+
+
+def test_library_fixed_point(tmp_path):
+    path = str(tmp_path / 'fixed.lib')
+    myscale = scale.Scale(tones=[386.3137, 701.955], tone_resolution=1e-3)
+    scale_library.write_library(path, [('fixed point', myscale)])
+    test = scale_library.ScaleLibrary(path)
+    assert test[0].tone_resolution == 1e-3
+    built = test.scale('fixed point')
+    assert built.tone_resolution == 1e-3
+    assert built.tones == myscale.tones
+    assert built.degree_steps_cents == myscale.degree_steps_cents
+    assert built.add_tone(386.3139) == -1
+    assert built.add_tone(386.3146) == 3
+
+
+def test_library_ratio_tones(tmp_path):
+    just = scale_octave.ScaleOctave(tones=[ratios.Ratio(3, 2)])
+    with pytest.raises(ValueError):
+        scale_library.write_library(str(tmp_path / 'just.lib'), [
+            ('just', just)])
+    scale_library.write_library(str(tmp_path / 'just.lib'), [
+        ('just', scale_octave.ScaleOctave.from_tones(
+            [float(tone) for tone in just.tones]))])
+
+
+def test_library_close(library_path):
+    with scale_library.ScaleLibrary(library_path) as test:
+        assert not test.closed
+        cents = test.cents(0)
+    assert test.closed
+    assert cents.tolist() == list(SCALES[0][1].tones)
+    for call in (len, list, lambda test: test[0], lambda test: test.offsets,
+                 lambda test: test.position('major')):
+        with pytest.raises(ValueError):
+            call(test)
@@ -6,8 +6,11 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
+import numpy as np
 import pytest
 
+import lib.note as note
+import lib.ratios as ratios
 import lib.scale_octave as scale_octave
 
 
@@ -22,8 +25,8 @@ def test_scale_add_tone(initial, tone, new, degrees, tones):
     test = scale_octave.ScaleOctave(tones=initial)
     retval = test.add_tone(tone)
     assert retval == new
-    assert test.degrees == degrees
-    assert test.tones == tones
+    assert test.degrees == tuple(degrees)
+    assert test.tones == tuple(tones)
 
 
 @pytest.mark.parametrize(
@@ -54,3 +57,75 @@ def test_scale_move_degree(initial, degree, cents, new, degree_tones):
     retval = test.move_degree(degree=degree, cents=cents)
     assert retval == new
     assert test.degree_tones == degree_tones
+
+
+def test_scale_add_tones():
+    test = scale_octave.ScaleOctave()
+    retval = test.add_tones([700, scale_octave.MAX_CENTS + 1, 1200])
+    assert retval == [scale_octave.MAX_CENTS + 1]
+    assert test.tones == (0, 700, 1200)
+
+
+@pytest.mark.parametrize(
+    'cents, expected',
+    [
+        (1150, (7, 0, 50)),
+        (1190, (1, 1, -10)),
+        (-50, (7, -1, 50)),
+        (2490, (1, 2, 90)),
+        (3710, (2, 3, -90)),
+    ],
+)
+def test_scale_quantize_cents(cents, expected):
+    test = scale_octave.ScaleOctave(
+        tones=[200, 400, 500, 700, 900, 1100, scale_octave.OCTAVE_CENTS])
+    assert test.period_cents == scale_octave.OCTAVE_CENTS
+    assert test.quantize_cents(cents) == expected
+
+
+def test_scale_quantize_freq_array():
+    test = scale_octave.ScaleOctave(root_note=220, tones=[700])
+    retval = test.quantize(np.array([110, 330, 440, 650]))
+    assert retval.degree.tolist() == [1, 2, 1, 2]
+    assert retval.octave.tolist() == [-1, 0, 1, 1]
+    np.testing.assert_allclose(
+        retval.deviation, [0, 1.955, 0, -24.477], atol=0.01)
+
+
+def test_scale_frequencies():
+    test = scale_octave.ScaleOctave(root_note=440, tones=[700, 1200])
+    retval = test.frequencies()
+    assert retval.freq[0] >= note.MIN_AUDIBLE_HZ
+    assert retval.freq[-1] <= note.MAX_FREQ_HZ
+    assert np.all(np.diff(retval.freq) > 0)
+    assert retval.freq[retval.octave == 0].tolist() == [
+        440, pytest.approx(659.26, abs=0.01)]
+    # the fifth of 13.75 Hz (440 Hz * 2**-5) is the lowest tone above 20 Hz
+    assert retval.degree.tolist()[:3] == [2, 1, 2]
+    assert retval.octave.tolist()[:3] == [-5, -4, -4]
+    generated = list(test.iter_frequencies())
+    assert [f for f, _, _ in generated] == retval.freq.tolist()
+    assert [d for _, d, _ in generated] == retval.degree.tolist()
+    assert [o for _, _, o in generated] == retval.octave.tolist()
+
+
+def test_scale_frequencies_window():
+    test = scale_octave.ScaleOctave(root_note=440, tones=[700])
+    assert list(test.iter_frequencies(800, 1500)) == [
+        (880, 1, 1), (pytest.approx(1318.5, abs=0.1), 2, 1)]
+    test.root_note = 220
+    assert test.frequencies(800, 1500).freq.tolist() == [
+        880, pytest.approx(1318.5, abs=0.1)]
+    assert test.frequencies(800, 1500).octave.tolist() == [2, 2]
+
+
+def test_scale_ratio_tones():
+    just = [ratios.Ratio(*ratio) for ratio in [(9, 8), (5, 4), (3, 2), (2, 1)]]
+    test = scale_octave.ScaleOctave.from_tones(just)
+    assert test.tones == (0, *just)
+    assert test.degree_steps_cents[3] == ratios.Ratio(10, 9)
+    assert test.add_tone(ratios.Ratio(6, 4)) == -1
+    assert test.add_tone(ratios.Ratio(9, 4)) is None
+    assert test.add_tone_rel_degree(4, ratios.Ratio(9, 8)) == 5
+    assert test.degree_tones[5] == ratios.Ratio(27, 16)
+    assert test.quantize_cents(700).degree == 4
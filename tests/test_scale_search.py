@@ -0,0 +1,152 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.scale_12edo as scale_12edo
+import lib.scale_library as scale_library
+import lib.scale_search as scale_search
+
+MAJOR = [0, 200, 400, 500, 700, 900, 1100]
+DORIAN = [0, 200, 300, 500, 700, 900, 1000]
+PENTATONIC = [0, 200, 400, 700, 900]
+WHOLE_TONE = [0, 200, 400, 600, 800, 1000]
+SCALES = [MAJOR, PENTATONIC, WHOLE_TONE, [0, 100, 200, 300]]
+
+
+@pytest.mark.parametrize("tones, expected", [
+    ([0, 1200, 700, 1900, 2400], [0, 700]),
+    ([-100, 1300], [100, 1100]),
+    ([], []),
+])
+def test_pitch_classes(tones, expected):
+    assert scale_search.pitch_classes(tones).tolist() == expected
+
+
+def test_pitch_classes_scale():
+    myscale = scale_12edo.Scale12EDO(tones=MAJOR + [1200])
+    assert scale_search.pitch_classes(myscale).tolist() == MAJOR
+
+
+def test_rerooted():
+    test = scale_search.rerooted(np.array([0., 400, 700]))
+    assert test.tolist() == [[0, 400, 700], [800, 0, 300], [500, 900, 0]]
+
+
+@pytest.mark.parametrize("query, candidate, expected", [
+    (MAJOR, MAJOR, 0),
+    # each tone 10 cents from a tone of the other set
+    ([0, 700], [10, 710], 10),
+    # 1190 is 10 cents from 0 around the octave
+    ([0], [1190], 10),
+    # 500 is 200 cents from 700, 700 and 0 are exact
+    ([0, 700], [0, 500, 700], (0 + 0) / 4 + (0 + 200 + 0) / 6),
+])
+def test_set_distances(query, candidate, expected):
+    test = scale_search.set_distances(
+        np.array([query], dtype=float), np.array([candidate], dtype=float))
+    assert test.shape == (1, 1)
+    assert test[0, 0] == pytest.approx(expected)
+
+
+def test_fourier_rotation():
+    major = scale_search.fourier(np.array([MAJOR], dtype=float))
+    dorian = scale_search.fourier(np.array([DORIAN], dtype=float))
+    assert major.shape == (1, scale_search.COEFFICIENTS)
+    np.testing.assert_allclose(np.abs(major), np.abs(dorian))
+    assert not np.allclose(major, dorian)
+
+
+def test_index():
+    test = scale_search.SimilarityIndex(SCALES)
+    assert len(test) == len(SCALES)
+    assert test.tone_counts == {4: 1, 5: 1, 6: 1, 7: 1}
+
+
+@pytest.mark.parametrize("shortlist", [None, 2])
+def test_query(shortlist):
+    test = scale_search.SimilarityIndex(SCALES)
+    result = test.query(MAJOR, k=2, shortlist=shortlist)
+    assert [match.position for match in result] == [0, 1]
+    assert result[0].distance == 0
+    assert result[1].distance > 0
+
+
+def test_query_rotations():
+    test = scale_search.SimilarityIndex(SCALES)
+    assert test.query(DORIAN, k=1)[0] == (0, 0)
+    assert test.query(DORIAN, k=1, rotations=False)[0].distance > 0
+
+
+def test_query_count_tolerance():
+    test = scale_search.SimilarityIndex(SCALES)
+    result = test.query(MAJOR, count_tolerance=1)
+    assert sorted(match.position for match in result) == [0, 2]
+    assert test.query([0, 100], count_tolerance=0) == []
+
+
+def test_query_library(tmp_path):
+    path = str(tmp_path / 'scales.lib')
+    scale_library.write_library(path, [
+        (str(i), scale_12edo.Scale12EDO(tones=tones))
+        for i, tones in enumerate(SCALES)
+    ])
+    test = scale_search.SimilarityIndex(scale_library.ScaleLibrary(path))
+    assert test.query(WHOLE_TONE, k=1)[0] == (2, 0)
+
+
+def test_query_shortlist_matches_exhaustive():
+    rng = np.random.default_rng(1)
+    scales = [
+        rng.uniform(0, 1200, size=count)
+        for count in rng.integers(4, 9, size=500)
+    ]
+    test = scale_search.SimilarityIndex(scales)
+    query = scales[7] + 5
+    shortlisted = test.query(query, k=3, shortlist=100)
+    exhaustive = test.query(query, k=3, shortlist=None)
+    assert shortlisted == exhaustive
+    assert shortlisted[0].position == 7
+
+
+def test_query_default_is_exact():
+    rng = np.random.default_rng(2)
+    scales = [
+        rng.uniform(0, 1200, size=count)
+        for count in rng.integers(4, 9, size=2000)
+    ]
+    test = scale_search.SimilarityIndex(scales)
+    query = rng.uniform(0, 1200, size=6)
+    # rank every scale by its distance to the query and its re-rootings
+    classes = scale_search.pitch_classes(query)
+    queries = np.concatenate([classes[np.newaxis, :],
+                              scale_search.rerooted(classes)])
+    exact = [
+        scale_search.set_distances(
+            queries, scale_search.pitch_classes(tones)[np.newaxis, :]).min()
+        for tones in scales
+    ]
+    expected = sorted(range(len(scales)), key=lambda i: (exact[i], i))[:10]
+    result = test.query(query)
+    assert [match.position for match in result] == expected
+    assert [match.distance for match in result] == pytest.approx(
+        [exact[i] for i in expected])
+
+
+@pytest.mark.parametrize("query", [[], np.zeros(0)])
+def test_query_empty(query):
+    test = scale_search.SimilarityIndex(SCALES)
+    assert test.query(query) == []
+    positions, distances = test.distances(query)
+    assert len(positions) == len(distances) == 0
+
+
+def test_index_empty_scale():
+    test = scale_search.SimilarityIndex([[], MAJOR])
+    assert test.query(MAJOR) == [(1, 0)]
@@ -0,0 +1,134 @@
+__author__ = "Joel Luth"
+__copyright__ = "Copyright 2020, Joel Luth"
+__credits__ = ["Joel Luth"]
+__license__ = "MIT"
+__maintainer__ = "Joel Luth"
+__email__ = "joel.luth@gmail.com"
+__status__ = "Prototype"
+
+import numpy as np
+import pytest
+
+import lib.tone_store as tone_store
+
+
+@pytest.mark.parametrize(
+    'initial, tones',
+    [
+        (None, []),
+        ([700, 0, 400, 700], [0, 400, 700]),
+    ],
+)
+def test_sorted_tones(initial, tones):
+    test = tone_store.SortedTones(initial)
+    assert test.tolist() == tones
+    assert len(test) == len(tones)
+
+
+@pytest.mark.parametrize(
+    'initial, add, position, tones',
+    [
+        ([0, 700], 400, 1, [0, 400, 700]),
+        ([0, 700], 1200, 2, [0, 700, 1200]),
+        ([0, 700], 700, -1, [0, 700]),
+    ],
+)
+def test_sorted_tones_add(initial, add, position, tones):
+    test = tone_store.SortedTones(initial)
+    assert test.add(add) == position
+    assert test.tolist() == tones
+
+
+@pytest.mark.parametrize(
+    'initial, cents, position',
+    [
+        ([0, 400, 700], 400, 1),
+        ([0, 400, 700], 500, -1),
+        ([0, 400, 700], 1200, -1),
+    ],
+)
+def test_sorted_tones_find(initial, cents, position):
+    test = tone_store.SortedTones(initial)
+    assert test.find(cents) == position
+    assert (cents in test) == (position != -1)
+
+
+def test_sorted_tones_pop():
+    test = tone_store.SortedTones([0, 400, 700])
+    assert test.pop(1) == 400
+    assert test.tolist() == [0, 700]
+    with pytest.raises(IndexError):
+        test.pop(5)
+
+
+@pytest.mark.parametrize(
+    'edo, initial, tones, steps',
+    [
+        (12, None, [], ()),
+        (12, [700, 0, 400.0, 700], [0, 400, 700], (0, 4, 7)),
+        (19, [1200 / 19 * 5, 0], [0, 6000 / 19], (0, 5)),
+        (53, [1200 * 31 / 53], [37200 / 53], (31,)),
+    ],
+)
+def test_step_tones(edo, initial, tones, steps):
+    test = tone_store.StepTones(edo, initial)
+    assert test.tolist() == pytest.approx(tones)
+    assert test.steps() == steps
+    assert len(test) == len(steps)
+
+
+@pytest.mark.parametrize(
+    'edo, cents, step',
+    [
+        (12, 700, 7),
+        (12, 701, None),
+        (31, 5 * 1200 / 31, 5),
+        (31, 5 * 1200 / 31 + 1e-3, None),
+        (19, 1200, 19),
+    ],
+)
+def test_step_tones_step(edo, cents, step):
+    assert tone_store.StepTones(edo).step(cents) == step
+
+
+def test_step_tones_add_find():
+    test = tone_store.StepTones(19, [0])
+    third = 1200 * 6 / 19
+    assert test.add(third) == 1
+    assert test.add(6 * (1200 / 19)) == -1
+    assert test.find(third) == 1
+    assert third in test
+    assert test.find(1200 * 7 / 19) == -1
+    assert test.pop(1) == pytest.approx(third)
+    assert test.tolist() == [0]
+
+
+@pytest.mark.parametrize(
+    'resolution, initial, tones',
+    [
+        (1e-6, [386.31370000001, 0, 386.3137, 200.0], [0, 200, 386.3137]),
+        (1e-3, [0.0004, 0.0006, 1.0014], [0, 0.001, 1.001]),
+        (5, [0, 3, 7, 12], [0, 5, 10]),
+        # rounded to the grid: close tones either side of a half stay apart
+        (1, [0, 100.49, 100.51, 99.6], [0, 100, 101]),
+    ],
+)
+def test_fixed_point_tones(resolution, initial, tones):
+    test = tone_store.FixedPointTones(initial, resolution)
+    assert test.tolist() == tones
+    assert test.keys(np.array(initial, dtype=float)).tolist() == [
+        test.key(cents) for cents in initial]
+
+
+def test_fixed_point_tones_add_find():
+    test = tone_store.FixedPointTones([0, 700])
+    assert test.add(386.3137) == 1
+    assert test.add(386.31370000001) == -1
+    assert 386.3137000004 in test
+    assert test.find(386.3137) == 1
+    assert test.find(386.3147) == -1
+    assert test.pop(1) == 386.3137
+    assert 386.3137 not in test
+    test.delete([0])
+    assert test.tolist() == [700]
+    assert isinstance(test[0], int)
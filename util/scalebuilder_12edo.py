@@ -1,3 +1,9 @@
+"""
+scalebuilder_12edo.py
+Builders for common 12-EDO scales
+(import from the repo root, eg import util.scalebuilder_12edo)
+"""
+
 __author__ = "Joel Luth"
 __copyright__ = "Copyright 2020, Joel Luth"
 __credits__ = ["Joel Luth"]
@@ -6,10 +12,10 @@ __maintainer__ = "Joel Luth"
 __email__ = "joel.luth@gmail.com"
 __status__ = "Prototype"
 
-import sys
+from itertools import accumulate
 
-sys.path.insert(0, '../lib')
-import scale_12edo
+import lib.modes as modes
+import lib.scale_12edo as scale_12edo
 
 MAJOR = [scale_12edo.WHOLE,
          scale_12edo.WHOLE,
@@ -32,18 +38,24 @@ MODE = {
 
 
 def chromatic():
-    myscale = scale_12edo.Scale12EDO(list(range(100, 1200, 100)))
+    myscale = scale_12edo.Scale12EDO(tones=list(range(100, 1200, 100)))
     return myscale
 
 
+def modes_of(steps):
+    """
+    All rotations of a step pattern
+    :param steps: list of steps in cents, summing to an octave
+    :return: list of Scale12EDO, the first one built from steps as given
+    """
+    myscale = scale_12edo.Scale12EDO.from_tones(accumulate(steps))
+    return modes.rotations(myscale, unique=False)
+
+
 def mode(mode):
     if mode not in MODE:
         return None
-    myscale = scale_12edo.Scale12EDO()
-    steps = (MAJOR[MODE[mode]:] + MAJOR[:MODE[mode]])
-    for step in steps:
-        myscale.add_tone(step)
-    return myscale
+    return modes_of(MAJOR)[MODE[mode]]
 
 
 def major():